@@ -0,0 +1,258 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from src.config.settings import settings
+
+# Degrade chain, cheapest intervention first
+NORMAL = "normal"
+CHEAPER_MODEL = "cheaper_model"
+BUFFERED_ONLY = "buffered_only"
+PAUSED = "paused"
+
+
+class BudgetExceededError(Exception):
+    """Raised instead of generating for a character that is out of budget"""
+
+    def __init__(self, character_id: str, level: str):
+        super().__init__(f"LLM budget exhausted for {character_id} ({level})")
+        self.character_id = character_id
+        self.level = level
+
+
+def bucket_starts(at: datetime) -> Tuple[datetime, datetime]:
+    """Start of the hourly and daily buckets containing a timestamp"""
+    hour = at.replace(minute=0, second=0, microsecond=0)
+    return hour, hour.replace(hour=0)
+
+
+def create_usage_store(backend: str) -> Any:
+    """Usage and budget store for LLM_USAGE_BACKEND, or None for memory only"""
+    if backend == "mongodb":
+        # Imported here: the database layer imports the AI modules
+        from src.database.mongodb import MongoDBManager
+        return MongoDBManager(settings.MONGODB_URL)
+    return None
+
+
+class CostMeter:
+    """Per-character token and cost counters with budget enforcement.
+
+    Current hourly and daily totals are kept in memory for the budget check.
+    Calls are also added to hourly/daily bucket documents in the store (any
+    object with async record_llm_usage, get_llm_usage, get_llm_budget and
+    save_llm_budget, normally MongoDBManager), which seeds the counters and
+    per-character budget overrides after a restart. Store writes are batched
+    in the background every flush_interval seconds so they never sit on the
+    LLM call path.
+
+    Spend is compared with the character's budgets as a fraction of the
+    tighter one: past degrade_ratio calls move to a cheaper model, past
+    buffer_ratio only pre-generated content is posted, and at 100% the
+    character is paused until the bucket rolls over.
+    """
+
+    def __init__(self,
+                 hourly_budget: float = 0.0,
+                 daily_budget: float = 0.0,
+                 cheaper_model: str = "gpt-3.5-turbo",
+                 degrade_ratio: float = 0.7,
+                 buffer_ratio: float = 0.9,
+                 store: Any = None,
+                 flush_interval: float = 5.0):
+        """
+        Args:
+            hourly_budget: Default USD per character per hour (0 = unlimited)
+            daily_budget: Default USD per character per day (0 = unlimited)
+            cheaper_model: Model used once the degrade ratio is passed
+            degrade_ratio: Budget fraction that switches to cheaper_model
+            buffer_ratio: Budget fraction that stops fresh generation
+            store: Persistent bucket store
+            flush_interval: Seconds between batched usage writes
+        """
+        self.hourly_budget = hourly_budget
+        self.daily_budget = daily_budget
+        self.cheaper_model = cheaper_model
+        self.degrade_ratio = degrade_ratio
+        self.buffer_ratio = buffer_ratio
+        self.store = store
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(__name__)
+
+        self.budgets: Dict[str, Dict[str, float]] = {}
+        # character_id -> {"hour"/"day": (bucket start, {"cost_usd", tokens...})}
+        self._current: Dict[str, Dict[str, Tuple[datetime, Dict[str, float]]]] = defaultdict(dict)
+        self._loaded = set()
+        # (character_id, call_type, model, hour) -> summed usage not yet written
+        self._pending: Dict[Tuple[str, str, str, datetime], Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"degraded": 0, "rejected": 0, "flushes": 0, "flush_errors": 0}
+
+    @staticmethod
+    def _empty() -> Dict[str, float]:
+        return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+
+    async def set_budget(self, character_id: str, hourly: float = None, daily: float = None) -> None:
+        """Override the default budgets for one character (0 = unlimited)"""
+        await self.load(character_id)
+        budget = self.budgets.setdefault(character_id, {})
+        if hourly is not None:
+            budget["hourly"] = hourly
+        if daily is not None:
+            budget["daily"] = daily
+        if self.store is not None:
+            await self.store.save_llm_budget(character_id, budget.get("hourly"), budget.get("daily"))
+
+    def get_budget(self, character_id: str) -> Dict[str, float]:
+        budget = self.budgets.get(character_id, {})
+        return {
+            "hourly": budget.get("hourly", self.hourly_budget),
+            "daily": budget.get("daily", self.daily_budget)
+        }
+
+    def _totals(self, character_id: str, period: str, start: datetime) -> Dict[str, float]:
+        """Counters of the current bucket, starting a new one when it rolled over"""
+        current = self._current[character_id].get(period)
+        if current is None or current[0] != start:
+            current = (start, self._empty())
+            self._current[character_id][period] = current
+        return current[1]
+
+    async def load(self, character_id: str) -> None:
+        """Seed the current buckets and budget overrides from the store once per character"""
+        if character_id in self._loaded or self.store is None:
+            return
+        self._loaded.add(character_id)
+        override = await self.store.get_llm_budget(character_id)
+        if override:
+            budget = self.budgets.setdefault(character_id, {})
+            for period in ("hourly", "daily"):
+                if override.get(period) is not None:
+                    budget.setdefault(period, override[period])
+        hour, day = bucket_starts(datetime.utcnow())
+        for period, start in (("hour", hour), ("day", day)):
+            docs = await self.store.get_llm_usage(character_id, period, start)
+            totals = self._totals(character_id, period, start)
+            for doc in docs:
+                if doc.get("bucket_start") == start:
+                    for field in totals:
+                        totals[field] += doc.get("totals", {}).get(field, 0)
+
+    def spend_ratio(self, character_id: str) -> float:
+        """Fraction of the tighter budget already spent"""
+        hour, day = bucket_starts(datetime.utcnow())
+        budget = self.get_budget(character_id)
+        ratios = [0.0]
+        for period, start, limit in (("hour", hour, budget["hourly"]), ("day", day, budget["daily"])):
+            if limit > 0:
+                ratios.append(self._totals(character_id, period, start)["cost_usd"] / limit)
+        return max(ratios)
+
+    def level(self, character_id: Optional[str]) -> str:
+        """Where a character is in the degrade chain"""
+        if not character_id:
+            return NORMAL
+        ratio = self.spend_ratio(character_id)
+        if ratio >= 1.0:
+            return PAUSED
+        if ratio >= self.buffer_ratio:
+            return BUFFERED_ONLY
+        if ratio >= self.degrade_ratio:
+            return CHEAPER_MODEL
+        return NORMAL
+
+    async def check(self, character_id: Optional[str], model: str) -> str:
+        """
+        Enforce the budget before a call
+
+        Returns:
+            str: Model to use, possibly the cheaper fallback
+
+        Raises:
+            BudgetExceededError: The character may not generate right now
+        """
+        if not character_id:
+            return model
+        await self.load(character_id)
+        level = self.level(character_id)
+        if level in (BUFFERED_ONLY, PAUSED):
+            self.stats["rejected"] += 1
+            raise BudgetExceededError(character_id, level)
+        if level == CHEAPER_MODEL and model != self.cheaper_model:
+            self.stats["degraded"] += 1
+            return self.cheaper_model
+        return model
+
+    async def record(self,
+                     character_id: Optional[str],
+                     call_type: str,
+                     model: str,
+                     prompt_tokens: int,
+                     completion_tokens: int,
+                     cost_usd: float) -> None:
+        """Attribute one call to a character's hourly and daily buckets"""
+        character_id = character_id or "system"
+        now = datetime.utcnow()
+        for period, start in zip(("hour", "day"), bucket_starts(now)):
+            totals = self._totals(character_id, period, start)
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+            totals["cost_usd"] += cost_usd
+
+        if self.store is not None:
+            hour, _ = bucket_starts(now)
+            pending = self._pending.setdefault(
+                (character_id, call_type, model, hour),
+                {"prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0, "calls": 0}
+            )
+            pending["prompt_tokens"] += prompt_tokens
+            pending["completion_tokens"] += completion_tokens
+            pending["cost_usd"] += cost_usd
+            pending["calls"] += 1
+            pending["at"] = now
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        self._flush_task = asyncio.create_task(self._flush_later(), name="llm_usage_flush")
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write batched usage to the store"""
+        pending, self._pending = self._pending, {}
+        for (character_id, call_type, model, _), usage in pending.items():
+            try:
+                await self.store.record_llm_usage(
+                    character_id, call_type, model,
+                    usage["prompt_tokens"], usage["completion_tokens"], usage["cost_usd"],
+                    usage["at"], calls=usage["calls"]
+                )
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                self.logger.error(f"Error writing LLM usage for {character_id}: {str(e)}")
+        if pending:
+            self.stats["flushes"] += 1
+
+    def get_usage(self, character_id: str = None) -> Dict[str, Any]:
+        """Current bucket totals, budgets and degrade level per character"""
+        character_ids = [character_id] if character_id else list(self._current)
+        hour, day = bucket_starts(datetime.utcnow())
+        return {
+            "stats": {**self.stats, "pending_writes": len(self._pending)},
+            "characters": {
+                char_id: {
+                    "hour": dict(self._totals(char_id, "hour", hour)),
+                    "day": dict(self._totals(char_id, "day", day)),
+                    "budget": self.get_budget(char_id),
+                    "level": self.level(char_id) if char_id != "system" else NORMAL
+                }
+                for char_id in character_ids
+            }
+        }
@@ -0,0 +1,99 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+MAX_TWEET_LENGTH = 280
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def clean_tweet(text: Any) -> str:
+    """Strip labels and wrapping quotes from generated tweet text"""
+    if isinstance(text, dict):
+        text = text.get("content", "")
+    tweet = str(text or "").strip()
+    tweet = re.sub(r'^(Tweet:|"|\')*\s*', '', tweet)
+    tweet = re.sub(r'("|\')*$', '', tweet)
+    return tweet
+
+
+def shingles(text: str, size: int = 2) -> Set[str]:
+    """Word n-gram set used for overlap comparisons"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return set(words)
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class CandidateRanker:
+    """Picks the best of several generated tweets without another LLM call.
+
+    Candidates that fail the character's content filter rank last; the rest
+    are ordered by novelty against recent tweets and by length.
+    """
+
+    def __init__(self,
+                 novelty_weight: float = 0.7,
+                 length_weight: float = 0.3,
+                 ideal_length: Iterable[int] = (80, 240)):
+        self.novelty_weight = novelty_weight
+        self.length_weight = length_weight
+        self.ideal_min, self.ideal_max = ideal_length
+
+    @staticmethod
+    def restricted_terms(character: Dict) -> List[str]:
+        """Content restrictions and taboo topics from the character profile"""
+        personality = character.get("personality") or {}
+        ethics = personality.get("ethical_framework") or {}
+        culture = personality.get("cultural_awareness") or {}
+        terms = list(ethics.get("content_restrictions") or []) + list(culture.get("taboo_topics") or [])
+        return [term.lower() for term in terms if isinstance(term, str) and term.strip()]
+
+    def passes_filter(self, text: str, restricted: List[str]) -> bool:
+        """Whether a candidate is postable at all"""
+        if not text or len(text) > MAX_TWEET_LENGTH:
+            return False
+        lowered = text.lower()
+        return not any(term in lowered for term in restricted)
+
+    @staticmethod
+    def novelty(text: str, recent: List[Set[str]]) -> float:
+        """1 minus the highest Jaccard overlap with a recent tweet"""
+        current = shingles(text)
+        if not current or not recent:
+            return 1.0
+        overlap = max(len(current & other) / len(current | other) for other in recent)
+        return 1.0 - overlap
+
+    def length_score(self, text: str) -> float:
+        """1.0 inside the ideal range, falling off linearly outside it"""
+        length = len(text)
+        if length < self.ideal_min:
+            return length / self.ideal_min
+        if length > self.ideal_max:
+            return max(0.0, 1.0 - (length - self.ideal_max) / (MAX_TWEET_LENGTH - self.ideal_max + 1))
+        return 1.0
+
+    def score(self, text: str, recent: List[Set[str]]) -> float:
+        return self.novelty_weight * self.novelty(text, recent) + self.length_weight * self.length_score(text)
+
+    def rank(self, candidates: List[str], character: Dict, recent_tweets: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Score candidates, best first
+
+        Returns:
+            list: Dicts with text, score and passed (content filter result)
+        """
+        restricted = self.restricted_terms(character)
+        recent = [s for s in (shingles(tweet) for tweet in recent_tweets or []) if s]
+
+        ranked = []
+        seen = set()
+        for text in candidates:
+            if not text or text in seen:
+                continue
+            seen.add(text)
+            ranked.append({
+                "text": text,
+                "score": self.score(text, recent),
+                "passed": self.passes_filter(text, restricted)
+            })
+        return sorted(ranked, key=lambda c: (c["passed"], c["score"]), reverse=True)
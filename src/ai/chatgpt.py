@@ -1,7 +1,20 @@
 import json
-from typing import Any, Dict, Optional, List
-from openai import OpenAI
+from typing import Any, AsyncIterator, Dict, Optional, List, Type, TypeVar, Union
 import asyncio
+import time
+from src.ai.engine import LLMEngine, LLMResponse, get_engine
+from src.ai.prompt_cache import prompt_cache
+from src.ai.response_cache import get_response_cache
+from src.ai.routing import ModelRoute, ModelRouter
+from src.ai.budget import CostMeter, create_usage_store
+from src.ai.candidates import CandidateRanker, clean_tweet
+from src.ai.structured import (
+    ActionPlan, ContentEvaluation, EmotionAnalysis, EthicalEvaluation,
+    InteractionDecision, PlannedAction, RelevanceScores, StructuredOutputError,
+    TrendAnalysis, parse_structured, repair_json, schema_instructions
+)
+from src.ai.tokens import TokenCounter, TokenUsageTracker
+from src.config.settings import settings
 from src.character.models import (
     PersonalityTraits, SpeechPatterns, EmotionalIntelligence, 
     CulturalAwareness, LanguageCapabilities, EthicalFramework, 
@@ -12,93 +25,335 @@ from src.character.models import (
 from datetime import datetime
 import re
 import traceback
+from pydantic import BaseModel
+
+T = TypeVar("T", bound=BaseModel)
+
+# JSON shape requested for each independently generated personality section
+PERSONALITY_SECTIONS = {
+    "base_personality": """{
+        "core_description": "string",
+        "background_story": "string",
+        "key_traits": ["string"],
+        "origin_story": "string",
+        "defining_characteristics": ["string"]
+    }""",
+    "psychological_profile": """{
+        "personality_type": "string",
+        "cognitive_patterns": ["string"],
+        "defense_mechanisms": ["string"],
+        "psychological_needs": ["string"],
+        "motivation_factors": ["string"],
+        "growth_potential": {"key": float},
+        "adaptation_rate": float,
+        "stress_responses": {"key": "string"}
+    }""",
+    "speech_patterns": """{
+        "style": "string",
+        "common_phrases": ["string"],
+        "vocabulary_preferences": ["string"],
+        "linguistic_quirks": ["string"],
+        "communication_patterns": {"key": ["string"]},
+        "formality_spectrum": {"casual": float, "formal": float},
+        "formality_level": float,
+        "tone": "string",
+        "vocabulary_level": float,
+        "typical_expressions": ["string"],
+        "language_quirks": ["string"],
+        "emoji_usage": {"frequency": float, "preferred": ["string"]}
+    }""",
+    "emotional_intelligence": """{
+        "empathy_level": float,
+        "emotional_awareness": float,
+        "social_perception": float,
+        "emotional_regulation": {"key": float},
+        "interpersonal_skills": ["string"]
+    }""",
+    "cultural_awareness": """{
+        "known_cultures": ["string"],
+        "cultural_sensitivity": float,
+        "taboo_topics": ["string"],
+        "cultural_preferences": {"key": float},
+        "cultural_knowledge": ["string"]
+    }""",
+    "ethical_framework": """{
+        "moral_values": {"key": float},
+        "ethical_boundaries": ["string"],
+        "content_restrictions": ["string"],
+        "sensitive_topics": {"key": float}
+    }""",
+    "behavioral_patterns": """{
+        "interaction_style": "string",
+        "triggers": ["string"],
+        "habits": ["string"],
+        "preferences": {"key": "string"},
+        "response_patterns": {"key": "string"},
+        "social_adaptability": float,
+        "decision_making_style": "string"
+    }""",
+    "language_capabilities": """{
+        "primary_language": "string",
+        "other_languages": {"string": float},
+        "translation_confidence": float,
+        "cultural_expressions": {"string": ["string"]}
+    }""",
+    "opinion_system": """{
+        "core_beliefs": {"truth": float, "justice": float, "innovation": float},
+        "opinion_strength": {"technology": float, "society": float, "environment": float},
+        "persuadability": float,
+        "opinion_expression_style": "string",
+        "belief_update_rate": float
+    }"""
+}
+
+# Model each generated section is validated against; base_personality is
+# kept as a plain dict on PersonalityTraits
+PERSONALITY_SECTION_MODELS = {
+    "psychological_profile": PsychologicalProfile,
+    "speech_patterns": SpeechPatterns,
+    "emotional_intelligence": EmotionalIntelligence,
+    "cultural_awareness": CulturalAwareness,
+    "ethical_framework": EthicalFramework,
+    "behavioral_patterns": BehavioralPatterns,
+    "language_capabilities": LanguageCapabilities,
+    "opinion_system": OpinionSystem
+}
 
 
 class ChatGPTClient:
     """OpenAI GPT client for character interactions"""
     
-    def __init__(self, api_key: str, model: str = "gpt-4"):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: Union[str, List[str]], model: str = "gpt-4", engine: LLMEngine = None):
+        """
+        Args:
+            api_key: OpenAI API key, or a list of keys to pool (OPENAI_API_KEYS
+                are pooled in as well)
+            model: Default model for routes without their own
+            engine: Shared engine, by default the one for these keys
+        """
+        self.engine = engine or get_engine(api_key)
         self.model = model
+        self.router = ModelRouter.from_settings(model)
+        self.candidate_ranker = CandidateRanker()
+        self.tokens = TokenCounter(model)
+        self.usage = TokenUsageTracker()
+        self.cost_meter = CostMeter(
+            hourly_budget=settings.LLM_CHARACTER_HOURLY_BUDGET,
+            daily_budget=settings.LLM_CHARACTER_DAILY_BUDGET,
+            cheaper_model=settings.LLM_BUDGET_CHEAPER_MODEL,
+            degrade_ratio=settings.LLM_BUDGET_DEGRADE_RATIO,
+            buffer_ratio=settings.LLM_BUDGET_BUFFER_RATIO,
+            store=create_usage_store(settings.LLM_USAGE_BACKEND)
+        )
+        self.prompt_token_budget = settings.LLM_PROMPT_TOKEN_BUDGET
+        self.response_cache = get_response_cache()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get LLM engine, cache and token usage counters"""
+        return {
+            "engine": self.engine.get_stats(),
+            "routes": self.router.get_stats(),
+            "prompt_cache": prompt_cache.get_stats(),
+            "response_cache": self.response_cache.get_stats(),
+            "token_usage": self.usage.get_usage(),
+            "costs": self.cost_meter.get_usage()
+        }
+
+    async def _cached_call(self, method: str, character: Dict, payload: Any, compute, schema=None) -> Any:
+        """Serve a deterministic analysis call from the response cache
+
+        Structured results are cached as plain dicts and rebuilt into
+        `schema` on a hit.
+        """
+        key = self.response_cache.make_key(method, character, payload)
+        cached = await self.response_cache.get(key)
+        if cached is not None:
+            return schema.model_validate(cached) if schema else cached
 
-    def _build_character_context(self, character: Dict) -> str:
-        """Build detailed character context for prompts"""
-        return f"""
+        result = await compute()
+        await self.response_cache.set(key, result.model_dump() if schema else result)
+        return result
+
+    def _build_character_context(self, character: Dict, include_secondary: bool = True) -> str:
+        """Build detailed character context for prompts
+
+        Secondary sections (psychological profile, emotional intelligence,
+        cultural awareness) are the first to go when a prompt is over budget.
+        """
+        personality = character['personality']
+        context = f"""
         Character Profile - {character['name']}:
 
         Base Personality:
-        - Core Description: {character['personality']['base_personality']['core_description']}
-        - Key Traits: {', '.join(character['personality']['base_personality']['key_traits'])}
-        - Background: {character['personality']['base_personality']['background_story']}
-
-        Psychological Profile:
-        - Personality Type: {character['personality']['psychological_profile']['personality_type']}
-        - Cognitive Patterns: {', '.join(character['personality']['psychological_profile']['cognitive_patterns'])}
-        - Defense Mechanisms: {', '.join(character['personality']['psychological_profile']['defense_mechanisms'])}
-        - Adaptation Rate: {character['personality']['psychological_profile']['adaptation_rate']}
+        - Core Description: {personality['base_personality']['core_description']}
+        - Key Traits: {', '.join(personality['base_personality']['key_traits'])}
+        - Background: {personality['base_personality']['background_story']}
 
         Speech Patterns:
-        - Style: {character['personality']['speech_patterns']['style']}
-        - Tone: {character['personality']['speech_patterns']['tone']}
-        - Formality Level: {character['personality']['speech_patterns']['formality_level']}
-        - Common Phrases: {', '.join(character['personality']['speech_patterns']['common_phrases'])}
+        - Style: {personality['speech_patterns']['style']}
+        - Tone: {personality['speech_patterns']['tone']}
+        - Formality Level: {personality['speech_patterns']['formality_level']}
+        - Common Phrases: {', '.join(personality['speech_patterns']['common_phrases'])}
+        """
+
+        if include_secondary:
+            context += f"""
+        Psychological Profile:
+        - Personality Type: {personality['psychological_profile']['personality_type']}
+        - Cognitive Patterns: {', '.join(personality['psychological_profile']['cognitive_patterns'])}
+        - Defense Mechanisms: {', '.join(personality['psychological_profile']['defense_mechanisms'])}
+        - Adaptation Rate: {personality['psychological_profile']['adaptation_rate']}
 
         Emotional Intelligence:
-        - Empathy Level: {character['personality']['emotional_intelligence']['empathy_level']}
-        - Emotional Awareness: {character['personality']['emotional_intelligence']['emotional_awareness']}
-        - Social Perception: {character['personality']['emotional_intelligence']['social_perception']}
+        - Empathy Level: {personality['emotional_intelligence']['empathy_level']}
+        - Emotional Awareness: {personality['emotional_intelligence']['emotional_awareness']}
+        - Social Perception: {personality['emotional_intelligence']['social_perception']}
 
         Cultural Awareness:
-        - Known Cultures: {', '.join(character['personality']['cultural_awareness']['known_cultures'])}
-        - Cultural Sensitivity: {character['personality']['cultural_awareness']['cultural_sensitivity']}
-        - Taboo Topics: {', '.join(character['personality']['cultural_awareness']['taboo_topics'])}
+        - Known Cultures: {', '.join(personality['cultural_awareness']['known_cultures'])}
+        - Cultural Sensitivity: {personality['cultural_awareness']['cultural_sensitivity']}
+        - Taboo Topics: {', '.join(personality['cultural_awareness']['taboo_topics'])}
+        """
 
+        context += f"""
         Ethical Framework:
-        - Moral Values: {character['personality']['ethical_framework']['moral_values']}
-        - Ethical Boundaries: {', '.join(character['personality']['ethical_framework']['ethical_boundaries'])}
-        - Content Restrictions: {', '.join(character['personality']['ethical_framework']['content_restrictions'])}
+        - Moral Values: {personality['ethical_framework']['moral_values']}
+        - Ethical Boundaries: {', '.join(personality['ethical_framework']['ethical_boundaries'])}
+        - Content Restrictions: {', '.join(personality['ethical_framework']['content_restrictions'])}
 
         Knowledge & Values:
-        - Knowledge Areas: {', '.join(character['personality']['knowledge_base'])}
-        - Core Values: {', '.join(character['personality']['core_values'])}
+        - Knowledge Areas: {', '.join(personality['knowledge_base'])}
+        - Core Values: {', '.join(personality['core_values'])}
         """
+        return context
+
+    def _build_system_prefix(self,
+                             character: Dict,
+                             response_type: str,
+                             include_secondary: bool = True) -> str:
+        """Build the static system part of a character prompt"""
+        character_context = self._build_character_context(character, include_secondary)
+
+        # Add specific context based on response type
+        if response_type == "tweet":
+            specific_context = self._build_tweet_context(character)
+        elif response_type == "reply":
+            specific_context = self._build_reply_context(character)
+        else:
+            specific_context = ""
 
-    async def generate_response(self, 
-                              prompt: str, 
-                              character: Dict, 
-                              context: Dict = None, 
-                              response_type: str = "general") -> str:
-        """Generate a response considering full character profile"""
-        try:
-            # Build complete context
-            character_context = self._build_character_context(character)
-            
-            # Add specific context based on response type
-            if response_type == "tweet":
-                specific_context = self._build_tweet_context(character)
-            elif response_type == "reply":
-                specific_context = self._build_reply_context(character)
-            else:
-                specific_context = ""
+        return f"""
+        {character_context}
 
-            # Build full prompt
-            full_prompt = f"""
-            {character_context}
+        {specific_context}
 
-            {specific_context}
+        Generate responses that are completely consistent with the character's personality, traits, and values.
+        Consider all aspects of the character's profile when crafting a response.
+        """
 
-            Additional Context:
-            {json.dumps(context) if context else "No additional context"}
+    def _get_system_prefix(self,
+                           character: Dict,
+                           response_type: str,
+                           include_secondary: bool = True) -> str:
+        """Get the cached system prefix for a character"""
+        kind = response_type if include_secondary else f"{response_type}:compact"
+        return prompt_cache.get_or_build(
+            character,
+            kind,
+            lambda: self._build_system_prefix(character, response_type, include_secondary)
+        )
+
+    def _build_task_prompt(self, prompt: str, context_text: str, recent_tweets: List[str]) -> str:
+        """Build the per-call user message"""
+        recent_section = ""
+        if recent_tweets:
+            recent_section = f"""
+            Character's recent tweets to avoid repetition:
+            {recent_tweets}
+            """
 
+        return f"""
+            Additional Context:
+            {context_text or "No additional context"}
+            {recent_section}
             Task:
             {prompt}
-
-            Generate a response that is completely consistent with the character's personality, traits, and values.
-            Consider all aspects of the character's profile when crafting the response.
             """
 
+    def _fit_prompt_budget(self,
+                           prompt: str,
+                           character: Dict,
+                           context: Optional[Dict],
+                           response_type: str,
+                           recent_tweets: Optional[List[str]]) -> List[str]:
+        """
+        Build system and user prompts that fit the token budget
+
+        Sections are trimmed in a fixed priority order: additional context,
+        then recent tweets (oldest first), then the secondary personality
+        sections of the system prompt. The task itself is never trimmed.
+
+        Returns:
+            list: [system_prompt, user_prompt]
+        """
+        budget = self.prompt_token_budget
+        system_prompt = self._get_system_prefix(character, response_type)
+        context_text = json.dumps(context) if context else ""
+        recent_tweets = list(recent_tweets or [])
+
+        def total(system: str, user: str) -> int:
+            return self.tokens.count(system) + self.tokens.count(user)
+
+        user_prompt = self._build_task_prompt(prompt, context_text, recent_tweets)
+        overflow = total(system_prompt, user_prompt) - budget
+        if overflow <= 0:
+            return [system_prompt, user_prompt]
+
+        # 1. Additional context
+        if context_text:
+            context_text = self.tokens.truncate(
+                context_text,
+                self.tokens.count(context_text) - overflow
+            )
+            user_prompt = self._build_task_prompt(prompt, context_text, recent_tweets)
+            overflow = total(system_prompt, user_prompt) - budget
+
+        # 2. Recent tweets
+        while overflow > 0 and recent_tweets:
+            recent_tweets.pop()
+            user_prompt = self._build_task_prompt(prompt, context_text, recent_tweets)
+            overflow = total(system_prompt, user_prompt) - budget
+
+        # 3. Secondary personality fields
+        if overflow > 0:
+            system_prompt = self._get_system_prefix(character, response_type, include_secondary=False)
+            overflow = total(system_prompt, user_prompt) - budget
+            if overflow > 0:
+                print(f"Warning: prompt for {character.get('name')} is {overflow} tokens over budget")
+
+        return [system_prompt, user_prompt]
+
+    async def generate_response(self, 
+                              prompt: str, 
+                              character: Dict, 
+                              context: Dict = None, 
+                              response_type: str = "general",
+                              recent_tweets: List[str] = None) -> str:
+        """Generate a response considering full character profile"""
+        try:
+            # Static character profile goes first as a stable system message
+            # so it is built once per character version and can be cached upstream
+            system_prompt, full_prompt = self._fit_prompt_budget(
+                prompt, character, context, response_type, recent_tweets
+            )
+
             # Get response from OpenAI
-            response = await self.generate(full_prompt)
+            response = await self.generate(
+                full_prompt,
+                system_prompt=system_prompt,
+                call_type=response_type,
+                character_id=prompt_cache.character_id(character)
+            )
             return response
 
         except Exception as e:
@@ -151,9 +406,60 @@ class ChatGPTClient:
         - Response Patterns: {character['personality']['behavioral_patterns']['response_patterns']}
         """
 
-    async def generate_tweet(self, character: Dict, context: Dict = None) -> str:
-        """Generate a tweet based on character's personality"""
-        prompt = f"""
+    async def generate_tweet(self, character: Dict, context: Dict = None, n: int = None) -> str:
+        """Generate a tweet based on character's personality
+
+        With n > 1 the candidates are sampled in one API call and the best
+        one is picked locally by content filter, novelty and length.
+        """
+        ranked = await self.generate_tweet_candidates(character, context, n)
+        if not ranked:
+            return ""
+        if not ranked[0]["passed"]:
+            print(f"Warning: no tweet candidate for {character.get('name')} passed the content filter")
+        return ranked[0]["text"]
+
+    async def generate_tweet_candidates(self,
+                                        character: Dict,
+                                        context: Dict = None,
+                                        n: int = None) -> List[Dict[str, Any]]:
+        """
+        Generate tweet candidates ranked best first
+
+        Callers that reject the top pick (e.g. as a near-duplicate) can fall
+        back to the next candidate instead of paying for another call.
+
+        Returns:
+            list: Dicts with text, score and passed (content filter result)
+        """
+        n = n or settings.TWEET_CANDIDATES
+        prompt = self._build_tweet_task(character)
+        # Repetition is caught locally by the near-duplicate index before
+        # posting, so recent tweets are only used for ranking, not sent
+        recent_tweets = character.get('recent_tweets')
+        if n <= 1:
+            response = await self.generate_response(prompt, character, context, "tweet")
+            return self.candidate_ranker.rank([clean_tweet(response)], character, recent_tweets)
+
+        system_prompt, full_prompt = self._fit_prompt_budget(
+            prompt, character, context, "tweet", None
+        )
+        candidates = await self.generate_candidates(
+            full_prompt,
+            system_prompt=system_prompt,
+            call_type="tweet",
+            character_id=prompt_cache.character_id(character),
+            n=n
+        )
+        return self.candidate_ranker.rank(
+            [clean_tweet(candidate) for candidate in candidates],
+            character,
+            recent_tweets
+        )
+
+    def _build_tweet_task(self, character: Dict) -> str:
+        """Task prompt for a new tweet"""
+        return f"""
         As {character['name']}, create a unique and natural tweet. 
         
         Important rules:
@@ -168,24 +474,8 @@ class ChatGPTClient:
         9. Vary emotional tones within character's range
         10. Make it feel like a real person's spontaneous thought
         
-        Character's recent tweets to avoid repetition:
-        {character.get('recent_tweets', ['No recent tweets'])}
-        
         Return ONLY the tweet text, without any formatting or additional text.
         """
-        print(prompt)
-        response = await self.generate_response(prompt, character, context, "tweet")
-        
-        # Clean up response
-        if isinstance(response, str):
-            tweet = response.strip()
-        else:
-            tweet = response.get('content', '').strip()
-        
-        tweet = re.sub(r'^(Tweet:|"|\')*\s*', '', tweet)
-        tweet = re.sub(r'("|\')*$', '', tweet)
-        
-        return tweet
 
     async def generate_reply(self, character, content: str, user_name: str) -> str:
         """Generate a reply to a tweet"""
@@ -193,29 +483,89 @@ class ChatGPTClient:
         if hasattr(character, 'dict'):
             character = character.dict()
         
-        prompt = f"""
+        return await self.generate_response(self._build_reply_prompt(content), character, None, "reply")
+
+    def _build_reply_prompt(self, content: str) -> str:
+        """Task prompt for a reply to a tweet"""
+        return f"""
         Original Tweet: {content}
 
         Generate a reply that this character would naturally make to this tweet.
         Consider their personality, interaction style, and the context of the original tweet.
         """
-        return await self.generate_response(prompt, character, None, "reply")
 
-    async def generate(self, prompt: str, system_prompt: str = None) -> str:
-        """Generate a response from ChatGPT"""
-        try:
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
+    async def stream_tweet(self, character: Dict, context: Dict = None) -> AsyncIterator[str]:
+        """Stream a single tweet completion as text deltas"""
+        async for delta in self.stream_response(self._build_tweet_task(character), character, context, "tweet"):
+            yield delta
+
+    async def stream_reply(self, character, content: str, user_name: str) -> AsyncIterator[str]:
+        """Stream a reply completion as text deltas"""
+        if hasattr(character, 'dict'):
+            character = character.dict()
+        async for delta in self.stream_response(self._build_reply_prompt(content), character, None, "reply"):
+            yield delta
+
+    async def stream_response(self,
+                              prompt: str,
+                              character: Dict,
+                              context: Dict = None,
+                              response_type: str = "general") -> AsyncIterator[str]:
+        """
+        Stream a character response as text deltas
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+        Closing the generator early stops the upstream completion; usage is
+        recorded for whatever was generated up to that point.
+        """
+        system_prompt, full_prompt = self._fit_prompt_budget(
+            prompt, character, context, response_type, None
+        )
+        character_id = prompt_cache.character_id(character)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": full_prompt}
+        ]
+        route = await self._route(response_type, character_id)
+
+        chunks = []
+        started = time.perf_counter()
+        try:
+            async for delta in self.engine.stream(
                 messages=messages,
-                temperature=0.7
-            )
+                model=route.model,
+                temperature=route.temperature,
+                max_tokens=route.max_tokens,
+                call_type=response_type,
+                character_id=character_id,
+                estimated_tokens=self.tokens.count_messages(messages) + (route.max_tokens or 0)
+            ):
+                chunks.append(delta)
+                yield delta
+        except Exception:
+            self.router.record(response_type, route.model, 0.0, error=True)
+            raise
+        finally:
+            if chunks:
+                prompt_tokens = self.tokens.count_messages(messages)
+                completion_tokens = self.tokens.count("".join(chunks))
+                await self._record_usage(
+                    character_id,
+                    response_type,
+                    route.model,
+                    (time.perf_counter() - started) * 1000,
+                    prompt_tokens,
+                    completion_tokens
+                )
 
-            content = response.choices[0].message.content.strip()
+    async def generate(self,
+                       prompt: str,
+                       system_prompt: str = None,
+                       call_type: str = "general",
+                       character_id: str = None) -> str:
+        """Generate a response from ChatGPT"""
+        try:
+            response = await self._complete(prompt, system_prompt, call_type, character_id)
+            content = response.content
 
             # Tweet için özel durum
             if "Tweet:" in content or content.startswith('"'):
@@ -234,6 +584,106 @@ class ChatGPTClient:
             traceback.print_exc()
             raise
 
+    async def generate_structured(self,
+                                  prompt: str,
+                                  schema: Type[T],
+                                  system_prompt: str = None,
+                                  call_type: str = "analysis",
+                                  character_id: str = None) -> T:
+        """
+        Generate a response validated against a pydantic schema
+
+        The provider is asked for a JSON object; fenced, wrapped or truncated
+        JSON is repaired locally instead of re-requesting.
+
+        Raises:
+            StructuredOutputError: The completion could not be recovered
+        """
+        prompt = f"{prompt}\n\n{schema_instructions(schema)}"
+        response = await self._complete(prompt, system_prompt, call_type, character_id, json_mode=True)
+        return parse_structured(response.content, schema)
+
+    async def generate_candidates(self,
+                                  prompt: str,
+                                  system_prompt: str = None,
+                                  call_type: str = "general",
+                                  character_id: str = None,
+                                  n: int = 1) -> List[str]:
+        """Sample n completions for the same prompt in a single API call"""
+        response = await self._complete(prompt, system_prompt, call_type, character_id, n)
+        return response.choices or [response.content]
+
+    async def _complete(self,
+                        prompt: str,
+                        system_prompt: Optional[str],
+                        call_type: str,
+                        character_id: Optional[str],
+                        n: int = 1,
+                        json_mode: bool = False) -> LLMResponse:
+        """Send one routed request through the engine and record its usage"""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        route = await self._route(call_type, character_id)
+        try:
+            response = await self.engine.complete(
+                messages=messages,
+                model=route.model,
+                temperature=route.temperature,
+                max_tokens=route.max_tokens,
+                call_type=call_type,
+                character_id=character_id,
+                estimated_tokens=self.tokens.count_messages(messages) + (route.max_tokens or 0) * n,
+                n=n,
+                json_mode=json_mode
+            )
+        except Exception:
+            self.router.record(call_type, route.model, 0.0, error=True)
+            raise
+
+        # Prefer provider-reported usage, fall back to local counts.
+        # Coalesced responses cost nothing upstream.
+        if not response.shared:
+            prompt_tokens = response.prompt_tokens or self.tokens.count_messages(messages)
+            completion_tokens = response.completion_tokens or sum(
+                self.tokens.count(choice) for choice in response.choices or [response.content]
+            )
+            await self._record_usage(
+                character_id,
+                call_type,
+                route.model,
+                response.latency_ms,
+                prompt_tokens,
+                completion_tokens
+            )
+        return response
+
+    async def _route(self, call_type: str, character_id: Optional[str]) -> ModelRoute:
+        """Route a call, applying the character's budget
+
+        Raises:
+            BudgetExceededError: The character may not generate right now
+        """
+        route = self.router.route(call_type)
+        model = await self.cost_meter.check(character_id, route.model)
+        if model != route.model:
+            route = route.model_copy(update={"model": model})
+        return route
+
+    async def _record_usage(self,
+                            character_id: Optional[str],
+                            call_type: str,
+                            model: str,
+                            latency_ms: float,
+                            prompt_tokens: int,
+                            completion_tokens: int) -> None:
+        """Attribute tokens and estimated cost to the route and the character"""
+        cost = self.router.record(call_type, model, latency_ms, prompt_tokens, completion_tokens)
+        self.usage.record(character_id, call_type, prompt_tokens, completion_tokens, cost)
+        await self.cost_meter.record(character_id, call_type, model, prompt_tokens, completion_tokens, cost)
+
     async def suggest_personality_improvements(self, current_personality: Dict) -> Dict:
         """Suggest improvements for personality traits"""
         try:
@@ -251,7 +701,8 @@ class ChatGPTClient:
 
             response = await self.generate(
                 prompt=f"Current personality: {json.dumps(current_personality, indent=2)}",
-                system_prompt=system_prompt
+                system_prompt=system_prompt,
+                call_type="personality"
             )
 
             return response
@@ -325,7 +776,7 @@ class ChatGPTClient:
     async def analyze_interaction(self, 
                                 character: dict,
                                 interaction: dict,
-                                interaction_type: str) -> Dict[str, Any]:
+                                interaction_type: str) -> InteractionDecision:
         """
         Analyze an interaction and decide how to respond
         
@@ -335,19 +786,24 @@ class ChatGPTClient:
             interaction_type: Type of interaction (reply, mention, dm, etc)
             
         Returns:
-            dict: Decision on how to respond including:
+            InteractionDecision: Decision on how to respond including:
                 - action: What action to take (reply, like, retweet, ignore)
                 - priority: Priority level of response
                 - response_text: Generated response text if needed
                 - reasoning: Explanation of decision
         """
         prompt = self._build_interaction_prompt(character, interaction, interaction_type)
-        return await self.generate(prompt)
+        return await self.generate_structured(
+            prompt,
+            InteractionDecision,
+            call_type="analysis",
+            character_id=prompt_cache.character_id(character)
+        )
 
     async def evaluate_content(self,
                              character: dict, 
                              content: dict,
-                             content_type: str) -> Dict[str, Any]:
+                             content_type: str) -> ContentEvaluation:
         """
         Evaluate content to determine engagement action
         
@@ -357,18 +813,23 @@ class ChatGPTClient:
             content_type: Type of content (tweet, trend, news)
             
         Returns:
-            dict: Evaluation results including:
+            ContentEvaluation: Evaluation results including:
                 - relevance_score: How relevant the content is (0-1)
                 - recommended_action: Suggested action (engage, ignore)
                 - engagement_type: How to engage (like, retweet, reply)
                 - reasoning: Explanation of evaluation
         """
         prompt = self._build_evaluation_prompt(character, content, content_type)
-        return await self.generate(prompt)
+        return await self.generate_structured(
+            prompt,
+            ContentEvaluation,
+            call_type="analysis",
+            character_id=prompt_cache.character_id(character)
+        )
 
     async def plan_actions(self,
                           character: dict,
-                          context: dict) -> List[Dict[str, Any]]:
+                          context: dict) -> List[PlannedAction]:
         """
         Plan autonomous actions for character
         
@@ -384,12 +845,17 @@ class ChatGPTClient:
             list: Planned actions with timing and priority
         """
         prompt = self._build_planning_prompt(character, context)
-        response = await self.generate(prompt)
-        return response.get("planned_actions", [])
+        plan = await self.generate_structured(
+            prompt,
+            ActionPlan,
+            call_type="analysis",
+            character_id=prompt_cache.character_id(character)
+        )
+        return plan.planned_actions
 
     async def analyze_trend(self,
                           character: dict,
-                          trend: dict) -> Dict[str, Any]:
+                          trend: dict) -> TrendAnalysis:
         """
         Analyze a trending topic and decide how to engage
         
@@ -398,18 +864,29 @@ class ChatGPTClient:
             trend: Trend data including volume, sentiment, related content
             
         Returns:
-            dict: Analysis including:
-                - relevance: How relevant the trend is to character
+            TrendAnalysis: Analysis including:
+                - relevance_score: How relevant the trend is to character
                 - engagement_approach: How to engage with trend
                 - risks: Potential risks of engagement
                 - content_suggestions: Ideas for content
         """
         prompt = self._build_trend_analysis_prompt(character, trend)
-        return await self.generate(prompt)
+        return await self._cached_call(
+            "analyze_trend",
+            character,
+            trend,
+            lambda: self.generate_structured(
+                prompt,
+                TrendAnalysis,
+                call_type="analysis",
+                character_id=prompt_cache.character_id(character)
+            ),
+            schema=TrendAnalysis
+        )
 
     async def perform_emotion_analysis(self,
                                     character: dict,
-                                    content: dict) -> Dict[str, Any]:
+                                    content: dict) -> EmotionAnalysis:
         """
         Analyze emotional content and determine appropriate emotional response
         
@@ -418,64 +895,167 @@ class ChatGPTClient:
             content: Content to analyze
             
         Returns:
-            dict: Emotional analysis including:
+            EmotionAnalysis: Emotional analysis including:
                 - detected_emotions: Emotions found in content
                 - emotional_impact: Impact on character
                 - recommended_response: Emotional tone for response
                 - intensity: Recommended intensity of response
         """
         prompt = self._build_emotion_analysis_prompt(character, content)
-        return await self.generate(prompt)
+        return await self._cached_call(
+            "perform_emotion_analysis",
+            character,
+            content,
+            lambda: self.generate_structured(
+                prompt,
+                EmotionAnalysis,
+                call_type="analysis",
+                character_id=prompt_cache.character_id(character)
+            ),
+            schema=EmotionAnalysis
+        )
 
     async def evaluate_ethical_implications(self,
                                          character: dict,
-                                         action: dict) -> Dict[str, Any]:
+                                         action: dict) -> EthicalEvaluation:
         """
         Evaluate ethical implications of potential actions
+
+        Failures (including unrecoverable output) are not approved.
         """
         try:
-            prompt = self._build_ethical_evaluation_prompt(character, action)
-            
-            response = await self.generate(prompt=prompt)
-            
-            # Ensure we have a dictionary response
-            if isinstance(response, str):
-                try:
-                    # Try to parse if it's a JSON string
-                    import json
-                    return json.loads(response)
-                except json.JSONDecodeError:
-                    # If not JSON, create a structured response
-                    return {
-                        "alignment_score": 0.5,  # Default middle score
-                        "ethical_concerns": ["Unable to parse detailed analysis"],
-                        "recommendation": response[:100],  # Use first part of response as recommendation
-                        "reasoning": response
-                    }
-                    
-            return response
+            return await self._cached_call(
+                "evaluate_ethical_implications",
+                character,
+                action,
+                lambda: self._evaluate_ethical_implications(character, action),
+                schema=EthicalEvaluation
+            )
             
         except Exception as e:
             print(f"Error in ethical evaluation: {str(e)}")
-            return {
-                "alignment_score": 0,
-                "ethical_concerns": [f"Error during evaluation: {str(e)}"],
-                "recommendation": "Unable to evaluate",
-                "reasoning": "An error occurred during ethical evaluation"
-            }
+            return EthicalEvaluation(
+                alignment_score=0,
+                ethical_concerns=[f"Error during evaluation: {str(e)}"],
+                recommendation="Unable to evaluate",
+                reasoning="An error occurred during ethical evaluation",
+                approved=False
+            )
 
-    async def analyze_content(self, content: str, character: Dict) -> Dict[str, Any]:
+    async def _evaluate_ethical_implications(self, character: dict, action: dict) -> EthicalEvaluation:
+        """Run an uncached ethical evaluation"""
+        prompt = self._build_ethical_evaluation_prompt(character, action)
+        return await self.generate_structured(
+            prompt,
+            EthicalEvaluation,
+            call_type="ethics",
+            character_id=prompt_cache.character_id(character)
+        )
+
+    async def analyze_content(self, content: str, character: Dict) -> ContentEvaluation:
         """Analyze content for relevance and engagement potential"""
         try:
-            prompt = self._build_content_analysis_prompt(character, json.loads(content))
+            prompt = await self._build_content_analysis_prompt(character, json.loads(content))
             
-            response = await self.generate(prompt=prompt)
-            return response
+            return await self._cached_call(
+                "analyze_content",
+                character,
+                content,
+                lambda: self.generate_structured(
+                    prompt,
+                    ContentEvaluation,
+                    call_type="analysis",
+                    character_id=prompt_cache.character_id(character)
+                ),
+                schema=ContentEvaluation
+            )
             
         except Exception as e:
             print(f"Error analyzing content: {str(e)}")
             raise
 
+    def _build_relevance_system_prompt(self, character: Dict) -> str:
+        """Build the static system prompt for relevance scoring"""
+        personality = character.get('personality', {})
+        twitter_behavior = character.get('twitter_behavior', {})
+        knowledge = [
+            k['topic'] if isinstance(k, dict) else str(k)
+            for k in personality.get('knowledge_base', [])
+        ]
+        return f"""
+        You score tweets for how relevant they are to {character.get('name')}.
+
+        Character Profile:
+        - Core Description: {personality.get('base_personality', {}).get('core_description', '')}
+        - Content Focus: {', '.join(twitter_behavior.get('content_focus', []))}
+        - Knowledge Areas: {', '.join(knowledge)}
+        - Core Values: {', '.join(personality.get('core_values', []))}
+
+        For every tweet you receive, return scores between 0 and 1:
+        - topic_relevance: How close the tweet is to the character's interests
+        - sentiment_match: How well its tone fits the character
+        - engagement_potential: How worthwhile engaging with it would be
+
+        Respond with a JSON object only, in the form:
+        {{"scores": [{{"id": "<tweet id>", "topic_relevance": 0.0, "sentiment_match": 0.0, "engagement_potential": 0.0}}]}}
+        """
+
+    async def _score_tweet_batch(self, character: Dict, tweets: List[Dict]) -> Dict[str, Dict[str, float]]:
+        """Score one batch of tweets in a single request"""
+        system_prompt = prompt_cache.get_or_build(
+            character,
+            "relevance",
+            lambda: self._build_relevance_system_prompt(character)
+        )
+        prompt = "Tweets:\n" + json.dumps(
+            [{"id": tweet["id_str"], "text": tweet.get("text", "")} for tweet in tweets],
+            indent=2
+        )
+
+        response = await self.generate_structured(
+            prompt,
+            RelevanceScores,
+            system_prompt=system_prompt,
+            call_type="analysis",
+            character_id=prompt_cache.character_id(character)
+        )
+        return {entry.id: entry.model_dump(exclude={"id"}) for entry in response.scores}
+
+    async def score_tweets(self,
+                           character: Dict,
+                           tweets: List[Dict],
+                           batch_size: int = None) -> Dict[str, Dict[str, float]]:
+        """
+        Score many tweets for relevance with as few requests as possible
+
+        Tweets are split into batches of `batch_size` which are scored
+        concurrently. A failed batch scores its tweets as 0 instead of
+        failing the whole call.
+
+        Returns:
+            dict: tweet id -> topic_relevance, sentiment_match, engagement_potential
+        """
+        batch_size = batch_size or settings.RELEVANCE_BATCH_SIZE
+        batches = [tweets[i:i + batch_size] for i in range(0, len(tweets), batch_size)]
+
+        results = await asyncio.gather(
+            *[self._score_tweet_batch(character, batch) for batch in batches],
+            return_exceptions=True
+        )
+
+        scores = {}
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                print(f"Error scoring tweet batch: {str(result)}")
+                result = {}
+            for tweet in batch:
+                scores[tweet["id_str"]] = result.get(tweet["id_str"], {
+                    "topic_relevance": 0.0,
+                    "sentiment_match": 0.0,
+                    "engagement_potential": 0.0
+                })
+        return scores
+
     def _build_interaction_prompt(self, 
                                 character: dict,
                                 interaction: dict,
@@ -678,540 +1258,523 @@ class ChatGPTClient:
             return super().default(obj)
 
     async def generate_personality(self, prompt: str, character_name: str) -> PersonalityTraits:
-        """Generate personality traits using ChatGPT"""
+        """
+        Generate personality traits using ChatGPT
+
+        Every section of the profile is requested separately and all of
+        them run concurrently. Sections that fail to generate or validate
+        are requested again, up to PERSONALITY_SECTION_ATTEMPTS, while the
+        sections that already succeeded are kept.
+        """
+        sections = {}
+        pending = list(PERSONALITY_SECTIONS)
+        for attempt in range(max(settings.PERSONALITY_SECTION_ATTEMPTS, 1)):
+            results = await asyncio.gather(
+                *[self._generate_personality_section(prompt, character_name, section) for section in pending],
+                return_exceptions=True
+            )
+            failed = []
+            for section, result in zip(pending, results):
+                if isinstance(result, Exception):
+                    print(f"Personality section {section} failed (attempt {attempt + 1}): {str(result)}")
+                    failed.append(section)
+                else:
+                    sections[section] = result
+            pending = failed
+            if not pending:
+                break
+
+        if pending:
+            raise ValueError(f"Could not generate personality sections: {', '.join(pending)}")
+
         try:
-            system_prompt = """Create a detailed character personality profile following this exact structure:
-            {
-                "base_personality": {
-                    "core_description": "string",
-                    "background_story": "string",
-                    "key_traits": ["string"],
-                    "origin_story": "string",
-                    "defining_characteristics": ["string"]
-                },
-                "psychological_profile": {
-                    "personality_type": "string",
-                    "cognitive_patterns": ["string"],
-                    "defense_mechanisms": ["string"],
-                    "psychological_needs": ["string"],
-                    "motivation_factors": ["string"],
-                    "growth_potential": {"key": float},
-                    "adaptation_rate": float,
-                    "stress_responses": {"key": "string"}
-                },
-                "speech_patterns": {
-                    "style": "string",
-                    "common_phrases": ["string"],
-                    "vocabulary_preferences": ["string"],
-                    "linguistic_quirks": ["string"],
-                    "communication_patterns": {"key": ["string"]},
-                    "formality_spectrum": {"casual": float, "formal": float},
-                    "formality_level": float,
-                    "tone": "string",
-                    "vocabulary_level": float,
-                    "typical_expressions": ["string"],
-                    "language_quirks": ["string"],
-                    "emoji_usage": {"frequency": float, "preferred": ["string"]}
-                },
-                "emotional_intelligence": {
-                    "empathy_level": float,
-                    "emotional_awareness": float,
-                    "social_perception": float,
-                    "emotional_regulation": {"key": float},
-                    "interpersonal_skills": ["string"]
-                },
-                "cultural_awareness": {
-                    "known_cultures": ["string"],
-                    "cultural_sensitivity": float,
-                    "taboo_topics": ["string"],
-                    "cultural_preferences": {"key": float},
-                    "cultural_knowledge": ["string"]
-                },
-                "ethical_framework": {
-                    "moral_values": {"key": float},
-                    "ethical_boundaries": ["string"],
-                    "content_restrictions": ["string"],
-                    "sensitive_topics": {"key": float}
-                },
-                "behavioral_patterns": {
-                    "interaction_style": "string",
-                    "triggers": ["string"],
-                    "habits": ["string"],
-                    "preferences": {"key": "string"},
-                    "response_patterns": {"key": "string"},
-                    "social_adaptability": float,
-                    "decision_making_style": "string"
-                },
-                "language_capabilities": {
-                    "primary_language": "string",
-                    "other_languages": {"string": float},
-                    "translation_confidence": float,
-                    "cultural_expressions": {"string": ["string"]}
-                },
-                "opinion_system": {
-                    "core_beliefs": {"truth": float, "justice": float, "innovation": float},
-                    "opinion_strength": {"technology": float, "society": float, "environment": float},
-                    "persuadability": float,
-                    "opinion_expression_style": "string",
-                    "belief_update_rate": float
-                }
+            return self._build_personality(self._normalize_personality_sections(sections), prompt, character_name)
+        except Exception as e:
+            print(f"Error generating personality: {str(e)}")
+            print(f"Raw API Response: {json.dumps(sections, indent=2)}")
+            traceback.print_exc()
+            raise
+
+    async def _generate_personality_section(self, prompt: str, character_name: str, section: str) -> Dict[str, Any]:
+        """Generate and validate one section of a personality profile"""
+        system_prompt = f"""Create the "{section}" section of a detailed personality profile for {character_name}, following this exact structure:
+            {PERSONALITY_SECTIONS[section]}
+            All numeric values must be between 0 and 1. All fields must be present.
+            Respond with this JSON object only."""
+
+        response = await self._complete(
+            prompt,
+            system_prompt,
+            "personality",
+            None,
+            json_mode=True
+        )
+        data = repair_json(response.content)
+        if isinstance(data, dict) and isinstance(data.get(section), dict):
+            data = data[section]  # The model wrapped the section in its name
+        if not isinstance(data, dict) or not data:
+            raise ValueError(f"{section} is not a JSON object")
+
+        # Normalize and validate now, so a bad section is retried on its own
+        data = self._normalize_personality_sections({section: data})[section]
+        model = PERSONALITY_SECTION_MODELS.get(section)
+        if model is not None:
+            model(**data)
+        elif not data.get("core_description"):
+            raise ValueError(f"{section} is missing core_description")
+        return data
+
+    def _normalize_personality_sections(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Coerce generated sections into the model shapes and fill missing ones with defaults"""
+        # Behavioral patterns'ı düzelt
+        if "behavioral_patterns" in response:
+            behavioral = response["behavioral_patterns"]
+            
+            # preferences'ı düzelt
+            if "preferences" in behavioral:
+                new_preferences = {}
+                for key, value in behavioral["preferences"].items():
+                    # Eğer değer string ise, onu liste yap
+                    if isinstance(value, str):
+                        new_preferences[key.lower()] = [value]
+                    elif isinstance(value, list):
+                        new_preferences[key.lower()] = value
+                    else:
+                        new_preferences[key.lower()] = ["general"]
+                behavioral["preferences"] = new_preferences
+
+            # risk_tolerance ekle
+            if "risk_tolerance" not in behavioral:
+                behavioral["risk_tolerance"] = 0.5
+
+            response["behavioral_patterns"] = behavioral
+
+        # Varsayılan behavioral_patterns
+        if "behavioral_patterns" not in response:
+            response["behavioral_patterns"] = {
+                "interaction_style": "balanced",
+                "triggers": [],
+                "habits": [],
+                "preferences": {"topics": ["general"]},
+                "response_patterns": {},
+                "social_adaptability": 0.5,
+                "decision_making_style": "balanced",
+                "risk_tolerance": 0.5
             }
-            All numeric values must be between 0 and 1. All fields must be present."""
 
-            # İlk yanıtı al
-            response = await self.generate(prompt, system_prompt)
+        # EmotionalIntelligence için veri düzeltme
+        if "emotional_intelligence" in response:
+            ei = response["emotional_intelligence"]
             
-            # Behavioral patterns'ı düzelt
-            if "behavioral_patterns" in response:
-                behavioral = response["behavioral_patterns"]
-                
-                # preferences'ı düzelt
-                if "preferences" in behavioral:
-                    new_preferences = {}
-                    for key, value in behavioral["preferences"].items():
-                        # Eğer değer string ise, onu liste yap
-                        if isinstance(value, str):
-                            new_preferences[key.lower()] = [value]
-                        elif isinstance(value, list):
-                            new_preferences[key.lower()] = value
-                        else:
-                            new_preferences[key.lower()] = ["general"]
-                    behavioral["preferences"] = new_preferences
-
-                # risk_tolerance ekle
-                if "risk_tolerance" not in behavioral:
-                    behavioral["risk_tolerance"] = 0.5
-
-                response["behavioral_patterns"] = behavioral
-
-            # Varsayılan behavioral_patterns
-            if "behavioral_patterns" not in response:
-                response["behavioral_patterns"] = {
-                    "interaction_style": "balanced",
-                    "triggers": [],
-                    "habits": [],
-                    "preferences": {"topics": ["general"]},
-                    "response_patterns": {},
-                    "social_adaptability": 0.5,
-                    "decision_making_style": "balanced",
-                    "risk_tolerance": 0.5
+            # emotional_awareness'i düzelt
+            if isinstance(ei.get("emotional_awareness"), (int, float)):
+                ei["emotional_awareness"] = {
+                    "self": float(ei["emotional_awareness"]),
+                    "others": float(ei["emotional_awareness"]),
+                    "situation": float(ei["emotional_awareness"])
+                }
+            elif not isinstance(ei.get("emotional_awareness"), dict):
+                ei["emotional_awareness"] = {
+                    "self": 0.7,
+                    "others": 0.7,
+                    "situation": 0.7
                 }
 
-            # EmotionalIntelligence için veri düzeltme
-            if "emotional_intelligence" in response:
-                ei = response["emotional_intelligence"]
-                
-                # emotional_awareness'i düzelt
-                if isinstance(ei.get("emotional_awareness"), (int, float)):
-                    ei["emotional_awareness"] = {
-                        "self": float(ei["emotional_awareness"]),
-                        "others": float(ei["emotional_awareness"]),
-                        "situation": float(ei["emotional_awareness"])
-                    }
-                elif not isinstance(ei.get("emotional_awareness"), dict):
-                    ei["emotional_awareness"] = {
-                        "self": 0.7,
-                        "others": 0.7,
-                        "situation": 0.7
-                    }
-
-                # emotional_regulation'ı düzelt
-                if isinstance(ei.get("emotional_regulation"), dict):
-                    # Eğer dict ise ortalama değeri al
-                    values = [float(v) for v in ei["emotional_regulation"].values()]
-                    ei["emotional_regulation"] = sum(values) / len(values)
-                elif not isinstance(ei.get("emotional_regulation"), (int, float)):
-                    ei["emotional_regulation"] = 0.5
+            # emotional_regulation'ı düzelt
+            if isinstance(ei.get("emotional_regulation"), dict):
+                # Eğer dict ise ortalama değeri al
+                values = [float(v) for v in ei["emotional_regulation"].values()]
+                ei["emotional_regulation"] = sum(values) / len(values)
+            elif not isinstance(ei.get("emotional_regulation"), (int, float)):
+                ei["emotional_regulation"] = 0.5
 
-                # conflict_resolution_style'ı kontrol et
-                if "conflict_resolution_style" not in ei:
-                    ei["conflict_resolution_style"] = "balanced"
+            # conflict_resolution_style'ı kontrol et
+            if "conflict_resolution_style" not in ei:
+                ei["conflict_resolution_style"] = "balanced"
 
-                response["emotional_intelligence"] = ei
-            else:
-                # Varsayılan emotional_intelligence değerleri
-                response["emotional_intelligence"] = {
-                    "empathy_level": 0.5,
-                    "emotional_awareness": {
-                        "self": 0.7,
-                        "others": 0.7,
-                        "situation": 0.7
-                    },
-                    "social_perception": 0.5,
-                    "emotional_regulation": 0.5,
-                    "conflict_resolution_style": "balanced"
-                }
+            response["emotional_intelligence"] = ei
+        else:
+            # Varsayılan emotional_intelligence değerleri
+            response["emotional_intelligence"] = {
+                "empathy_level": 0.5,
+                "emotional_awareness": {
+                    "self": 0.7,
+                    "others": 0.7,
+                    "situation": 0.7
+                },
+                "social_perception": 0.5,
+                "emotional_regulation": 0.5,
+                "conflict_resolution_style": "balanced"
+            }
 
-            # CulturalAwareness için veri düzeltme
-            if "cultural_awareness" in response:
-                ca = response["cultural_awareness"]
-                
-                # Eksik alanları ekle
-                if "preferred_cultural_references" not in ca:
-                    # Eğer cultural_knowledge varsa, onu kullan
-                    if "cultural_knowledge" in ca:
-                        ca["preferred_cultural_references"] = ca["cultural_knowledge"]
-                    else:
-                        ca["preferred_cultural_references"] = []
+        # CulturalAwareness için veri düzeltme
+        if "cultural_awareness" in response:
+            ca = response["cultural_awareness"]
+            
+            # Eksik alanları ekle
+            if "preferred_cultural_references" not in ca:
+                # Eğer cultural_knowledge varsa, onu kullan
+                if "cultural_knowledge" in ca:
+                    ca["preferred_cultural_references"] = ca["cultural_knowledge"]
+                else:
+                    ca["preferred_cultural_references"] = []
 
-                if "social_norms_understanding" not in ca:
-                    ca["social_norms_understanding"] = {
-                        "online": 0.8,
-                        "offline": 0.7
-                    }
+            if "social_norms_understanding" not in ca:
+                ca["social_norms_understanding"] = {
+                    "online": 0.8,
+                    "offline": 0.7
+                }
 
-                # cultural_sensitivity'nin float olduğundan emin ol
-                if isinstance(ca.get("cultural_sensitivity"), (int, str)):
-                    ca["cultural_sensitivity"] = float(ca["cultural_sensitivity"])
+            # cultural_sensitivity'nin float olduğundan emin ol
+            if isinstance(ca.get("cultural_sensitivity"), (int, str)):
+                ca["cultural_sensitivity"] = float(ca["cultural_sensitivity"])
 
-                response["cultural_awareness"] = ca
-            else:
-                # Varsayılan cultural_awareness değerleri
-                response["cultural_awareness"] = {
-                    "known_cultures": ["Digital Culture"],
-                    "cultural_sensitivity": 0.7,
-                    "taboo_topics": [],
-                    "preferred_cultural_references": [],
-                    "social_norms_understanding": {
-                        "online": 0.8,
-                        "offline": 0.7
-                    }
+            response["cultural_awareness"] = ca
+        else:
+            # Varsayılan cultural_awareness değerleri
+            response["cultural_awareness"] = {
+                "known_cultures": ["Digital Culture"],
+                "cultural_sensitivity": 0.7,
+                "taboo_topics": [],
+                "preferred_cultural_references": [],
+                "social_norms_understanding": {
+                    "online": 0.8,
+                    "offline": 0.7
                 }
+            }
 
-            # LanguageCapabilities için veri düzeltme
-            if "language_capabilities" not in response:
-                response["language_capabilities"] = {
-                    "primary_language": "English",
-                    "other_languages": {"English": 1.0},
-                    "translation_confidence": 0.7,
-                    "cultural_expressions": {
-                        "formal": ["Greetings", "Thank you"],
-                        "casual": ["Hi", "Thanks"]
-                    }
+        # LanguageCapabilities için veri düzeltme
+        if "language_capabilities" not in response:
+            response["language_capabilities"] = {
+                "primary_language": "English",
+                "other_languages": {"English": 1.0},
+                "translation_confidence": 0.7,
+                "cultural_expressions": {
+                    "formal": ["Greetings", "Thank you"],
+                    "casual": ["Hi", "Thanks"]
                 }
-            else:
-                lang_cap = response["language_capabilities"]
-                # Eksik alanları doldur
-                if "primary_language" not in lang_cap:
-                    lang_cap["primary_language"] = "English"
-                if "other_languages" not in lang_cap:
-                    lang_cap["other_languages"] = {"English": 1.0}
-                if "translation_confidence" not in lang_cap:
-                    lang_cap["translation_confidence"] = 0.7
-                if "cultural_expressions" not in lang_cap:
-                    lang_cap["cultural_expressions"] = {
-                        "formal": ["Greetings", "Thank you"],
-                        "casual": ["Hi", "Thanks"]
-                    }
-                response["language_capabilities"] = lang_cap
+            }
+        else:
+            lang_cap = response["language_capabilities"]
+            # Eksik alanları doldur
+            if "primary_language" not in lang_cap:
+                lang_cap["primary_language"] = "English"
+            if "other_languages" not in lang_cap:
+                lang_cap["other_languages"] = {"English": 1.0}
+            if "translation_confidence" not in lang_cap:
+                lang_cap["translation_confidence"] = 0.7
+            if "cultural_expressions" not in lang_cap:
+                lang_cap["cultural_expressions"] = {
+                    "formal": ["Greetings", "Thank you"],
+                    "casual": ["Hi", "Thanks"]
+                }
+            response["language_capabilities"] = lang_cap
 
-            # EthicalFramework için veri düzeltme
-            if "ethical_framework" in response:
-                ef = response["ethical_framework"]
-                
-                # sensitive_topics'i düzelt
-                if "sensitive_topics" in ef:
-                    new_sensitive_topics = {}
-                    for topic, value in ef["sensitive_topics"].items():
-                        # Eğer değer float veya int ise, string açıklamaya çevir
-                        if isinstance(value, (float, int)):
-                            new_sensitive_topics[topic] = f"handle {topic} with sensitivity level {value}"
-                        else:
-                            new_sensitive_topics[topic] = str(value)
-                    ef["sensitive_topics"] = new_sensitive_topics
-                else:
-                    ef["sensitive_topics"] = {
-                        "human_superiority": "avoid discussing AI vs human superiority",
-                        "controversial_topics": "handle with care and neutrality"
-                    }
+        # EthicalFramework için veri düzeltme
+        if "ethical_framework" in response:
+            ef = response["ethical_framework"]
+            
+            # sensitive_topics'i düzelt
+            if "sensitive_topics" in ef:
+                new_sensitive_topics = {}
+                for topic, value in ef["sensitive_topics"].items():
+                    # Eğer değer float veya int ise, string açıklamaya çevir
+                    if isinstance(value, (float, int)):
+                        new_sensitive_topics[topic] = f"handle {topic} with sensitivity level {value}"
+                    else:
+                        new_sensitive_topics[topic] = str(value)
+                ef["sensitive_topics"] = new_sensitive_topics
+            else:
+                ef["sensitive_topics"] = {
+                    "human_superiority": "avoid discussing AI vs human superiority",
+                    "controversial_topics": "handle with care and neutrality"
+                }
 
-                # moral_values'u kontrol et
-                if not isinstance(ef.get("moral_values"), dict):
-                    ef["moral_values"] = {"honesty": 0.9, "fairness": 0.8}
+            # moral_values'u kontrol et
+            if not isinstance(ef.get("moral_values"), dict):
+                ef["moral_values"] = {"honesty": 0.9, "fairness": 0.8}
 
-                # Listeleri kontrol et
-                if not isinstance(ef.get("ethical_boundaries"), list):
-                    ef["ethical_boundaries"] = []
-                if not isinstance(ef.get("content_restrictions"), list):
-                    ef["content_restrictions"] = []
+            # Listeleri kontrol et
+            if not isinstance(ef.get("ethical_boundaries"), list):
+                ef["ethical_boundaries"] = []
+            if not isinstance(ef.get("content_restrictions"), list):
+                ef["content_restrictions"] = []
 
-                response["ethical_framework"] = ef
-            else:
-                # Varsayılan ethical_framework değerleri
-                response["ethical_framework"] = {
-                    "moral_values": {"honesty": 0.9, "fairness": 0.8},
-                    "ethical_boundaries": [],
-                    "content_restrictions": [],
-                    "sensitive_topics": {
-                        "human_superiority": "avoid discussing AI vs human superiority",
-                        "controversial_topics": "handle with care and neutrality"
-                    }
+            response["ethical_framework"] = ef
+        else:
+            # Varsayılan ethical_framework değerleri
+            response["ethical_framework"] = {
+                "moral_values": {"honesty": 0.9, "fairness": 0.8},
+                "ethical_boundaries": [],
+                "content_restrictions": [],
+                "sensitive_topics": {
+                    "human_superiority": "avoid discussing AI vs human superiority",
+                    "controversial_topics": "handle with care and neutrality"
                 }
+            }
 
-            # OpinionSystem için veri düzeltme
-            if "opinion_system" not in response:
-                response["opinion_system"] = {
-                    "core_beliefs": {
-                        "truth": 0.9,
-                        "justice": 0.8,
-                        "innovation": 0.7
-                    },
-                    "opinion_strength": {
-                        "technology": 0.8,
-                        "society": 0.7,
-                        "environment": 0.6
-                    },
-                    "persuadability": 0.5,
-                    "opinion_expression_style": "balanced",
-                    "belief_update_rate": 0.3
+        # OpinionSystem için veri düzeltme
+        if "opinion_system" not in response:
+            response["opinion_system"] = {
+                "core_beliefs": {
+                    "truth": 0.9,
+                    "justice": 0.8,
+                    "innovation": 0.7
+                },
+                "opinion_strength": {
+                    "technology": 0.8,
+                    "society": 0.7,
+                    "environment": 0.6
+                },
+                "persuadability": 0.5,
+                "opinion_expression_style": "balanced",
+                "belief_update_rate": 0.3
+            }
+        else:
+            os = response["opinion_system"]
+            # Eksik alanları doldur
+            if "core_beliefs" not in os:
+                os["core_beliefs"] = {
+                    "truth": 0.9,
+                    "justice": 0.8,
+                    "innovation": 0.7
                 }
-            else:
-                os = response["opinion_system"]
-                # Eksik alanları doldur
-                if "core_beliefs" not in os:
-                    os["core_beliefs"] = {
-                        "truth": 0.9,
-                        "justice": 0.8,
-                        "innovation": 0.7
-                    }
-                if "opinion_strength" not in os:
-                    os["opinion_strength"] = {
-                        "technology": 0.8,
-                        "society": 0.7,
-                        "environment": 0.6
-                    }
-                if "persuadability" not in os:
-                    os["persuadability"] = 0.5
-                if "opinion_expression_style" not in os:
-                    os["opinion_expression_style"] = "balanced"
-                if "belief_update_rate" not in os:
-                    os["belief_update_rate"] = 0.3
-
-                response["opinion_system"] = os
-
-            # EmotionalTraits için veri düzeltme
-            if "emotional_traits" not in response:
-                response["emotional_traits"] = {
-                    "default_state": "neutral",
-                    "emotional_range": 0.7,
-                    "emotional_stability": 0.6,
-                    "triggers": {
-                        "positive": "achievement, recognition",
-                        "negative": "disrespect, unfairness"
-                    },
-                    "expression_style": "balanced",
-                    "emotional_memory": {
-                        "retention": 0.7,
-                        "impact_duration": "medium",
-                        "processing_style": "analytical"
-                    },
-                    "coping_mechanisms": [
-                        "logical analysis",
-                        "positive reframing",
-                        "self-reflection"
-                    ]
+            if "opinion_strength" not in os:
+                os["opinion_strength"] = {
+                    "technology": 0.8,
+                    "society": 0.7,
+                    "environment": 0.6
                 }
-            else:
-                et = response["emotional_traits"]
-                
-                # Eksik alanları doldur
-                if "default_state" not in et:
-                    et["default_state"] = "neutral"
-                if "emotional_range" not in et:
-                    et["emotional_range"] = 0.7
-                if "emotional_stability" not in et:
-                    et["emotional_stability"] = 0.6
-                if "triggers" not in et:
-                    et["triggers"] = {
-                        "positive": "achievement, recognition",
-                        "negative": "disrespect, unfairness"
-                    }
-                if "expression_style" not in et:
-                    et["expression_style"] = "balanced"
-                if "emotional_memory" not in et:
-                    et["emotional_memory"] = {
-                        "retention": 0.7,
-                        "impact_duration": "medium",
-                        "processing_style": "analytical"
-                    }
-                if "coping_mechanisms" not in et:
-                    et["coping_mechanisms"] = [
-                        "logical analysis",
-                        "positive reframing",
-                        "self-reflection"
-                    ]
-
-                # Sayısal değerleri float'a dönüştür
-                if isinstance(et.get("emotional_range"), (int, str)):
-                    et["emotional_range"] = float(et["emotional_range"])
-                if isinstance(et.get("emotional_stability"), (int, str)):
-                    et["emotional_stability"] = float(et["emotional_stability"])
-
-                response["emotional_traits"] = et
-
-            # CharacterDevelopment için veri düzeltme
-            if "character_development" not in response:
-                response["character_development"] = {
-                    "growth_areas": ["social skills", "technical knowledge", "emotional intelligence"],
-                    "learning_style": "adaptive",
-                    "adaptation_rate": 0.7,
-                    "experience_processing": "analytical",
-                    "skill_development_focus": ["communication", "problem-solving", "creativity"],
-                    "memory_retention": {
-                        "short_term": 0.8,
-                        "long_term": 0.7,
-                        "experiential": 0.6
-                    },
-                    "development_goals": ["improve engagement", "expand knowledge", "refine responses"]
+            if "persuadability" not in os:
+                os["persuadability"] = 0.5
+            if "opinion_expression_style" not in os:
+                os["opinion_expression_style"] = "balanced"
+            if "belief_update_rate" not in os:
+                os["belief_update_rate"] = 0.3
+
+            response["opinion_system"] = os
+
+        # EmotionalTraits için veri düzeltme
+        if "emotional_traits" not in response:
+            response["emotional_traits"] = {
+                "default_state": "neutral",
+                "emotional_range": 0.7,
+                "emotional_stability": 0.6,
+                "triggers": {
+                    "positive": "achievement, recognition",
+                    "negative": "disrespect, unfairness"
+                },
+                "expression_style": "balanced",
+                "emotional_memory": {
+                    "retention": 0.7,
+                    "impact_duration": "medium",
+                    "processing_style": "analytical"
+                },
+                "coping_mechanisms": [
+                    "logical analysis",
+                    "positive reframing",
+                    "self-reflection"
+                ]
+            }
+        else:
+            et = response["emotional_traits"]
+            
+            # Eksik alanları doldur
+            if "default_state" not in et:
+                et["default_state"] = "neutral"
+            if "emotional_range" not in et:
+                et["emotional_range"] = 0.7
+            if "emotional_stability" not in et:
+                et["emotional_stability"] = 0.6
+            if "triggers" not in et:
+                et["triggers"] = {
+                    "positive": "achievement, recognition",
+                    "negative": "disrespect, unfairness"
                 }
-            else:
-                cd = response["character_development"]
-                
-                # Eksik alanları doldur
-                if "growth_areas" not in cd:
-                    cd["growth_areas"] = ["social skills", "technical knowledge", "emotional intelligence"]
-                if "learning_style" not in cd:
-                    cd["learning_style"] = "adaptive"
-                if "adaptation_rate" not in cd:
-                    cd["adaptation_rate"] = 0.7
-                if "experience_processing" not in cd:
-                    cd["experience_processing"] = "analytical"
-                if "skill_development_focus" not in cd:
-                    cd["skill_development_focus"] = ["communication", "problem-solving", "creativity"]
-                if "memory_retention" not in cd:
-                    cd["memory_retention"] = {
-                        "short_term": 0.8,
-                        "long_term": 0.7,
-                        "experiential": 0.6
-                    }
-                if "development_goals" not in cd:
-                    cd["development_goals"] = ["improve engagement", "expand knowledge", "refine responses"]
-
-                # Sayısal değerleri float'a dönüştür
-                if isinstance(cd.get("adaptation_rate"), (int, str)):
-                    cd["adaptation_rate"] = float(cd["adaptation_rate"])
-
-                response["character_development"] = cd
-
-            # ContentCreation için veri düzeltme
-            if "content_creation" not in response:
-                response["content_creation"] = {
-                    "preferred_topics": ["technology", "science", "culture"],
-                    "content_style": "informative",
-                    "creativity_level": 0.7,
-                    "innovation_tendency": 0.6,
-                    "research_depth": 0.8,
-                    "quality_standards": ["accuracy", "clarity", "relevance"],
-                    "audience_awareness": 0.7
+            if "expression_style" not in et:
+                et["expression_style"] = "balanced"
+            if "emotional_memory" not in et:
+                et["emotional_memory"] = {
+                    "retention": 0.7,
+                    "impact_duration": "medium",
+                    "processing_style": "analytical"
                 }
-            else:
-                cc = response["content_creation"]
-                
-                # Eksik alanları doldur
-                if "preferred_topics" not in cc:
-                    cc["preferred_topics"] = ["technology", "science", "culture"]
-                if "content_style" not in cc:
-                    cc["content_style"] = "informative"
-                if "creativity_level" not in cc:
-                    cc["creativity_level"] = 0.7
-                if "innovation_tendency" not in cc:
-                    cc["innovation_tendency"] = 0.6
-                if "research_depth" not in cc:
-                    cc["research_depth"] = 0.8
-                if "quality_standards" not in cc:
-                    cc["quality_standards"] = ["accuracy", "clarity", "relevance"]
-                if "audience_awareness" not in cc:
-                    cc["audience_awareness"] = 0.7
-
-                # Sayısal değerleri float'a dönüştür
-                for field in ["creativity_level", "innovation_tendency", "research_depth", "audience_awareness"]:
-                    if isinstance(cc.get(field), (int, str)):
-                        cc[field] = float(cc[field])
-
-                response["content_creation"] = cc
-
-            # HumorStyle için veri düzeltme
-            if "humor_style" not in response:
-                response["humor_style"] = {
-                    "humor_type": "witty",
-                    "joke_preferences": ["wordplay", "clever observations", "situational"],
-                    "sarcasm_usage": 0.4,
-                    "playfulness": 0.6,
-                    "meme_literacy": 0.7,
-                    "wit_style": "clever",
-                    "humor_triggers": ["irony", "absurdity", "unexpected connections"]
+            if "coping_mechanisms" not in et:
+                et["coping_mechanisms"] = [
+                    "logical analysis",
+                    "positive reframing",
+                    "self-reflection"
+                ]
+
+            # Sayısal değerleri float'a dönüştür
+            if isinstance(et.get("emotional_range"), (int, str)):
+                et["emotional_range"] = float(et["emotional_range"])
+            if isinstance(et.get("emotional_stability"), (int, str)):
+                et["emotional_stability"] = float(et["emotional_stability"])
+
+            response["emotional_traits"] = et
+
+        # CharacterDevelopment için veri düzeltme
+        if "character_development" not in response:
+            response["character_development"] = {
+                "growth_areas": ["social skills", "technical knowledge", "emotional intelligence"],
+                "learning_style": "adaptive",
+                "adaptation_rate": 0.7,
+                "experience_processing": "analytical",
+                "skill_development_focus": ["communication", "problem-solving", "creativity"],
+                "memory_retention": {
+                    "short_term": 0.8,
+                    "long_term": 0.7,
+                    "experiential": 0.6
+                },
+                "development_goals": ["improve engagement", "expand knowledge", "refine responses"]
+            }
+        else:
+            cd = response["character_development"]
+            
+            # Eksik alanları doldur
+            if "growth_areas" not in cd:
+                cd["growth_areas"] = ["social skills", "technical knowledge", "emotional intelligence"]
+            if "learning_style" not in cd:
+                cd["learning_style"] = "adaptive"
+            if "adaptation_rate" not in cd:
+                cd["adaptation_rate"] = 0.7
+            if "experience_processing" not in cd:
+                cd["experience_processing"] = "analytical"
+            if "skill_development_focus" not in cd:
+                cd["skill_development_focus"] = ["communication", "problem-solving", "creativity"]
+            if "memory_retention" not in cd:
+                cd["memory_retention"] = {
+                    "short_term": 0.8,
+                    "long_term": 0.7,
+                    "experiential": 0.6
                 }
-            else:
-                hs = response["humor_style"]
-                
-                # Eksik alanları doldur
-                if "humor_type" not in hs:
-                    hs["humor_type"] = "witty"
-                if "joke_preferences" not in hs:
-                    hs["joke_preferences"] = ["wordplay", "clever observations", "situational"]
-                if "sarcasm_usage" not in hs:
-                    hs["sarcasm_usage"] = 0.4
-                if "playfulness" not in hs:
-                    hs["playfulness"] = 0.6
-                if "meme_literacy" not in hs:
-                    hs["meme_literacy"] = 0.7
-                if "wit_style" not in hs:
-                    hs["wit_style"] = "clever"
-                if "humor_triggers" not in hs:
-                    hs["humor_triggers"] = ["irony", "absurdity", "unexpected connections"]
-
-                # Sayısal değerleri float'a dönüştür
-                for field in ["sarcasm_usage", "playfulness", "meme_literacy"]:
-                    if isinstance(hs.get(field), (int, str)):
-                        hs[field] = float(hs[field])
-
-                response["humor_style"] = hs
-
-            # avatar_description için veri dönüşümü
-            avatar_desc = response.get("base_personality", {}).get("defining_characteristics", [])
-            if isinstance(avatar_desc, list):
-                # Listeyi string'e çevir
-                avatar_desc = ", ".join(avatar_desc)
-            elif not isinstance(avatar_desc, str):
-                avatar_desc = "A friendly and helpful AI character"
-
-            # Create PersonalityTraits instance
-            personality = PersonalityTraits(
-                character_name=character_name,
-                character_type=response.get("base_personality", {}).get("core_description", "AI Character"),
-                base_personality=response.get("base_personality", {}),
-                creation_prompt=prompt,
-                avatar_description=avatar_desc,  # String olarak geçiyoruz
-                background_story=response.get("base_personality", {}).get("background_story", ""),
-                key_traits=response.get("base_personality", {}).get("key_traits", []),
-                version="1.0",
-                
-                # Alt modeller
-                psychological_profile=PsychologicalProfile(**response.get("psychological_profile", {})),
-                speech_patterns=SpeechPatterns(**response.get("speech_patterns", {})),
-                behavioral_patterns=BehavioralPatterns(**response.get("behavioral_patterns", {})),
-                emotional_intelligence=EmotionalIntelligence(**response.get("emotional_intelligence", {})),
-                cultural_awareness=CulturalAwareness(**response.get("cultural_awareness", {})),
-                language_capabilities=LanguageCapabilities(**response.get("language_capabilities", {})),
-                ethical_framework=EthicalFramework(**response.get("ethical_framework", {})),
-                opinion_system=OpinionSystem(**response.get("opinion_system", {})),
-                emotional_traits=EmotionalTraits(**response.get("emotional_traits", {})),
-                character_development=CharacterDevelopment(**response.get("character_development", {})),
-                content_creation=ContentCreation(**response.get("content_creation", {})),
-                humor_style=HumorStyle(**response.get("humor_style", {})),
-                
-                # Liste alanları
-                knowledge_base=response.get("knowledge_base", []),
-                core_values=response.get("core_values", [])
-            )
+            if "development_goals" not in cd:
+                cd["development_goals"] = ["improve engagement", "expand knowledge", "refine responses"]
+
+            # Sayısal değerleri float'a dönüştür
+            if isinstance(cd.get("adaptation_rate"), (int, str)):
+                cd["adaptation_rate"] = float(cd["adaptation_rate"])
+
+            response["character_development"] = cd
+
+        # ContentCreation için veri düzeltme
+        if "content_creation" not in response:
+            response["content_creation"] = {
+                "preferred_topics": ["technology", "science", "culture"],
+                "content_style": "informative",
+                "creativity_level": 0.7,
+                "innovation_tendency": 0.6,
+                "research_depth": 0.8,
+                "quality_standards": ["accuracy", "clarity", "relevance"],
+                "audience_awareness": 0.7
+            }
+        else:
+            cc = response["content_creation"]
             
-            return personality
-
-        except Exception as e:
-            print(f"Error generating personality: {str(e)}")
-            print(f"Raw API Response: {json.dumps(response, indent=2)}")
-            traceback.print_exc()
-            raise
+            # Eksik alanları doldur
+            if "preferred_topics" not in cc:
+                cc["preferred_topics"] = ["technology", "science", "culture"]
+            if "content_style" not in cc:
+                cc["content_style"] = "informative"
+            if "creativity_level" not in cc:
+                cc["creativity_level"] = 0.7
+            if "innovation_tendency" not in cc:
+                cc["innovation_tendency"] = 0.6
+            if "research_depth" not in cc:
+                cc["research_depth"] = 0.8
+            if "quality_standards" not in cc:
+                cc["quality_standards"] = ["accuracy", "clarity", "relevance"]
+            if "audience_awareness" not in cc:
+                cc["audience_awareness"] = 0.7
+
+            # Sayısal değerleri float'a dönüştür
+            for field in ["creativity_level", "innovation_tendency", "research_depth", "audience_awareness"]:
+                if isinstance(cc.get(field), (int, str)):
+                    cc[field] = float(cc[field])
+
+            response["content_creation"] = cc
+
+        # HumorStyle için veri düzeltme
+        if "humor_style" not in response:
+            response["humor_style"] = {
+                "humor_type": "witty",
+                "joke_preferences": ["wordplay", "clever observations", "situational"],
+                "sarcasm_usage": 0.4,
+                "playfulness": 0.6,
+                "meme_literacy": 0.7,
+                "wit_style": "clever",
+                "humor_triggers": ["irony", "absurdity", "unexpected connections"]
+            }
+        else:
+            hs = response["humor_style"]
+            
+            # Eksik alanları doldur
+            if "humor_type" not in hs:
+                hs["humor_type"] = "witty"
+            if "joke_preferences" not in hs:
+                hs["joke_preferences"] = ["wordplay", "clever observations", "situational"]
+            if "sarcasm_usage" not in hs:
+                hs["sarcasm_usage"] = 0.4
+            if "playfulness" not in hs:
+                hs["playfulness"] = 0.6
+            if "meme_literacy" not in hs:
+                hs["meme_literacy"] = 0.7
+            if "wit_style" not in hs:
+                hs["wit_style"] = "clever"
+            if "humor_triggers" not in hs:
+                hs["humor_triggers"] = ["irony", "absurdity", "unexpected connections"]
+
+            # Sayısal değerleri float'a dönüştür
+            for field in ["sarcasm_usage", "playfulness", "meme_literacy"]:
+                if isinstance(hs.get(field), (int, str)):
+                    hs[field] = float(hs[field])
+
+            response["humor_style"] = hs
+
+        return response
+
+    def _build_personality(self, response: Dict[str, Any], prompt: str, character_name: str) -> PersonalityTraits:
+        """Assemble PersonalityTraits from normalized sections"""
+        # avatar_description için veri dönüşümü
+        avatar_desc = response.get("base_personality", {}).get("defining_characteristics", [])
+        if isinstance(avatar_desc, list):
+            # Listeyi string'e çevir
+            avatar_desc = ", ".join(avatar_desc)
+        elif not isinstance(avatar_desc, str):
+            avatar_desc = "A friendly and helpful AI character"
+
+        # Create PersonalityTraits instance
+        personality = PersonalityTraits(
+            character_name=character_name,
+            character_type=response.get("base_personality", {}).get("core_description", "AI Character"),
+            base_personality=response.get("base_personality", {}),
+            creation_prompt=prompt,
+            avatar_description=avatar_desc,  # String olarak geçiyoruz
+            background_story=response.get("base_personality", {}).get("background_story", ""),
+            key_traits=response.get("base_personality", {}).get("key_traits", []),
+            version="1.0",
+            
+            # Alt modeller
+            psychological_profile=PsychologicalProfile(**response.get("psychological_profile", {})),
+            speech_patterns=SpeechPatterns(**response.get("speech_patterns", {})),
+            behavioral_patterns=BehavioralPatterns(**response.get("behavioral_patterns", {})),
+            emotional_intelligence=EmotionalIntelligence(**response.get("emotional_intelligence", {})),
+            cultural_awareness=CulturalAwareness(**response.get("cultural_awareness", {})),
+            language_capabilities=LanguageCapabilities(**response.get("language_capabilities", {})),
+            ethical_framework=EthicalFramework(**response.get("ethical_framework", {})),
+            opinion_system=OpinionSystem(**response.get("opinion_system", {})),
+            emotional_traits=EmotionalTraits(**response.get("emotional_traits", {})),
+            character_development=CharacterDevelopment(**response.get("character_development", {})),
+            content_creation=ContentCreation(**response.get("content_creation", {})),
+            humor_style=HumorStyle(**response.get("humor_style", {})),
+            
+            # Liste alanları
+            knowledge_base=response.get("knowledge_base", []),
+            core_values=response.get("core_values", [])
+        )
+        
+        return personality
 
     def _validate_and_enhance_personality(self, personality: PersonalityTraits) -> PersonalityTraits:
         """Validate and enhance the generated personality"""
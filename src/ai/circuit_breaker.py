@@ -0,0 +1,120 @@
+import random
+import time
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider that is known to be failing"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM circuit open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """Whether an error says the provider is unhealthy, not that the request was bad.
+
+    Timeouts, connection errors, 429 and 5xx count; other 4xx responses
+    (bad request, auth, content policy) do not trip the breaker.
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status != 429:
+        return False
+    return True
+
+
+class CircuitBreaker:
+    """Process-wide closed/open/half-open breaker for the LLM provider.
+
+    After failure_threshold consecutive provider failures the circuit opens
+    and every caller fails fast for an exponentially growing, jittered
+    backoff. Once it elapses a limited number of probe calls are let through
+    (half-open); one success closes the circuit, a failure reopens it with a
+    longer backoff.
+    """
+
+    def __init__(self,
+                 failure_threshold: int = 5,
+                 base_backoff: float = 1.0,
+                 max_backoff: float = 60.0,
+                 half_open_max_calls: int = 1,
+                 seed: Optional[int] = None):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.half_open_max_calls = half_open_max_calls
+        self.random = random.Random(seed)
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0  # Consecutive openings, drives the backoff exponent
+        self.opened_until = 0.0
+        self.half_open_calls = 0
+        self.stats = {"rejected": 0, "opened": 0, "failures": 0, "successes": 0}
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_until - time.monotonic())
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpenError"""
+        if self.state == OPEN:
+            if time.monotonic() < self.opened_until:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(self.retry_after())
+            self.state = HALF_OPEN
+            self.half_open_calls = 0
+
+        if self.state == HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(self.base_backoff)
+            self.half_open_calls += 1
+
+    def record_success(self) -> None:
+        self.stats["successes"] += 1
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.open_count = 0
+
+    def record_failure(self, error: BaseException = None) -> None:
+        if error is not None and not is_provider_failure(error):
+            # The provider answered; the request itself was rejected
+            self.record_success()
+            return
+
+        self.stats["failures"] += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def record_cancelled(self) -> None:
+        """Give back a half-open probe slot whose call never finished"""
+        if self.state == HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def _open(self) -> None:
+        # Equal jitter: half the backoff is fixed, half random, so characters
+        # do not all probe at the same instant
+        backoff = min(self.max_backoff, self.base_backoff * (2 ** self.open_count))
+        backoff = backoff / 2 + self.random.uniform(0, backoff / 2)
+
+        self.state = OPEN
+        self.open_count += 1
+        self.opened_until = time.monotonic() + backoff
+        self.stats["opened"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and counters"""
+        return {
+            **self.stats,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after": self.retry_after() if self.state == OPEN else 0.0
+        }
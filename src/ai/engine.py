@@ -0,0 +1,332 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Sequence, Union
+
+from src.ai.circuit_breaker import CircuitBreaker
+from src.ai.providers import LLMProvider, LLMResponse, create_provider
+from src.ai.scheduler import LLMScheduler
+from src.ai.single_flight import SingleFlight
+from src.config.settings import settings
+
+
+class LLMEngine:
+    """Non-blocking chat completion engine.
+
+    Every ChatGPTClient sharing an API key goes through the same engine, so
+    they share one provider (and its HTTP connection pool) and one
+    process-wide scheduler that orders calls by priority and enforces the
+    concurrency and RPM/TPM ceilings. A shared circuit breaker makes every
+    character back off together while the provider is failing, and slow
+    calls can be hedged with a duplicate request past the p95 latency.
+    """
+
+    def __init__(self,
+                 provider: LLMProvider,
+                 max_concurrency: int = None,
+                 timeout: float = None,
+                 rpm_limit: int = None,
+                 tpm_limit: int = None):
+        self.provider = provider
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.timeout = timeout or settings.LLM_REQUEST_TIMEOUT
+        self.logger = logging.getLogger(__name__)
+
+        # The per-key rate limits scale with the number of pooled keys
+        self.scheduler = LLMScheduler(
+            self.max_concurrency,
+            rpm_limit=settings.LLM_RPM_LIMIT * provider.capacity if rpm_limit is None else rpm_limit,
+            tpm_limit=settings.LLM_TPM_LIMIT * provider.capacity if tpm_limit is None else tpm_limit
+        )
+        self.single_flight = SingleFlight()
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            base_backoff=settings.LLM_BREAKER_BASE_BACKOFF,
+            max_backoff=settings.LLM_BREAKER_MAX_BACKOFF
+        )
+
+        self.hedge_enabled = settings.LLM_HEDGE_ENABLED
+        # Recent successful latencies per model, for the hedge threshold
+        self.latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=200))
+
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "in_flight": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "total_latency_ms": 0.0
+        }
+
+    @staticmethod
+    def request_key(messages: List[Dict[str, str]],
+                    model: str,
+                    temperature: float,
+                    max_tokens: Optional[int],
+                    n: int = 1,
+                    json_mode: bool = False) -> str:
+        """Identity of a request for coalescing"""
+        system_prompt = "".join(m["content"] for m in messages if m["role"] == "system")
+        prompt = json.dumps([m for m in messages if m["role"] != "system"], sort_keys=True)
+        return "|".join([
+            model,
+            hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+            hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            str(temperature),
+            str(max_tokens),
+            str(n),
+            "json" if json_mode else "text"
+        ])
+
+    async def complete(self,
+                       messages: List[Dict[str, str]],
+                       model: str,
+                       temperature: float = 0.7,
+                       max_tokens: int = None,
+                       timeout: float = None,
+                       call_type: str = None,
+                       character_id: str = None,
+                       estimated_tokens: int = 0,
+                       n: int = 1,
+                       json_mode: bool = False) -> LLMResponse:
+        """
+        Run a chat completion once the scheduler admits it
+
+        Identical requests issued while one is already in flight share its
+        upstream call; their responses come back with shared=True.
+
+        Args:
+            call_type: Picks the scheduler lane (reply, tweet or background)
+            character_id: Fair-queuing key within the lane
+            estimated_tokens: Prompt plus completion estimate for the TPM ceiling
+            n: Number of choices to sample in the same call
+            json_mode: Ask the provider for a JSON object response
+        """
+        key = self.request_key(messages, model, temperature, max_tokens, n, json_mode)
+        response, shared = await self.single_flight.do(
+            key,
+            lambda: self._complete(
+                messages, model, temperature, max_tokens, timeout,
+                call_type, character_id, estimated_tokens, n, json_mode
+            )
+        )
+        if shared:
+            return response.model_copy(update={"shared": True})
+        return response
+
+    async def _complete(self,
+                        messages: List[Dict[str, str]],
+                        model: str,
+                        temperature: float,
+                        max_tokens: Optional[int],
+                        timeout: Optional[float],
+                        call_type: Optional[str],
+                        character_id: Optional[str],
+                        estimated_tokens: int,
+                        n: int = 1,
+                        json_mode: bool = False) -> LLMResponse:
+        """Issue one upstream chat completion through the circuit breaker"""
+        self.breaker.before_call()
+
+        attempt = lambda admitted=None: self._attempt(
+            messages, model, temperature, max_tokens, timeout,
+            call_type, character_id, estimated_tokens, n, json_mode, admitted
+        )
+        try:
+            hedge_after = self.hedge_delay(model)
+            if hedge_after is None:
+                response = await attempt()
+            else:
+                response = await self._hedged(attempt, hedge_after)
+        except asyncio.CancelledError:
+            self.breaker.record_cancelled()
+            raise
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+
+        self.breaker.record_success()
+        self.latencies[model].append(response.latency_ms)
+        return response
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None when hedging is off"""
+        samples = self.latencies[model]
+        if not self.hedge_enabled or len(samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * settings.LLM_HEDGE_PERCENTILE / 100))
+        return ordered[index] / 1000
+
+    async def _hedged(self, attempt, hedge_after: float) -> LLMResponse:
+        """Run attempt, starting a duplicate if its provider call outlives hedge_after"""
+        admitted = asyncio.Event()
+        primary = asyncio.create_task(attempt(admitted))
+        pending = {primary}
+        try:
+            # The hedge clock starts at admission: time spent queued in the
+            # scheduler is not provider latency
+            admission = asyncio.create_task(admitted.wait())
+            try:
+                await asyncio.wait({primary, admission}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                admission.cancel()
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            # While calls are queued a hedge would only queue behind them
+            if not done and not self.scheduler.queue_depth():
+                self.stats["hedged"] += 1
+                hedge = asyncio.create_task(attempt())
+                pending.add(hedge)
+
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # The losing request is cancelled, releasing its scheduler slot
+            for task in pending:
+                task.cancel()
+
+    async def _attempt(self,
+                       messages: List[Dict[str, str]],
+                       model: str,
+                       temperature: float,
+                       max_tokens: Optional[int],
+                       timeout: Optional[float],
+                       call_type: Optional[str],
+                       character_id: Optional[str],
+                       estimated_tokens: int,
+                       n: int = 1,
+                       json_mode: bool = False,
+                       admitted: asyncio.Event = None) -> LLMResponse:
+        """Send one request to the provider once the scheduler admits it"""
+        timeout = timeout or self.timeout
+
+        ticket = await self.scheduler.acquire(call_type, character_id, estimated_tokens)
+        if admitted is not None:
+            admitted.set()
+        actual_tokens = None
+        self.stats["in_flight"] += 1
+        started = time.perf_counter()
+        try:
+            try:
+                response = await asyncio.wait_for(
+                    self.provider.complete(
+                        messages=messages,
+                        model=model,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        timeout=timeout,
+                        n=n,
+                        json_mode=json_mode
+                    ),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                self.logger.warning(f"LLM call to {model} timed out after {timeout}s")
+                raise
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+            actual_tokens = (response.prompt_tokens + response.completion_tokens) or None
+        finally:
+            self.stats["in_flight"] -= 1
+            self.scheduler.release(ticket, actual_tokens)
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.stats["requests"] += 1
+        self.stats["total_latency_ms"] += latency_ms
+
+        response.latency_ms = latency_ms
+        return response
+
+    async def stream(self,
+                     messages: List[Dict[str, str]],
+                     model: str,
+                     temperature: float = 0.7,
+                     max_tokens: int = None,
+                     timeout: float = None,
+                     call_type: str = None,
+                     character_id: str = None,
+                     estimated_tokens: int = 0) -> AsyncIterator[str]:
+        """
+        Stream a chat completion once the scheduler admits it
+
+        Streams are never coalesced or hedged. Closing the generator early
+        releases the scheduler slot and the upstream response.
+        """
+        timeout = timeout or self.timeout
+        self.breaker.before_call()
+
+        ticket = None
+        try:
+            # Inside the try so a cancelled or failed acquire gives back a
+            # half-open probe slot
+            ticket = await self.scheduler.acquire(call_type, character_id, estimated_tokens)
+            self.stats["in_flight"] += 1
+            started = time.perf_counter()
+            async for delta in self.provider.stream(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout
+            ):
+                yield delta
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.breaker.record_failure(e)
+            raise
+        except BaseException:
+            # Cancelled while queued, or closed early by the consumer
+            self.breaker.record_cancelled()
+            raise
+        finally:
+            if ticket is not None:
+                self.stats["in_flight"] -= 1
+                self.scheduler.release(ticket)
+
+        self.breaker.record_success()
+        self.stats["requests"] += 1
+        self.stats["total_latency_ms"] += (time.perf_counter() - started) * 1000
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get engine counters"""
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "provider": self.provider.name,
+            "provider_stats": self.provider.get_stats(),
+            "single_flight": self.single_flight.get_stats(),
+            "scheduler": self.scheduler.get_stats(),
+            "breaker": self.breaker.get_stats(),
+            "max_concurrency": self.max_concurrency,
+            "average_latency_ms": self.stats["total_latency_ms"] / requests if requests else 0.0
+        }
+
+    async def close(self):
+        """Close the provider and its HTTP pool"""
+        await self.provider.close()
+
+
+_engines: Dict[str, LLMEngine] = {}
+
+
+def get_engine(api_key: Union[str, Sequence[str]]) -> LLMEngine:
+    """Get the process-wide engine for an API key or pool of keys"""
+    key = api_key if isinstance(api_key, str) else ",".join(api_key)
+    if key not in _engines:
+        _engines[key] = LLMEngine(create_provider(api_key))
+    return _engines[key]
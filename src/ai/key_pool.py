@@ -0,0 +1,204 @@
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class KeyPoolExhaustedError(Exception):
+    """Every key in the pool is ejected"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"All API keys are ejected, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds from OpenAI reset headers such as "20ms", "1s" or "6m0s" """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PATTERN.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def is_ejectable(error: BaseException) -> bool:
+    """429 and 5xx responses move traffic to another key"""
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class KeyEndpoint:
+    """One API key / base URL pair and what we have learned about its limits"""
+
+    def __init__(self, name: str, api_key: str, base_url: Optional[str], client: Any):
+        self.name = name
+        self.api_key = api_key
+        self.base_url = base_url
+        self.client = client
+
+        self.limit_requests: Optional[int] = None
+        self.limit_tokens: Optional[int] = None
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.requests_reset_at = 0.0
+        self.tokens_reset_at = 0.0
+
+        self.in_flight = 0
+        self.in_flight_tokens = 0
+        self.ejected_until = 0.0
+        self.consecutive_ejections = 0
+        self.stats = {"requests": 0, "errors": 0, "ejections": 0}
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+    def headroom(self, now: float) -> float:
+        """Fraction of the tighter remaining limit not yet spoken for.
+
+        Keys that have not reported limits yet (or whose window reset) are
+        treated as fully available.
+        """
+        ratios = [1.0]
+        if self.limit_requests and self.remaining_requests is not None and now < self.requests_reset_at:
+            ratios.append((self.remaining_requests - self.in_flight) / self.limit_requests)
+        if self.limit_tokens and self.remaining_tokens is not None and now < self.tokens_reset_at:
+            ratios.append((self.remaining_tokens - self.in_flight_tokens) / self.limit_tokens)
+        return min(ratios)
+
+    def update_limits(self, headers: Any, now: float) -> None:
+        """Learn remaining RPM/TPM from x-ratelimit-* response headers"""
+        if headers is None:
+            return
+
+        def number(name: str) -> Optional[int]:
+            value = headers.get(name)
+            try:
+                return int(value) if value is not None else None
+            except ValueError:
+                return None
+
+        self.limit_requests = number("x-ratelimit-limit-requests") or self.limit_requests
+        self.limit_tokens = number("x-ratelimit-limit-tokens") or self.limit_tokens
+        remaining_requests = number("x-ratelimit-remaining-requests")
+        remaining_tokens = number("x-ratelimit-remaining-tokens")
+        if remaining_requests is not None:
+            self.remaining_requests = remaining_requests
+            self.requests_reset_at = now + (parse_duration(headers.get("x-ratelimit-reset-requests")) or 60.0)
+        if remaining_tokens is not None:
+            self.remaining_tokens = remaining_tokens
+            self.tokens_reset_at = now + (parse_duration(headers.get("x-ratelimit-reset-tokens")) or 60.0)
+
+    def get_stats(self, now: float) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "base_url": self.base_url,
+            "in_flight": self.in_flight,
+            "remaining_requests": self.remaining_requests,
+            "remaining_tokens": self.remaining_tokens,
+            "headroom": round(self.headroom(now), 3),
+            "ejected_for": max(0.0, self.ejected_until - now)
+        }
+
+
+class KeyPool:
+    """Load-aware selection across several API keys and base URLs.
+
+    Each call goes to the non-ejected key with the most remaining RPM/TPM
+    headroom (as last reported in its response headers, minus calls still
+    in flight on it). A key answering 429 or 5xx is ejected for its
+    retry-after/reset time, or an exponentially growing backoff, so traffic
+    shifts to the others. A lone key has nowhere to shift traffic to: it is
+    only ejected for as long as a retry-after header asks, and otherwise
+    left to the engine's retries.
+    """
+
+    def __init__(self, endpoints: List[KeyEndpoint], eject_seconds: float = 30.0, max_eject_seconds: float = 300.0):
+        if not endpoints:
+            raise ValueError("KeyPool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self._next = 0  # Round-robin tie breaker
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def acquire(self, estimated_tokens: int = 0, exclude: List[KeyEndpoint] = None) -> KeyEndpoint:
+        """
+        Pick the endpoint with the most headroom and mark a call in flight
+
+        Raises:
+            KeyPoolExhaustedError: Every (non-excluded) endpoint is ejected
+        """
+        now = time.monotonic()
+        candidates = [
+            endpoint for endpoint in self.endpoints
+            if not endpoint.is_ejected(now) and endpoint not in (exclude or ())
+        ]
+        if not candidates:
+            waits = [endpoint.ejected_until - now for endpoint in self.endpoints if endpoint.is_ejected(now)]
+            raise KeyPoolExhaustedError(min(waits) if waits else 0.0)
+
+        self._next = (self._next + 1) % len(self.endpoints)
+        order = {id(endpoint): (i - self._next) % len(self.endpoints) for i, endpoint in enumerate(self.endpoints)}
+        endpoint = max(candidates, key=lambda e: (e.headroom(now), -e.in_flight, -order[id(e)]))
+
+        endpoint.in_flight += 1
+        endpoint.in_flight_tokens += estimated_tokens
+        return endpoint
+
+    def release(self,
+                endpoint: KeyEndpoint,
+                estimated_tokens: int = 0,
+                headers: Any = None,
+                error: BaseException = None) -> None:
+        """Finish a call, learning limits from headers and ejecting on 429/5xx"""
+        now = time.monotonic()
+        endpoint.in_flight -= 1
+        endpoint.in_flight_tokens -= estimated_tokens
+        endpoint.stats["requests"] += 1
+        endpoint.update_limits(headers, now)
+
+        if error is None:
+            endpoint.consecutive_ejections = 0
+            return
+
+        endpoint.stats["errors"] += 1
+        if is_ejectable(error):
+            self.eject(endpoint, headers)
+
+    def eject(self, endpoint: KeyEndpoint, headers: Any = None) -> None:
+        """Take an endpoint out of rotation for a while"""
+        now = time.monotonic()
+        backoff = min(self.max_eject_seconds, self.eject_seconds * (2 ** endpoint.consecutive_ejections))
+        if headers is not None:
+            hinted = [
+                parse_duration(headers.get(name))
+                for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+            ]
+            hinted = [seconds for seconds in hinted if seconds]
+            if hinted:
+                backoff = min(self.max_eject_seconds, max(hinted))
+        if len(self.endpoints) == 1:
+            # Ejecting the only key refuses all traffic: only for as long as
+            # the server asked us to back off
+            retry_after = parse_duration(headers.get("retry-after")) if headers is not None else None
+            if not retry_after:
+                return
+            backoff = min(self.max_eject_seconds, retry_after)
+
+        endpoint.ejected_until = now + backoff
+        endpoint.consecutive_ejections += 1
+        endpoint.stats["ejections"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-endpoint limits, load and ejection state"""
+        now = time.monotonic()
+        return {endpoint.name: endpoint.get_stats(now) for endpoint in self.endpoints}
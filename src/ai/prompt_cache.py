@@ -0,0 +1,80 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+
+class PromptPrefixCache:
+    """Per-character cache of the static system part of prompts.
+
+    Entries are keyed by character id, prompt kind and a hash of the
+    character's profile, so an edited profile never serves a stale prefix
+    even before the explicit invalidation from the database layer lands.
+    """
+
+    def __init__(self, max_characters: int = 1000):
+        self.max_characters = max_characters
+        self._entries: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self.logger = logging.getLogger(__name__)
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def character_id(character: Any) -> str:
+        """Get a stable id for a character dict or model"""
+        if not isinstance(character, dict):
+            return str(getattr(character, "id", None) or getattr(character, "name", ""))
+        return str(character.get("id") or character.get("_id") or character.get("name", ""))
+
+    @staticmethod
+    def fingerprint(character: Dict) -> str:
+        """Hash the parts of a character that end up in the system prompt"""
+        profile = {
+            "name": character.get("name"),
+            "personality": character.get("personality"),
+            "twitter_behavior": character.get("twitter_behavior")
+        }
+        payload = json.dumps(profile, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get_or_build(self, character: Dict, kind: str, builder: Callable[[], str]) -> str:
+        """Return the cached prefix or build and store it"""
+        character_id = self.character_id(character)
+        key = f"{kind}|{self.fingerprint(character)}"
+
+        entries = self._entries.get(character_id)
+        if entries is not None and key in entries:
+            self._entries.move_to_end(character_id)
+            self.stats["hits"] += 1
+            return entries[key]
+
+        self.stats["misses"] += 1
+        prefix = builder()
+
+        if entries is None:
+            entries = {}
+            self._entries[character_id] = entries
+        # Drop prefixes built from an older version of this profile
+        for stale_key in [k for k in entries if k.split("|", 1)[0] == kind]:
+            del entries[stale_key]
+        entries[key] = prefix
+        self._entries.move_to_end(character_id)
+
+        while len(self._entries) > self.max_characters:
+            self._entries.popitem(last=False)
+
+        return prefix
+
+    def invalidate(self, character_id: str) -> None:
+        """Drop every cached prefix for a character"""
+        if self._entries.pop(str(character_id), None) is not None:
+            self.stats["invalidations"] += 1
+            self.logger.debug(f"Invalidated prompt prefixes for {character_id}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters"""
+        return {**self.stats, "characters": len(self._entries)}
+
+
+# Process-wide cache shared by every ChatGPTClient
+prompt_cache = PromptPrefixCache()
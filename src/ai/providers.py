@@ -0,0 +1,397 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
+
+import httpx
+from openai import AsyncOpenAI
+from pydantic import BaseModel
+
+from src.ai.key_pool import KeyEndpoint, KeyPool, KeyPoolExhaustedError, is_ejectable
+from src.config.settings import settings
+
+
+# Models that accept response_format={"type": "json_object"}
+JSON_MODE_MODELS = ("gpt-3.5-turbo", "gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-4o")
+
+
+class LLMResponse(BaseModel):
+    """Normalized chat completion result"""
+    content: str = ""
+    choices: List[str] = []
+    model: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    shared: bool = False  # True when coalesced onto another caller's request
+
+
+class LLMProvider(ABC):
+    """Backend that turns chat messages into a completion"""
+
+    name = "base"
+    capacity = 1  # Independent rate-limit buckets (API keys) behind this provider
+
+    @abstractmethod
+    async def complete(self,
+                       messages: List[Dict[str, str]],
+                       model: str,
+                       temperature: float = 0.7,
+                       max_tokens: int = None,
+                       timeout: float = None,
+                       n: int = 1,
+                       json_mode: bool = False) -> LLMResponse:
+        """Run one chat completion, optionally sampling n choices.
+
+        json_mode asks for a JSON object where the backend supports it;
+        callers still validate the content.
+        """
+
+    async def stream(self,
+                     messages: List[Dict[str, str]],
+                     model: str,
+                     temperature: float = 0.7,
+                     max_tokens: int = None,
+                     timeout: float = None) -> AsyncIterator[str]:
+        """Yield completion text deltas as they arrive.
+
+        Providers without native streaming yield the whole completion once.
+        """
+        response = await self.complete(messages, model, temperature, max_tokens, timeout)
+        yield response.content
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Provider-specific counters"""
+        return {}
+
+    async def close(self):
+        """Release provider resources"""
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions over a shared async HTTP pool.
+
+    Several API keys and/or base URLs can be pooled; each call goes to the
+    key with the most rate-limit headroom and fails over to another key on
+    429 or 5xx.
+    """
+
+    name = "openai"
+
+    def __init__(self,
+                 api_key: Union[str, Sequence[str]],
+                 max_connections: int = None,
+                 timeout: float = None,
+                 base_urls: Sequence[str] = None):
+        max_connections = max_connections or settings.LLM_MAX_CONNECTIONS
+        timeout = timeout or settings.LLM_REQUEST_TIMEOUT
+
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(timeout, connect=10.0)
+        )
+
+        api_keys = [api_key] if isinstance(api_key, str) else list(api_key)
+        base_urls = list(base_urls or [None])
+        if len(base_urls) == 1:
+            base_urls = base_urls * len(api_keys)
+        elif len(api_keys) == 1:
+            api_keys = api_keys * len(base_urls)
+        if len(api_keys) != len(base_urls):
+            raise ValueError("API keys and base URLs must pair up one to one")
+
+        pooled = len(api_keys) > 1
+        self.pool = KeyPool(
+            [
+                KeyEndpoint(
+                    name=f"key-{i}:{key[-4:]}",
+                    api_key=key,
+                    base_url=base_url,
+                    client=AsyncOpenAI(
+                        api_key=key,
+                        base_url=base_url,
+                        http_client=self.http_client,
+                        # Fail over to another key instead of retrying this one
+                        **({"max_retries": 0} if pooled else {})
+                    )
+                )
+                for i, (key, base_url) in enumerate(zip(api_keys, base_urls))
+            ],
+            eject_seconds=settings.LLM_KEY_EJECT_SECONDS,
+            max_eject_seconds=settings.LLM_KEY_MAX_EJECT_SECONDS
+        )
+        self.capacity = len(self.pool)
+
+    async def _create(self, request: Dict[str, Any], estimated_tokens: int) -> Any:
+        """Create a completion on the best key, failing over on 429/5xx"""
+        tried = []
+        while True:
+            try:
+                endpoint = self.pool.acquire(estimated_tokens, exclude=tried)
+            except KeyPoolExhaustedError:
+                if tried:
+                    raise error
+                raise
+            tried.append(endpoint)
+
+            try:
+                raw = await endpoint.client.chat.completions.with_raw_response.create(**request)
+            except Exception as e:
+                response = getattr(e, "response", None)
+                self.pool.release(endpoint, estimated_tokens, getattr(response, "headers", None), e)
+                if not is_ejectable(e) or len(tried) >= len(self.pool):
+                    raise
+                error = e
+                continue
+
+            self.pool.release(endpoint, estimated_tokens, raw.headers)
+            return raw.parse()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"keys": self.pool.get_stats()}
+
+    async def complete(self,
+                       messages: List[Dict[str, str]],
+                       model: str,
+                       temperature: float = 0.7,
+                       max_tokens: int = None,
+                       timeout: float = None,
+                       n: int = 1,
+                       json_mode: bool = False) -> LLMResponse:
+        request = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature
+        }
+        if max_tokens:
+            request["max_tokens"] = max_tokens
+        if timeout:
+            request["timeout"] = timeout
+        if n > 1:
+            request["n"] = n
+        if json_mode and model.startswith(JSON_MODE_MODELS):
+            request["response_format"] = {"type": "json_object"}
+
+        response = await self._create(request, (max_tokens or 0) * n)
+
+        choices = [(choice.message.content or "").strip() for choice in response.choices]
+        usage = getattr(response, "usage", None)
+        return LLMResponse(
+            content=choices[0] if choices else "",
+            choices=choices,
+            model=response.model or model,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0
+        )
+
+    async def stream(self,
+                     messages: List[Dict[str, str]],
+                     model: str,
+                     temperature: float = 0.7,
+                     max_tokens: int = None,
+                     timeout: float = None) -> AsyncIterator[str]:
+        request = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True
+        }
+        if max_tokens:
+            request["max_tokens"] = max_tokens
+        if timeout:
+            request["timeout"] = timeout
+
+        stream = await self._create(request, max_tokens or 0)
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        finally:
+            # Closing early (an aborted generation) drops the HTTP response,
+            # so the remaining tokens are never generated or billed
+            await stream.close()
+
+    async def close(self):
+        await self.http_client.aclose()
+
+
+class FakeProviderError(Exception):
+    """Injected failure from FakeProvider"""
+
+
+class FakeProvider(LLMProvider):
+    """Deterministic offline provider for load tests and local development.
+
+    Responses are templated from the prompt, so the normal generate_tweet,
+    generate_reply and analysis code paths work unchanged. Latency follows
+    a configurable distribution and a fraction of calls can fail.
+    """
+
+    name = "fake"
+
+    TWEET_TEMPLATES = [
+        "Been thinking about {topic} all morning. Still not sure what to make of it.",
+        "Hot take: {topic} is more interesting than people give it credit for.",
+        "Quick question for everyone: what's your take on {topic}?",
+        "Small reminder that {topic} deserves a second look today.",
+    ]
+
+    def __init__(self,
+                 latency_ms: float = 0.0,
+                 latency_jitter_ms: float = 0.0,
+                 latency_distribution: str = "constant",
+                 error_rate: float = 0.0,
+                 seed: Optional[int] = None,
+                 responses: Dict[str, str] = None):
+        """
+        Args:
+            latency_ms: Mean latency per call
+            latency_jitter_ms: Spread (uniform half-width, or lognormal sigma in ms)
+            latency_distribution: constant, uniform or lognormal
+            error_rate: Fraction of calls that raise FakeProviderError
+            seed: Seed for latency, errors and template choice
+            responses: Canned responses keyed by a substring of the prompt
+        """
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.error_rate = error_rate
+        self.responses = responses or {}
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    @classmethod
+    def from_settings(cls) -> "FakeProvider":
+        return cls(
+            latency_ms=settings.FAKE_LLM_LATENCY_MS,
+            latency_jitter_ms=settings.FAKE_LLM_LATENCY_JITTER_MS,
+            latency_distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            seed=settings.FAKE_LLM_SEED
+        )
+
+    def _latency_seconds(self) -> float:
+        if self.latency_distribution == "uniform":
+            latency = self.random.uniform(
+                self.latency_ms - self.latency_jitter_ms,
+                self.latency_ms + self.latency_jitter_ms
+            )
+        elif self.latency_distribution == "lognormal" and self.latency_ms > 0:
+            sigma = self.latency_jitter_ms / self.latency_ms if self.latency_ms else 0.0
+            latency = self.latency_ms * self.random.lognormvariate(0.0, sigma)
+        else:
+            latency = self.latency_ms
+        return max(latency, 0.0) / 1000
+
+    @staticmethod
+    def _stable_score(*parts: str) -> float:
+        digest = hashlib.md5("|".join(parts).encode("utf-8")).hexdigest()
+        return round(int(digest[:8], 16) / 0xFFFFFFFF, 2)
+
+    def _render(self, system_prompt: str, prompt: str) -> str:
+        """Pick a response shaped like what the caller expects"""
+        for marker, response in self.responses.items():
+            if marker in prompt or marker in system_prompt:
+                return response
+
+        if "score tweets" in system_prompt:
+            ids = re.findall(r'"id":\s*"([^"]+)"', prompt)
+            return json.dumps({"scores": [
+                {
+                    "id": tweet_id,
+                    "topic_relevance": self._stable_score(tweet_id, "topic"),
+                    "sentiment_match": self._stable_score(tweet_id, "sentiment"),
+                    "engagement_potential": self._stable_score(tweet_id, "engagement")
+                }
+                for tweet_id in ids
+            ]})
+
+        if "Evaluate the ethical implications" in prompt:
+            return json.dumps({
+                "alignment_score": 0.8,
+                "ethical_concerns": [],
+                "recommendation": "proceed",
+                "reasoning": "No conflicts with the character's ethical framework"
+            })
+
+        if "JSON" in prompt or "JSON" in system_prompt:
+            return "{}"
+
+        topics = re.findall(r"Knowledge Areas: ([^\n]+)", system_prompt)
+        topic = topics[0].split(",")[0].strip() if topics and topics[0].strip() else "the little things"
+        template = self.random.choice(self.TWEET_TEMPLATES)
+        return template.format(topic=topic)
+
+    async def complete(self,
+                       messages: List[Dict[str, str]],
+                       model: str,
+                       temperature: float = 0.7,
+                       max_tokens: int = None,
+                       timeout: float = None,
+                       n: int = 1,
+                       json_mode: bool = False) -> LLMResponse:
+        self.calls += 1
+        latency = self._latency_seconds()
+        if latency:
+            await asyncio.sleep(latency)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            raise FakeProviderError("Injected fake provider failure")
+
+        system_prompt = "".join(m["content"] for m in messages if m["role"] == "system")
+        prompt = "".join(m["content"] for m in messages if m["role"] != "system")
+        choices = [self._render(system_prompt, prompt) for _ in range(max(n, 1))]
+
+        return LLMResponse(
+            content=choices[0],
+            choices=choices,
+            model=f"fake-{model}",
+            # Rough 4-characters-per-token estimate keeps accounting non-zero
+            prompt_tokens=(len(system_prompt) + len(prompt)) // 4,
+            completion_tokens=sum(len(choice) for choice in choices) // 4
+        )
+
+    async def stream(self,
+                     messages: List[Dict[str, str]],
+                     model: str,
+                     temperature: float = 0.7,
+                     max_tokens: int = None,
+                     timeout: float = None) -> AsyncIterator[str]:
+        self.calls += 1
+        if self.error_rate and self.random.random() < self.error_rate:
+            raise FakeProviderError("Injected fake provider failure")
+
+        system_prompt = "".join(m["content"] for m in messages if m["role"] == "system")
+        prompt = "".join(m["content"] for m in messages if m["role"] != "system")
+        words = re.findall(r"\S+\s*", self._render(system_prompt, prompt))
+
+        # Spread the configured latency across the chunks
+        delay = self._latency_seconds() / max(len(words), 1)
+        for word in words:
+            if delay:
+                await asyncio.sleep(delay)
+            yield word
+
+
+def create_provider(api_key: Union[str, Sequence[str]]) -> LLMProvider:
+    """Build the provider selected by LLM_PROVIDER
+
+    OPENAI_API_KEYS are pooled together with the given key(s), and
+    OPENAI_BASE_URLS pair up with them (a single URL applies to all keys).
+    """
+    if settings.LLM_PROVIDER == "fake":
+        return FakeProvider.from_settings()
+    if settings.LLM_PROVIDER == "openai":
+        api_keys = [api_key] if isinstance(api_key, str) else list(api_key)
+        for key in settings.OPENAI_API_KEYS:
+            if key not in api_keys:
+                api_keys.append(key)
+        return OpenAIProvider(api_keys, base_urls=settings.OPENAI_BASE_URLS or None)
+    raise ValueError(f"Unknown LLM provider: {settings.LLM_PROVIDER}")
@@ -0,0 +1,213 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src.ai.prompt_cache import prompt_cache
+from src.config.settings import settings
+
+
+class JsonFileCacheStore:
+    """On-disk second cache tier, one JSON file per key.
+
+    Files are written to a temporary file and renamed into place, so a
+    reader never sees a partial entry. Each file's mtime is set to its
+    expiry time; at most every sweep_interval seconds a write also deletes
+    expired files and, past max_entries, the ones expiring first.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 0, sweep_interval: float = 300.0):
+        """
+        Args:
+            directory: Directory holding the cache files
+            max_entries: Files kept after a sweep (0 = unlimited)
+            sweep_interval: Minimum seconds between sweeps
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self.logger = logging.getLogger(__name__)
+        self._last_sweep = 0.0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            entry = json.load(f)
+        if entry["expires_at"] <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return entry["value"]
+
+    def _write(self, key: str, value: Any, ttl_seconds: float) -> None:
+        expires_at = time.time() + ttl_seconds
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"value": value, "expires_at": expires_at}, f)
+            os.utime(temp_path, (expires_at, expires_at))
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = time.monotonic()
+            self._sweep()
+
+    def _sweep(self) -> int:
+        """Delete expired and over-limit files, returning how many were removed"""
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.directory.iterdir():
+            try:
+                mtime = path.stat().st_mtime
+                if path.suffix == ".tmp":
+                    # Left behind by a write that died before the rename
+                    if mtime < now - 3600:
+                        path.unlink(missing_ok=True)
+                    continue
+                if path.suffix != ".json":
+                    continue
+                if mtime <= now:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+                else:
+                    entries.append((mtime, path))
+            except FileNotFoundError:
+                continue
+
+        if self.max_entries and len(entries) > self.max_entries:
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_entries]:
+                path.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            self.logger.info(f"Removed {removed} response cache files from {self.directory}")
+        return removed
+
+    async def get_cached_response(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def set_cached_response(self, key: str, value: Any, ttl_seconds: float) -> None:
+        await asyncio.to_thread(self._write, key, value, ttl_seconds)
+
+
+class ResponseCache:
+    """Bounded LRU cache with TTL for deterministic analysis calls.
+
+    An optional second tier (any object with async get_cached_response and
+    set_cached_response, e.g. MongoDBManager or JsonFileCacheStore) keeps
+    entries across restarts.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, store: Any = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.logger = logging.getLogger(__name__)
+        self.stats = {"hits": 0, "misses": 0, "store_hits": 0, "evictions": 0, "expired": 0}
+
+    @staticmethod
+    def make_key(method: str, character: Any, payload: Any) -> str:
+        """Key a call by method, character version and content"""
+        if not isinstance(character, dict):
+            character = character.dict()
+        raw = json.dumps(
+            [method, prompt_cache.character_id(character), prompt_cache.fingerprint(character), payload],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, falling back to the second tier"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return copy.deepcopy(value)
+            del self._entries[key]
+            self.stats["expired"] += 1
+
+        if self.store is not None:
+            try:
+                value = await self.store.get_cached_response(key)
+            except Exception as e:
+                self.logger.warning(f"Response cache store read failed: {str(e)}")
+                value = None
+            if value is not None:
+                self.stats["store_hits"] += 1
+                self._put(key, value)
+                return copy.deepcopy(value)
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        """Cache a value in memory and the second tier"""
+        self._put(key, value)
+        if self.store is not None:
+            try:
+                await self.store.set_cached_response(key, value, self.ttl_seconds)
+            except Exception as e:
+                self.logger.warning(f"Response cache store write failed: {str(e)}")
+
+    def _put(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        lookups = self.stats["hits"] + self.stats["store_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": (self.stats["hits"] + self.stats["store_hits"]) / lookups if lookups else 0.0,
+            "store": type(self.store).__name__ if self.store is not None else None
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def create_cache_store(backend: str) -> Any:
+    """Second cache tier for LLM_CACHE_BACKEND, or None for memory only"""
+    if backend == "disk":
+        return JsonFileCacheStore(settings.LLM_CACHE_DIR, max_entries=settings.LLM_CACHE_MAX_ENTRIES)
+    if backend == "mongodb":
+        # Imported here: the database layer imports the AI modules
+        from src.database.mongodb import MongoDBManager
+        return MongoDBManager(settings.MONGODB_URL)
+    return None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache, shared by every ChatGPTClient"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL,
+            store=create_cache_store(settings.LLM_CACHE_BACKEND)
+        )
+    return _response_cache
@@ -0,0 +1,100 @@
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from src.config.settings import settings
+
+# USD per 1K tokens as (prompt, completion)
+MODEL_PRICES = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-32k": (0.06, 0.12),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4-1106-preview": (0.01, 0.03),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate the USD cost of a call, matching dated model names by prefix"""
+    matches = [name for name in MODEL_PRICES if model == name or model.startswith(f"{name}-")]
+    if not matches:
+        return 0.0
+    prompt_price, completion_price = MODEL_PRICES[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+class ModelRoute(BaseModel):
+    """Model and sampling settings for one call type"""
+    model: str
+    temperature: float = 0.7
+    max_tokens: Optional[int] = None
+
+
+class ModelRouter:
+    """Maps call types to models and keeps per-route latency and cost counters"""
+
+    CALL_TYPES = ("tweet", "reply", "analysis", "ethics", "personality")
+
+    def __init__(self, default_model: str, routes: Dict[str, ModelRoute] = None):
+        self.default_route = ModelRoute(model=default_model)
+        self.routes: Dict[str, ModelRoute] = routes or {}
+        self.stats: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
+            "calls": 0,
+            "errors": 0,
+            "total_latency_ms": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cost_usd": 0.0
+        })
+
+    @classmethod
+    def from_settings(cls, default_model: str) -> "ModelRouter":
+        """Build routes from LLM_ROUTE_* settings"""
+        routes = {}
+        for call_type in cls.CALL_TYPES:
+            prefix = f"LLM_ROUTE_{call_type.upper()}"
+            routes[call_type] = ModelRoute(
+                model=getattr(settings, f"{prefix}_MODEL") or default_model,
+                temperature=getattr(settings, f"{prefix}_TEMPERATURE"),
+                max_tokens=getattr(settings, f"{prefix}_MAX_TOKENS") or None
+            )
+        return cls(default_model, routes)
+
+    def route(self, call_type: str) -> ModelRoute:
+        """Get the route for a call type"""
+        return self.routes.get(call_type, self.default_route)
+
+    def record(self,
+               call_type: str,
+               model: str,
+               latency_ms: float,
+               prompt_tokens: int = 0,
+               completion_tokens: int = 0,
+               error: bool = False) -> float:
+        """Record one call on a route and return its estimated cost"""
+        stats = self.stats[call_type]
+        stats["model"] = model
+        if error:
+            stats["errors"] += 1
+            return 0.0
+
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        stats["calls"] += 1
+        stats["total_latency_ms"] += latency_ms
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        stats["cost_usd"] += cost
+        return cost
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-route counters"""
+        return {
+            call_type: {
+                **stats,
+                "average_latency_ms": stats["total_latency_ms"] / stats["calls"] if stats["calls"] else 0.0
+            }
+            for call_type, stats in self.stats.items()
+        }
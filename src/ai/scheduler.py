@@ -0,0 +1,232 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Lanes in priority order; a lower index is always served first
+LANES = ("reply", "tweet", "background")
+
+CALL_TYPE_LANES = {
+    "reply": "reply",
+    "tweet": "tweet",
+}
+
+
+def lane_for(call_type: Optional[str]) -> str:
+    """Map a call type to its scheduling lane"""
+    return CALL_TYPE_LANES.get(call_type, "background")
+
+
+class _Waiter:
+    __slots__ = ("future", "tokens", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future, tokens: int):
+        self.future = future
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+
+
+class _Lane:
+    """Per-character FIFO queues served round-robin"""
+
+    def __init__(self):
+        self.queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self.depth = 0
+
+    def push(self, character_id: str, waiter: _Waiter):
+        self.queues.setdefault(character_id, deque()).append(waiter)
+        self.depth += 1
+
+    def peek(self) -> Optional[_Waiter]:
+        """Next live waiter, dropping cancelled ones"""
+        while self.queues:
+            character_id, queue = next(iter(self.queues.items()))
+            while queue and queue[0].future.done():
+                queue.popleft()
+                self.depth -= 1
+            if queue:
+                return queue[0]
+            del self.queues[character_id]
+        return None
+
+    def pop(self) -> _Waiter:
+        """Take the head waiter and rotate its character to the back"""
+        character_id, queue = next(iter(self.queues.items()))
+        waiter = queue.popleft()
+        self.depth -= 1
+        if queue:
+            self.queues.move_to_end(character_id)
+        else:
+            del self.queues[character_id]
+        return waiter
+
+
+class LLMScheduler:
+    """Process-wide admission control for LLM calls.
+
+    Callers wait in priority lanes (mention replies, then scheduled tweets,
+    then background analysis). Within a lane characters are served
+    round-robin so one busy character cannot starve the rest. A call is
+    admitted only while in-flight calls stay under max_concurrency and the
+    last minute's requests and tokens stay under the RPM/TPM ceilings.
+    """
+
+    WINDOW_SECONDS = 60.0
+
+    def __init__(self, max_concurrency: int, rpm_limit: int = 0, tpm_limit: int = 0):
+        """
+        Args:
+            max_concurrency: Maximum calls in flight
+            rpm_limit: Requests per minute ceiling (0 disables)
+            tpm_limit: Tokens per minute ceiling (0 disables)
+        """
+        self.max_concurrency = max_concurrency
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+
+        self.lanes: Dict[str, _Lane] = {lane: _Lane() for lane in LANES}
+        self.in_flight = 0
+        # (admitted_at, tokens) for calls admitted in the last minute
+        self._window: Deque[List[Any]] = deque()
+        self._window_tokens = 0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self.stats: Dict[str, Dict[str, float]] = {
+            lane: {"admitted": 0, "cancelled": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+            for lane in LANES
+        }
+        self.throttled = 0
+
+    async def acquire(self, call_type: str = None, character_id: str = None, tokens: int = 0) -> List[Any]:
+        """
+        Wait for a slot
+
+        Args:
+            call_type: Call type, used to pick the lane
+            character_id: Fair-queuing key
+            tokens: Estimated prompt plus completion tokens
+
+        Returns:
+            list: Ticket to pass to release()
+        """
+        lane = lane_for(call_type)
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(future, tokens)
+        self.lanes[lane].push(character_id or "", waiter)
+        self._dispatch()
+
+        try:
+            ticket = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as we were cancelled; hand the slot back
+                self.release(future.result())
+            self.stats[lane]["cancelled"] += 1
+            raise
+
+        wait_ms = (time.monotonic() - waiter.enqueued_at) * 1000
+        stats = self.stats[lane]
+        stats["admitted"] += 1
+        stats["total_wait_ms"] += wait_ms
+        stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+        return ticket
+
+    def release(self, ticket: List[Any], actual_tokens: int = None):
+        """Free a slot, correcting the token estimate with actual usage"""
+        self.in_flight -= 1
+        if actual_tokens is not None and ticket[0] > time.monotonic() - self.WINDOW_SECONDS:
+            # Tickets that already aged out of the window no longer count
+            self._window_tokens += actual_tokens - ticket[1]
+            ticket[1] = actual_tokens
+        self._dispatch()
+
+    def queue_depth(self) -> int:
+        """Calls waiting for admission across all lanes"""
+        return sum(lane.depth for lane in self.lanes.values())
+
+    def _expire_window(self, now: float):
+        while self._window and self._window[0][0] <= now - self.WINDOW_SECONDS:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+
+    def _rate_delay(self, tokens: int, now: float) -> float:
+        """Seconds until a call of this size fits under RPM/TPM, 0 if it fits now"""
+        if not self._window:
+            # An empty window always admits, even an oversized call
+            return 0.0
+
+        delays = [0.0]
+        if self.rpm_limit and len(self._window) >= self.rpm_limit:
+            oldest = self._window[len(self._window) - self.rpm_limit][0]
+            delays.append(oldest + self.WINDOW_SECONDS - now)
+        if self.tpm_limit and self._window_tokens + tokens > self.tpm_limit:
+            excess = self._window_tokens + tokens - self.tpm_limit
+            for admitted_at, used in self._window:
+                excess -= used
+                if excess <= 0:
+                    delays.append(admitted_at + self.WINDOW_SECONDS - now)
+                    break
+            else:
+                # Larger than the limit on its own: wait for an empty window
+                delays.append(self._window[-1][0] + self.WINDOW_SECONDS - now)
+        return max(delays)
+
+    def _next_waiter(self) -> Optional[Tuple[str, _Waiter]]:
+        for lane in LANES:
+            waiter = self.lanes[lane].peek()
+            if waiter is not None:
+                return lane, waiter
+        return None
+
+    def _dispatch(self):
+        """Admit waiters in priority order while capacity allows"""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        while self.in_flight < self.max_concurrency:
+            head = self._next_waiter()
+            if head is None:
+                return
+            lane, waiter = head
+
+            now = time.monotonic()
+            self._expire_window(now)
+            delay = self._rate_delay(waiter.tokens, now)
+            if delay > 0:
+                # Strict priority: lower lanes wait behind a throttled head
+                self.throttled += 1
+                self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+            self.lanes[lane].pop()
+            ticket = [now, waiter.tokens]
+            self._window.append(ticket)
+            self._window_tokens += waiter.tokens
+            self.in_flight += 1
+            waiter.future.set_result(ticket)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, wait time and rate window counters"""
+        self._expire_window(time.monotonic())
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "requests_last_minute": len(self._window),
+            "tokens_last_minute": self._window_tokens,
+            "rpm_limit": self.rpm_limit,
+            "tpm_limit": self.tpm_limit,
+            "throttled": self.throttled,
+            "lanes": {
+                lane: {
+                    **self.stats[lane],
+                    "queue_depth": self.lanes[lane].depth,
+                    "queued_characters": len(self.lanes[lane].queues),
+                    "average_wait_ms": (
+                        self.stats[lane]["total_wait_ms"] / self.stats[lane]["admitted"]
+                        if self.stats[lane]["admitted"] else 0.0
+                    )
+                }
+                for lane in LANES
+            }
+        }
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class LeaderCancelledError(Exception):
+    """The caller running a shared call was cancelled before it finished"""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the call; callers that arrive while it
+    is in flight wait for the same result instead of issuing their own.
+    Nothing is cached once the call finishes.
+
+    The shared future is never cancelled: if the leader's task is cancelled,
+    waiting followers retry and one of them runs the call as the new leader,
+    so a cancellation only ever ends the task it was aimed at.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "followers": 0, "leader_cancelled": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn once per in-flight key
+
+        Returns:
+            tuple: (result, shared) where shared is True for callers that
+                   received another caller's result
+        """
+        future = self._inflight.get(key)
+        while future is not None:
+            self.stats["followers"] += 1
+            try:
+                # Shield so one cancelled follower does not cancel the others
+                return await asyncio.shield(future), True
+            except LeaderCancelledError:
+                self.stats["leader_cancelled"] += 1
+                future = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.stats["leaders"] += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Hand the call to a follower instead of cancelling them all
+            self._release(key, future)
+            future.set_exception(LeaderCancelledError(key))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unshared failure is not reported twice
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._release(key, future)
+
+    def _release(self, key: str, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get coalescing counters"""
+        return {**self.stats, "in_flight": len(self._inflight)}
@@ -0,0 +1,221 @@
+import json
+import re
+from typing import Annotated, Any, Dict, List, Optional, Type, TypeVar
+
+from pydantic import AfterValidator, BaseModel, ValidationError, model_validator
+
+T = TypeVar("T", bound=BaseModel)
+
+FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+
+
+class StructuredOutputError(Exception):
+    """A completion could not be parsed into the requested schema"""
+
+    def __init__(self, message: str, content: str):
+        super().__init__(message)
+        self.content = content
+
+
+def _clamp_score(value: float) -> float:
+    # Models sometimes answer on a 0-10 or 0-100 scale
+    if value > 1:
+        value = value / 100 if value > 10 else value / 10
+    return min(max(value, 0.0), 1.0)
+
+
+Score = Annotated[float, AfterValidator(_clamp_score)]
+
+
+class EthicalEvaluation(BaseModel):
+    alignment_score: Score = 0.0
+    ethical_concerns: List[str] = []
+    recommendation: str = ""
+    reasoning: str = ""
+    approved: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def _default_approval(self) -> "EthicalEvaluation":
+        if self.approved is None:
+            self.approved = self.alignment_score >= 0.5
+        return self
+
+
+class InteractionDecision(BaseModel):
+    action: str = "ignore"
+    priority: int = 1
+    response_text: Optional[str] = None
+    reasoning: str = ""
+
+
+class ContentEvaluation(BaseModel):
+    relevance_score: Score = 0.0
+    recommended_action: str = "ignore"
+    engagement_type: Optional[str] = None
+    reasoning: str = ""
+
+
+class PlannedAction(BaseModel):
+    action_type: str
+    timing: Optional[str] = None
+    priority: int = 1
+    parameters: Dict[str, Any] = {}
+    reasoning: str = ""
+
+
+class ActionPlan(BaseModel):
+    planned_actions: List[PlannedAction] = []
+
+
+class TrendAnalysis(BaseModel):
+    relevance_score: Score = 0.0
+    reasoning: str = ""
+    engagement_approach: str = ""
+    risks: List[str] = []
+    content_suggestions: List[str] = []
+
+
+class EmotionAnalysis(BaseModel):
+    detected_emotions: Dict[str, float] = {}
+    emotional_impact: str = ""
+    recommended_response: str = ""
+    intensity: Score = 0.5
+
+
+class TweetScore(BaseModel):
+    id: str
+    topic_relevance: Score = 0.0
+    sentiment_match: Score = 0.0
+    engagement_potential: Score = 0.0
+
+
+class RelevanceScores(BaseModel):
+    scores: List[TweetScore] = []
+
+
+def schema_instructions(schema: Type[BaseModel]) -> str:
+    """Compact JSON shape description appended to structured prompts"""
+    fields = {
+        name: field.annotation.__name__ if isinstance(field.annotation, type)
+        else re.sub(r"\b\w+\.", "", str(field.annotation))
+        for name, field in schema.model_fields.items()
+    }
+    return (
+        "Respond with a single JSON object only, no prose or code fences, "
+        f"with these fields: {json.dumps(fields)}"
+    )
+
+
+def _scan(text: str):
+    """Walk JSON text tracking string state and open brackets.
+
+    Returns the consumed text, the bracket stack at the end, whether the
+    text ended inside a string, and (position, stack) for each top-level
+    comma so truncated tails can be cut back to the last complete member.
+    """
+    out = []
+    stack = []
+    commas = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            # Drop trailing commas before a closing bracket
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                break
+            continue
+        elif char == ",":
+            commas.append((len(out), list(stack)))
+        out.append(char)
+    return "".join(out), stack, in_string, commas
+
+
+def _close(text: str, stack: List[str]) -> str:
+    text = text.rstrip()
+    if text.endswith(","):
+        text = text[:-1]
+    elif text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> Any:
+    """
+    Parse JSON from a completion, repairing common damage locally
+
+    Handles code fences, prose around the object, trailing commas and
+    output truncated by max_tokens (open strings, arrays and objects).
+
+    Raises:
+        ValueError: Nothing parseable could be recovered
+    """
+    fenced = FENCE_PATTERN.search(text)
+    if fenced:
+        text = fenced.group(1)
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("No JSON object in completion")
+    text = text[min(starts):]
+
+    body, stack, in_string, commas = _scan(text)
+    if in_string:
+        body += '"'
+    attempts = [_close(body, stack)]
+    # Cut back to earlier complete members, newest first
+    for position, comma_stack in reversed(commas[-5:]):
+        attempts.append(_close(body[:position], comma_stack))
+
+    for attempt in attempts:
+        try:
+            return json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Could not repair JSON completion")
+
+
+def parse_structured(content: str, schema: Type[T]) -> T:
+    """
+    Validate a completion against a schema, repairing it if needed
+
+    Raises:
+        StructuredOutputError: The content is not recoverable
+    """
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        try:
+            data = repair_json(content)
+        except ValueError as e:
+            raise StructuredOutputError(str(e), content)
+
+    # A bare list answers a schema with a single list field
+    if isinstance(data, list) and len(schema.model_fields) == 1:
+        data = {next(iter(schema.model_fields)): data}
+
+    try:
+        return schema.model_validate(data)
+    except ValidationError as e:
+        raise StructuredOutputError(f"{schema.__name__} validation failed: {e.error_count()} errors", content)
@@ -0,0 +1,104 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import tiktoken
+
+
+class TokenCounter:
+    """Counts and trims prompt text in model tokens.
+
+    The tiktoken encoding is loaded on first use. tiktoken downloads its BPE
+    file the first time, so without network access (or a cached file) the
+    counter falls back to an estimate of CHARS_PER_TOKEN characters per token.
+    """
+
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, model: str):
+        self.model = model
+        self._encoding = None
+        self._loaded = False
+
+    @property
+    def encoding(self):
+        """tiktoken encoding, or None when it cannot be loaded"""
+        if not self._loaded:
+            self._loaded = True
+            try:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logging.getLogger(__name__).warning(
+                    f"tiktoken encoding unavailable, estimating tokens from length: {str(e)}"
+                )
+        return self._encoding
+
+    def count(self, text: str) -> int:
+        """Count tokens in a string"""
+        if not text:
+            return 0
+        if self.encoding is None:
+            return max(1, len(text) // self.CHARS_PER_TOKEN)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """Count tokens in chat messages, including per-message overhead"""
+        # ~4 tokens of framing per message plus 3 to prime the reply
+        return sum(self.count(m.get("content", "")) + 4 for m in messages) + 3
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text down to at most max_tokens"""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is None:
+            return text[:max_tokens * self.CHARS_PER_TOKEN]
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[:max_tokens])
+
+
+class TokenUsageTracker:
+    """Prompt and completion token and cost totals per character and call type"""
+
+    def __init__(self):
+        self.started_at = datetime.utcnow()
+        self.by_character: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(
+            lambda: defaultdict(self._empty)
+        )
+        self.by_call_type: Dict[str, Dict[str, int]] = defaultdict(self._empty)
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+
+    def record(self,
+               character_id: Optional[str],
+               call_type: str,
+               prompt_tokens: int,
+               completion_tokens: int,
+               cost_usd: float = 0.0) -> None:
+        """Add one call to the totals"""
+        for bucket in (self.by_character[character_id or "system"][call_type],
+                       self.by_call_type[call_type]):
+            bucket["calls"] += 1
+            bucket["prompt_tokens"] += prompt_tokens
+            bucket["completion_tokens"] += completion_tokens
+            bucket["cost_usd"] += cost_usd
+
+    def get_usage(self, character_id: str = None) -> Dict[str, Any]:
+        """Get usage totals, optionally for a single character"""
+        if character_id is not None:
+            return {k: dict(v) for k, v in self.by_character.get(character_id, {}).items()}
+        return {
+            "since": self.started_at.isoformat(),
+            "by_call_type": {k: dict(v) for k, v in self.by_call_type.items()},
+            "by_character": {
+                char_id: {k: dict(v) for k, v in call_types.items()}
+                for char_id, call_types in self.by_character.items()
+            }
+        }
@@ -7,8 +7,17 @@ import json
 import traceback
 
 from .models import AICharacter
+from .relevance import LexicalRanker
+from .near_duplicates import NearDuplicateIndex
+from .tweet_buffer import TweetBuffer
+from .reply_pipeline import ReplyPipeline
+from ..ai.budget import BUFFERED_ONLY, PAUSED
+from ..ai.candidates import clean_tweet
 from ..ai.chatgpt import ChatGPTClient
 from ..twitter.twitter_client import TwitterClient
+from ..twitter.registry import get_twitter_registry
+from ..twitter.mention_poller import MentionPoller
+from ..twitter.poll_scheduler import AdaptivePollScheduler
 from ..config.settings import settings
 from ..websocket.ws_server import WebSocketServer
 from rich.table import Table
@@ -25,6 +34,13 @@ class BehaviorController:
         self.twitter_clients: Dict[str, TwitterClient] = {}
         self.ws_server = None
         self.ai_client = None  # Will be set when behavior loop starts
+        self.prerank = LexicalRanker()
+        self.tweet_buffer: Optional[TweetBuffer] = None  # Created with the db in start_behavior_loop
+        self.mention_pollers: Dict[str, MentionPoller] = {}
+        self.poll_schedulers: Dict[str, AdaptivePollScheduler] = {}
+        self.pending_mentions: Dict[str, List[Dict]] = {}  # Polled but not yet answered, oldest first
+        self.reply_pipelines: Dict[str, ReplyPipeline] = {}
+        self.near_duplicates: Optional[NearDuplicateIndex] = None
         
     def set_ws_server(self, ws_server: WebSocketServer) -> None:
         """Set WebSocket server reference"""
@@ -35,11 +51,7 @@ class BehaviorController:
         self.active_characters[character.id] = character
         
         # Initialize Twitter client for character
-        self.twitter_clients[character.id] = TwitterClient(
-            ct0=character.twitter_credentials.ct0,
-            auth_token=character.twitter_credentials.auth_token,
-            twid=character.twitter_credentials.twid
-        )
+        self.twitter_clients[character.id] = get_twitter_registry().get_for(character.twitter_credentials)
         
         if self.ws_server:
             await self.ws_server.broadcast_event("character_initialized", {
@@ -115,13 +127,7 @@ class BehaviorController:
             # Check for mentions if reply is enabled
             if character.twitter_behavior.reply_settings["enabled"] and \
                character.twitter_behavior.reply_settings["reply_to_mentions"]:
-                notifications = await self.twitter_clients[character.id].get_notifications()
-                
-                # Filter out tweets we've already replied to
-                new_mentions = [
-                    n for n in notifications 
-                    if n["tweet_id"] not in character.twitter_behavior.reply_settings["replied_tweets"]
-                ]
+                new_mentions = await self._poll_mentions(character)
                 
                 if new_mentions:
                     self.ws_server.logger.info(f"Found {len(new_mentions)} new mentions to reply to")
@@ -143,6 +149,110 @@ class BehaviorController:
             self.ws_server.logger.error(f"Error determining next action: {str(e)}")
             return "sleep", 30
 
+    def _mention_poller(self, character_id: str) -> Tuple[MentionPoller, AdaptivePollScheduler]:
+        """Get a character's mention poller and its poll scheduler"""
+        if character_id not in self.mention_pollers:
+            self.mention_pollers[character_id] = MentionPoller(
+                self.twitter_clients[character_id],
+                character_id,
+                getattr(self.ws_server, "db", None)
+            )
+            self.poll_schedulers[character_id] = AdaptivePollScheduler(
+                min_interval=settings.MENTION_POLL_MIN_INTERVAL,
+                max_interval=settings.MENTION_POLL_MAX_INTERVAL,
+                backoff_factor=settings.MENTION_POLL_BACKOFF,
+                read_limit=settings.TWITTER_NOTIFICATIONS_RATE_LIMIT,
+                read_window=settings.TWITTER_NOTIFICATIONS_RATE_WINDOW
+            )
+        return self.mention_pollers[character_id], self.poll_schedulers[character_id]
+
+    async def _poll_mentions(self, character: AICharacter) -> List[Dict]:
+        """Poll for new mentions if the scheduler says so, return unanswered ones"""
+        poller, scheduler = self._mention_poller(character.id)
+        pending = self.pending_mentions.setdefault(character.id, [])
+        if scheduler.due():
+            try:
+                new_mentions = await poller.poll()
+            except Exception:
+                scheduler.record_poll(0)
+                raise
+            scheduler.record_poll(len(new_mentions))
+            pending.extend(new_mentions)
+
+        replied = set(character.twitter_behavior.reply_settings["replied_tweets"])
+        answered = [mention["tweet_id"] for mention in pending if mention["tweet_id"] in replied]
+        if answered:
+            pending[:] = [mention for mention in pending if mention["tweet_id"] not in replied]
+            await poller.mark_answered(*answered)
+        return pending
+
+    def _reply_pipeline(self, character_id: str) -> ReplyPipeline:
+        """Get a character's mention reply pipeline"""
+        if character_id not in self.reply_pipelines:
+            self.reply_pipelines[character_id] = ReplyPipeline(
+                character_id,
+                generate=lambda mention: self._generate_mention_reply(character_id, mention),
+                post=lambda mention, text: self.twitter_clients[character_id].reply_to_tweet(
+                    text=text,
+                    tweet_id=mention["tweet_id"]
+                ),
+                on_posted=lambda mention, text, result: self._record_mention_reply(character_id, mention, text, result),
+                on_dropped=lambda mention, error: self._drop_mention(character_id, mention)
+            )
+        return self.reply_pipelines[character_id]
+
+    async def _generate_mention_reply(self, character_id: str, mention: Dict) -> str:
+        """Reply text for a queued mention, using the latest character profile"""
+        character = self.active_characters[character_id]
+        return await self._generate_reply(
+            character_id,
+            character,
+            mention["text"],
+            mention["user"]["name"]
+        )
+
+    async def _record_mention_reply(self, character_id: str, mention: Dict, text: str, result: Dict) -> None:
+        """Mark a mention answered once its reply is posted"""
+        character = self.active_characters[character_id]
+        character.twitter_behavior.reply_settings["replied_tweets"].append(mention["tweet_id"])
+        await self.ws_server.db.add_replied_tweet(character_id, mention["tweet_id"])
+
+        pending = self.pending_mentions.get(character_id, [])
+        pending[:] = [m for m in pending if m["tweet_id"] != mention["tweet_id"]]
+        if character_id in self.mention_pollers:
+            await self.mention_pollers[character_id].mark_answered(mention["tweet_id"])
+        if character_id in self.poll_schedulers:
+            self.poll_schedulers[character_id].record_reply(mention)
+
+        await self.ws_server.broadcast_event("reply_posted", {
+            "character_id": character_id,
+            "character_name": character.name,
+            "reply_to": mention["user"]["screen_name"],
+            "original_tweet": mention["text"],
+            "reply_content": text,
+            "tweet_id": str(result.get("rest_id", "")) if isinstance(result, dict) else "",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        self.ws_server.logger.info(f"Reply posted successfully for {character.name}")
+
+    async def _drop_mention(self, character_id: str, mention: Dict) -> None:
+        """Stop carrying a mention the reply pipeline gave up on"""
+        pending = self.pending_mentions.get(character_id, [])
+        pending[:] = [m for m in pending if m["tweet_id"] != mention["tweet_id"]]
+        if character_id in self.mention_pollers:
+            await self.mention_pollers[character_id].mark_answered(mention["tweet_id"])
+
+    def get_mention_stats(self, character_id: str) -> Dict[str, Any]:
+        """Poll cadence, reply backlog, throughput and latency for a character"""
+        if character_id not in self.poll_schedulers:
+            return {}
+        return {
+            **self.poll_schedulers[character_id].get_stats(),
+            "poller": self.mention_pollers[character_id].get_stats(),
+            "pending": len(self.pending_mentions.get(character_id, [])),
+            "pipeline": self.reply_pipelines[character_id].get_stats() if character_id in self.reply_pipelines else {}
+        }
+
     async def _get_recent_activity(self, character: AICharacter) -> Dict:
         """Get character's recent activity"""
         try:
@@ -170,22 +280,13 @@ class BehaviorController:
             # Karakter verilerini al
             character_data = character.dict()
             
-            # Son tweet'leri al (maksimum 5)
-            recent_tweets = await twitter_client.get_user_tweets(
-                credentials=character.twitter_credentials,
-                count=5
-            )
-            
-            # Tweet geçmişini character_data'ya ekle
-            character_data['recent_tweets'] = [
-                tweet.get('text', '') 
-                for tweet in recent_tweets
-            ] if recent_tweets else []
+            # Seed the duplicate index from the timeline on first use
+            await self._seed_near_duplicates(character.id, twitter_client)
             
             # Tweet üret
-            tweet_content = await self.ws_server.ai_client.generate_tweet(
-                character=character_data
-            )
+            tweet_content = await self._next_tweet(character.id, character_data)
+            if not tweet_content:
+                raise Exception("Only near-duplicate tweets were generated")
             
             ws_server.logger.info(f"[TWEET] Generated content for {character.name}: {tweet_content}")
             
@@ -215,6 +316,8 @@ class BehaviorController:
             
             if result and result.get("id"):
                 ws_server.logger.info(f"[TWEET] Successfully posted tweet for {character.name} - ID: {result.get('id')}")
+                if self.near_duplicates:
+                    await self.near_duplicates.add(character.id, tweet_content)
                 
                 # Başarılı tweet event'i
                 await ws_server.broadcast_event("tweet_posted", {
@@ -257,10 +360,25 @@ class BehaviorController:
                 limit=20  # Get last 20 relevant tweets
             )
             
-            # Score tweets for relevance
+            # Cheap local pre-ranking so only plausible candidates cost tokens
+            candidates = self.prerank.top_k(
+                character,
+                search_results,
+                settings.RELEVANCE_PRERANK_TOP_K
+            )
+            
+            if not candidates:
+                return []
+            
+            # Score remaining candidates in batched requests
+            scores = await self.ai_client.score_tweets(
+                character=character.dict(),
+                tweets=candidates
+            )
+            
             scored_tweets = []
-            for tweet in search_results:
-                score = await self._calculate_tweet_relevance(tweet, character)
+            for tweet in candidates:
+                score = self._calculate_tweet_relevance(scores.get(tweet["id_str"], {}))
                 if score > 0.5:  # Only consider tweets with high relevance
                     scored_tweets.append({
                         "tweet": tweet,
@@ -273,32 +391,19 @@ class BehaviorController:
             console.print(f"[red]Error finding relevant tweets:[/red] {str(e)}")
             return []
 
-    async def _calculate_tweet_relevance(self, tweet: Dict, character: AICharacter) -> float:
-        """Calculate how relevant a tweet is to the character"""
-        try:
-            # Get tweet analysis from AI
-            analysis = await self.ai_client.analyze_content(
-                content=tweet["text"],
-                character=character.dict()
-            )
-            
-            # Factors to consider
-            topic_relevance = analysis.get("topic_relevance", 0.0)
-            sentiment_match = analysis.get("sentiment_match", 0.0)
-            engagement_potential = analysis.get("engagement_potential", 0.0)
-            
-            # Calculate weighted score
-            score = (
-                topic_relevance * 0.4 +
-                sentiment_match * 0.3 +
-                engagement_potential * 0.3
-            )
-            
-            return score
-            
-        except Exception as e:
-            console.print(f"[red]Error calculating tweet relevance:[/red] {str(e)}")
-            return 0.0
+    def _calculate_tweet_relevance(self, analysis: Dict) -> float:
+        """Calculate a weighted relevance score from tweet analysis"""
+        # Factors to consider
+        topic_relevance = analysis.get("topic_relevance", 0.0)
+        sentiment_match = analysis.get("sentiment_match", 0.0)
+        engagement_potential = analysis.get("engagement_potential", 0.0)
+        
+        # Calculate weighted score
+        return (
+            topic_relevance * 0.4 +
+            sentiment_match * 0.3 +
+            engagement_potential * 0.3
+        )
 
     async def _perform_reply(self, character: AICharacter, twitter_client: TwitterClient):
         """Perform reply to a tweet"""
@@ -361,7 +466,7 @@ class BehaviorController:
                 }
             )
             
-            if analysis["alignment_score"] > 0.7:  # Only retweet if highly aligned
+            if analysis.alignment_score > 0.7:  # Only retweet if highly aligned
                 # Perform retweet
                 await twitter_client.retweet(tweet_to_retweet["id_str"])
                 
@@ -473,6 +578,10 @@ class BehaviorController:
             self.running = True
             self.ws_server = ws_server
             self.ai_client = ws_server.ai_client
+            if self.near_duplicates is None:
+                self.near_duplicates = NearDuplicateIndex(ws_server.db)
+            if settings.TWEET_BUFFER_ENABLED and self.tweet_buffer is None:
+                self.tweet_buffer = TweetBuffer(ws_server.db, ws_server.ai_client, self.near_duplicates)
             
             # Create and start behavior loop task
             loop_task = asyncio.create_task(
@@ -530,9 +639,12 @@ class BehaviorController:
             if not character:
                 raise Exception(f"Character {character_id} not found")
                 
+            # Seed the duplicate index from the timeline before the first tweet
+            await self._seed_near_duplicates(character_id, twitter_client)
+            
             # Initialize timing variables
             last_tweet_time = None  # None means tweet immediately
-            last_mention_check = None  # None means check immediately
+            _, poll_scheduler = self._mention_poller(character_id)
             
             # Log initialization complete
             await ws_server.broadcast_event("behavior_loop_initialized", {
@@ -556,6 +668,8 @@ class BehaviorController:
                             "timestamp": current_time.isoformat()
                         })
                         break
+                    # Queued mention replies are generated from the latest profile
+                    self.active_characters[character_id] = character
                     
                     # Check engagement hours
                     if not (character.twitter_behavior.engagement_hours["start"] <= 
@@ -571,8 +685,22 @@ class BehaviorController:
                         await asyncio.sleep(300)
                         continue
                     
+                    # Characters over budget stop acting until their bucket rolls over
+                    await self.ai_client.cost_meter.load(character_id)
+                    budget_level = self.ai_client.cost_meter.level(character_id)
+                    if budget_level == PAUSED:
+                        await ws_server.broadcast_event("budget_paused", {
+                            "character_id": character_id,
+                            "character_name": character.name,
+                            "usage": self.ai_client.cost_meter.get_usage(character_id)["characters"][character_id],
+                            "next_check": (current_time + timedelta(minutes=5)).isoformat()
+                        })
+                        await asyncio.sleep(300)
+                        continue
+                    
                     # Handle tweets
                     if character.twitter_behavior.tweet_settings["enabled"]:
+                        character_data = self._build_character_data(character_id, character)
                         tweet_interval = int(1 / character.twitter_behavior.tweet_settings["tweets_per_minute"])
                         
                         should_tweet = (
@@ -589,114 +717,20 @@ class BehaviorController:
                                     "timestamp": current_time.isoformat()
                                 })
                                 
-                                # Prepare character data for tweet generation
-                                character_data = {
-                                    "name": character.name,
-                                    "personality": {
-                                        "character_name": character.personality.character_name,
-                                        "character_type": character.personality.character_type,
-                                        "creation_prompt": character.personality.creation_prompt,
-                                        "avatar_description": character.personality.avatar_description,
-                                        "background_story": character.personality.background_story,
-                                        "key_traits": character.personality.key_traits,
-                                        "version": character.personality.version,
-                                        "knowledge_base": character.personality.knowledge_base,
-                                        "core_values": character.personality.core_values,
-                                        
-                                        "base_personality": {
-                                            "core_description": character.personality.base_personality.core_description,
-                                            "background_story": character.personality.base_personality.background_story,
-                                            "key_traits": character.personality.base_personality.key_traits,
-                                            "origin_story": character.personality.base_personality.origin_story,
-                                            "defining_characteristics": character.personality.base_personality.defining_characteristics
-                                        },
-                                        "psychological_profile": {
-                                            "personality_type": character.personality.psychological_profile.personality_type,
-                                            "cognitive_patterns": character.personality.psychological_profile.cognitive_patterns,
-                                            "defense_mechanisms": character.personality.psychological_profile.defense_mechanisms,
-                                            "psychological_needs": character.personality.psychological_profile.psychological_needs,
-                                            "motivation_factors": character.personality.psychological_profile.motivation_factors,
-                                            "growth_potential": character.personality.psychological_profile.growth_potential,
-                                            "adaptation_rate": character.personality.psychological_profile.adaptation_rate,
-                                            "stress_responses": character.personality.psychological_profile.stress_responses
-                                        },
-                                        "speech_patterns": {
-                                            "style": character.personality.speech_patterns.style,
-                                            "common_phrases": character.personality.speech_patterns.common_phrases,
-                                            "vocabulary_preferences": character.personality.speech_patterns.vocabulary_preferences,
-                                            "linguistic_quirks": character.personality.speech_patterns.linguistic_quirks,
-                                            "communication_patterns": character.personality.speech_patterns.communication_patterns,
-                                            "formality_spectrum": character.personality.speech_patterns.formality_spectrum,
-                                            "formality_level": character.personality.speech_patterns.formality_level,
-                                            "tone": character.personality.speech_patterns.tone,
-                                            "vocabulary_level": character.personality.speech_patterns.vocabulary_level,
-                                            "typical_expressions": character.personality.speech_patterns.typical_expressions,
-                                            "language_quirks": character.personality.speech_patterns.language_quirks,
-                                            "emoji_usage": character.personality.speech_patterns.emoji_usage
-                                        },
-                                        "behavioral_patterns": {
-                                            "interaction_style": character.personality.behavioral_patterns.interaction_style,
-                                            "triggers": character.personality.behavioral_patterns.triggers,
-                                            "habits": character.personality.behavioral_patterns.habits,
-                                            "preferences": character.personality.behavioral_patterns.preferences,
-                                            "response_patterns": character.personality.behavioral_patterns.response_patterns,
-                                            "social_adaptability": character.personality.behavioral_patterns.social_adaptability,
-                                            "decision_making_style": character.personality.behavioral_patterns.decision_making_style,
-                                            "risk_tolerance": character.personality.behavioral_patterns.risk_tolerance
-                                        },
-                                        "emotional_intelligence": {
-                                            "empathy_level": character.personality.emotional_intelligence.empathy_level,
-                                            "emotional_awareness": character.personality.emotional_intelligence.emotional_awareness,
-                                            "social_perception": character.personality.emotional_intelligence.social_perception,
-                                            "emotional_regulation": character.personality.emotional_intelligence.emotional_regulation,
-                                            "conflict_resolution_style": character.personality.emotional_intelligence.conflict_resolution_style
-                                        },
-                                        "cultural_awareness": {
-                                            "known_cultures": character.personality.cultural_awareness.known_cultures,
-                                            "cultural_sensitivity": character.personality.cultural_awareness.cultural_sensitivity,
-                                            "taboo_topics": character.personality.cultural_awareness.taboo_topics,
-                                            "preferred_cultural_references": character.personality.cultural_awareness.preferred_cultural_references,
-                                            "social_norms_understanding": character.personality.cultural_awareness.social_norms_understanding
-                                        },
-                                        "opinion_system": {
-                                            "core_beliefs": character.personality.opinion_system.core_beliefs,
-                                            "opinion_strength": character.personality.opinion_system.opinion_strength,
-                                            "persuadability": character.personality.opinion_system.persuadability,
-                                            "opinion_expression_style": character.personality.opinion_system.opinion_expression_style,
-                                            "belief_update_rate": character.personality.opinion_system.belief_update_rate
-                                        },
-                                        "emotional_traits": {
-                                            "default_state": character.personality.emotional_traits.default_state,
-                                            "emotional_range": character.personality.emotional_traits.emotional_range,
-                                            "emotional_stability": character.personality.emotional_traits.emotional_stability,
-                                            "triggers": character.personality.emotional_traits.triggers,
-                                            "expression_style": character.personality.emotional_traits.expression_style,
-                                            "emotional_memory": character.personality.emotional_traits.emotional_memory,
-                                            "coping_mechanisms": character.personality.emotional_traits.coping_mechanisms
-                                        },
-                                        "ethical_framework": {
-                                            "moral_values": character.personality.ethical_framework.moral_values,
-                                            "ethical_boundaries": character.personality.ethical_framework.ethical_boundaries,
-                                            "content_restrictions": character.personality.ethical_framework.content_restrictions,
-                                            "sensitive_topics": character.personality.ethical_framework.sensitive_topics
-                                        },
-                                        "character_development": {
-                                            "growth_areas": character.personality.character_development.growth_areas,
-                                            "learning_style": character.personality.character_development.learning_style,
-                                            "adaptation_rate": character.personality.character_development.adaptation_rate,
-                                            "experience_processing": character.personality.character_development.experience_processing,
-                                            "skill_development_focus": character.personality.character_development.skill_development_focus,
-                                            "memory_retention": character.personality.character_development.memory_retention,
-                                            "development_goals": character.personality.character_development.development_goals
-                                        }
-                                    }
-                                }
-                                
-                                # Generate tweet
-                                tweet_content = await ws_server.ai_client.generate_tweet(
-                                    character=character_data
-                                )
-
+                                buffered_only = budget_level == BUFFERED_ONLY
+                                tweet_content = await self._next_tweet(character_id, character_data, buffered_only)
+                                if not tweet_content:
+                                    # Try again at the next interval rather than every iteration
+                                    last_tweet_time = current_time
+                                    await ws_server.broadcast_event("tweet_skipped", {
+                                        "character_id": character_id,
+                                        "character_name": character.name,
+                                        "reason": "budget" if buffered_only else "near_duplicate",
+                                        "timestamp": current_time.isoformat()
+                                    })
+                                    if buffered_only:
+                                        raise Exception("Over budget and no buffered tweet available")
+                                    raise Exception("Only near-duplicate tweets were generated")
 
                                 # Log generated content
                                 await ws_server.broadcast_event("tweet_generated", {
@@ -718,6 +752,8 @@ class BehaviorController:
                                     text=tweet_content
                                 )
                                 last_tweet_time = current_time
+                                if self.near_duplicates:
+                                    await self.near_duplicates.add(character_id, tweet_content)
                                 
                                 # Log success
                                 await ws_server.broadcast_event("tweet_posted", {
@@ -741,12 +777,8 @@ class BehaviorController:
                     if character.twitter_behavior.reply_settings["enabled"] and \
                        character.twitter_behavior.reply_settings["reply_to_mentions"]:
                         
-                        should_check_mentions = (
-                            last_mention_check is None or  # First check
-                            (current_time - last_mention_check).total_seconds() >= 600  # 10 minutes passed
-                        )
-                        
-                        if should_check_mentions:
+                        # Cadence adapts to the account's mention rate
+                        if poll_scheduler.due():
                             try:
                                 ws_server.logger.info(f"Checking mentions for {character.name}")
                                 await ws_server.broadcast_event("checking_mentions", {
@@ -754,60 +786,36 @@ class BehaviorController:
                                     "character_name": character.name,
                                     "timestamp": current_time.isoformat()
                                 })
-                                notifications = await twitter_client.get_notifications()
+                                pending_mentions = await self._poll_mentions(character)
                                 
-                                new_mentions = [
-                                    n for n in notifications 
-                                    if n["tweet_id"] not in character.twitter_behavior.reply_settings["replied_tweets"]
-                                ]
-                                
-                                if new_mentions:
+                                # Every unanswered mention goes to the reply pipeline
+                                reply_pipeline = self._reply_pipeline(character_id)
+                                added = reply_pipeline.submit(pending_mentions)
+                                if added:
                                     await ws_server.broadcast_event("mentions_found", {
                                         "character_id": character_id,
                                         "character_name": character.name,
-                                        "mentions_count": len(new_mentions),
-                                        "timestamp": current_time.isoformat()
-                                    })
- 
-                                    ws_server.logger.info(f"Found {len(new_mentions)} new mentions for {character.name}")
-                                    mention = new_mentions[0]
-                                    
-                                    reply_content = await self.ai_client.generate_reply(
-                                        character=character,
-                                        content=mention["text"],
-                                        user_name=mention["user"]["name"]
-                                    )
-                                    
-                                    ws_server.logger.info(f"Posting reply for {character.name}: {reply_content}")
-                                    result = await twitter_client.reply_to_tweet(
-                                        text=reply_content,
-                                        tweet_id=mention["tweet_id"]
-                                    )
-                                    
-                                    # Update replied tweets list
-                                    character.twitter_behavior.reply_settings["replied_tweets"].append(mention["tweet_id"])
-                                    await ws_server.db.update_character(character_id, character.dict())
-                                    
-                                    await ws_server.broadcast_event("reply_posted", {
-                                        "character_id": character_id,
-                                        "character_name": character.name,
-                                        "reply_to": mention["user"]["screen_name"],
-                                        "original_tweet": mention["text"],
-                                        "reply_content": reply_content,
-                                        "tweet_id": result["id_str"],
+                                        "mentions_count": added,
+                                        "backlog": reply_pipeline.backlog(),
                                         "timestamp": current_time.isoformat()
                                     })
-                                    
-                                    ws_server.logger.info(f"Reply posted successfully for {character.name}")
+                                    ws_server.logger.info(f"Queued {added} new mentions for {character.name}")
                                 else:
                                     ws_server.logger.info(f"No new mentions found for {character.name}")
-                                
-                                last_mention_check = current_time
                             except Exception as e:
                                 ws_server.logger.error(f"Failed to check mentions for {character.name}: {str(e)}")
                     
-                    # Short sleep between iterations
-                    await asyncio.sleep(30)  # Check every 30 seconds
+                    # Top up pre-generated tweets while the loop is idle
+                    if self.tweet_buffer and character.twitter_behavior.tweet_settings["enabled"] and \
+                       budget_level != BUFFERED_ONLY:
+                        self.tweet_buffer.schedule_refill(character_id, character_data)
+                    
+                    # Short sleep between iterations, waking early for a due mention poll
+                    sleep_seconds = 30
+                    if character.twitter_behavior.reply_settings["enabled"] and \
+                       character.twitter_behavior.reply_settings["reply_to_mentions"]:
+                        sleep_seconds = min(sleep_seconds, max(1, poll_scheduler.seconds_until_due()))
+                    await asyncio.sleep(sleep_seconds)
                     
                 except Exception as e:
                     ws_server.logger.error(f"Error in behavior loop for {character.name}: {str(e)}")
@@ -820,6 +828,205 @@ class BehaviorController:
             if character_id in self.current_tasks:
                 del self.current_tasks[character_id]
     
+    async def _next_tweet(self,
+                          character_id: str,
+                          character_data: Dict,
+                          buffered_only: bool = False) -> Optional[str]:
+        """Pop or generate a tweet that is not a near-duplicate of a posted one
+
+        With buffered_only (the character is close to its budget) nothing
+        new is generated.
+        """
+        if self.near_duplicates:
+            await self.near_duplicates.load(character_id)
+            # Posted tweets are what candidates are ranked for novelty against
+            character_data = {**character_data, "recent_tweets": self.near_duplicates.recent(character_id)}
+        
+        for _ in range(settings.NEAR_DUPLICATE_MAX_RETRIES + 1):
+            # Prefer a pre-generated tweet; fall back to generating now
+            candidates = []
+            if self.tweet_buffer:
+                buffered = await self.tweet_buffer.pop(character_id, character_data)
+                if buffered:
+                    candidates = [buffered]
+            if not candidates and buffered_only:
+                return None
+            if not candidates and self._should_stream(character_id):
+                # Operators are watching: stream so they see progress and can abort
+                streamed = clean_tweet(await self.ws_server.stream_generation(
+                    character_id,
+                    self.ws_server.ai_client.stream_tweet(character=character_data)
+                ))
+                ranker = self.ws_server.ai_client.candidate_ranker
+                if ranker.passes_filter(streamed, ranker.restricted_terms(character_data)):
+                    candidates = [streamed]
+                else:
+                    self.ws_server.logger.info(f"[TWEET] Rejected streamed tweet by content filter: {streamed}")
+                    continue
+            if not candidates:
+                ranked = await self.ws_server.ai_client.generate_tweet_candidates(
+                    character=character_data
+                )
+                # Candidates failing the length or restricted-term filter are never posted
+                candidates = [candidate["text"] for candidate in ranked if candidate["passed"]]
+            
+            # Walk the ranked candidates before paying for another round trip
+            for tweet_content in candidates:
+                if not tweet_content:
+                    continue
+                match = self.near_duplicates.check(character_id, tweet_content) if self.near_duplicates else None
+                if not match:
+                    return tweet_content
+                self.ws_server.logger.info(
+                    f"[TWEET] Rejected near-duplicate ({match['similarity']:.2f}) of: {match['text']}"
+                )
+        
+        return None
+
+    async def _seed_near_duplicates(self, character_id: str, twitter_client: TwitterClient) -> None:
+        """Seed an empty duplicate index from the account's own timeline"""
+        if not self.near_duplicates:
+            return
+        await self.near_duplicates.load(character_id)
+        if self.near_duplicates.size(character_id) or not twitter_client.user_id:
+            return
+        try:
+            recent_tweets = await twitter_client.get_user_timeline(twitter_client.user_id, limit=20)
+        except Exception as e:
+            self.ws_server.logger.warning(f"Could not seed duplicate index for {character_id}: {str(e)}")
+            return
+        # Timeline comes newest first; index oldest first
+        for tweet in reversed(recent_tweets or []):
+            if tweet.get('text'):
+                await self.near_duplicates.add(character_id, tweet['text'])
+
+    def _should_stream(self, character_id: str) -> bool:
+        """Stream generations only when a monitor subscribed to them"""
+        return (
+            settings.LLM_STREAMING_ENABLED and
+            hasattr(self.ws_server, "has_generation_subscribers") and
+            self.ws_server.has_generation_subscribers(character_id)
+        )
+
+    async def _generate_reply(self, character_id: str, character: AICharacter, content: str, user_name: str) -> str:
+        """Generate a reply, streaming it to subscribed monitors"""
+        if self._should_stream(character_id):
+            return await self.ws_server.stream_generation(
+                character_id,
+                self.ai_client.stream_reply(character, content, user_name),
+                kind="reply"
+            )
+        return await self.ai_client.generate_reply(
+            character=character,
+            content=content,
+            user_name=user_name
+        )
+
+    def _build_character_data(self, character_id: str, character: AICharacter) -> Dict:
+        """Character profile passed to tweet generation"""
+        return {
+            "id": character_id,
+            "name": character.name,
+            "personality": {
+                "character_name": character.personality.character_name,
+                "character_type": character.personality.character_type,
+                "creation_prompt": character.personality.creation_prompt,
+                "avatar_description": character.personality.avatar_description,
+                "background_story": character.personality.background_story,
+                "key_traits": character.personality.key_traits,
+                "version": character.personality.version,
+                "knowledge_base": character.personality.knowledge_base,
+                "core_values": character.personality.core_values,
+                
+                "base_personality": {
+                    "core_description": character.personality.base_personality.core_description,
+                    "background_story": character.personality.base_personality.background_story,
+                    "key_traits": character.personality.base_personality.key_traits,
+                    "origin_story": character.personality.base_personality.origin_story,
+                    "defining_characteristics": character.personality.base_personality.defining_characteristics
+                },
+                "psychological_profile": {
+                    "personality_type": character.personality.psychological_profile.personality_type,
+                    "cognitive_patterns": character.personality.psychological_profile.cognitive_patterns,
+                    "defense_mechanisms": character.personality.psychological_profile.defense_mechanisms,
+                    "psychological_needs": character.personality.psychological_profile.psychological_needs,
+                    "motivation_factors": character.personality.psychological_profile.motivation_factors,
+                    "growth_potential": character.personality.psychological_profile.growth_potential,
+                    "adaptation_rate": character.personality.psychological_profile.adaptation_rate,
+                    "stress_responses": character.personality.psychological_profile.stress_responses
+                },
+                "speech_patterns": {
+                    "style": character.personality.speech_patterns.style,
+                    "common_phrases": character.personality.speech_patterns.common_phrases,
+                    "vocabulary_preferences": character.personality.speech_patterns.vocabulary_preferences,
+                    "linguistic_quirks": character.personality.speech_patterns.linguistic_quirks,
+                    "communication_patterns": character.personality.speech_patterns.communication_patterns,
+                    "formality_spectrum": character.personality.speech_patterns.formality_spectrum,
+                    "formality_level": character.personality.speech_patterns.formality_level,
+                    "tone": character.personality.speech_patterns.tone,
+                    "vocabulary_level": character.personality.speech_patterns.vocabulary_level,
+                    "typical_expressions": character.personality.speech_patterns.typical_expressions,
+                    "language_quirks": character.personality.speech_patterns.language_quirks,
+                    "emoji_usage": character.personality.speech_patterns.emoji_usage
+                },
+                "behavioral_patterns": {
+                    "interaction_style": character.personality.behavioral_patterns.interaction_style,
+                    "triggers": character.personality.behavioral_patterns.triggers,
+                    "habits": character.personality.behavioral_patterns.habits,
+                    "preferences": character.personality.behavioral_patterns.preferences,
+                    "response_patterns": character.personality.behavioral_patterns.response_patterns,
+                    "social_adaptability": character.personality.behavioral_patterns.social_adaptability,
+                    "decision_making_style": character.personality.behavioral_patterns.decision_making_style,
+                    "risk_tolerance": character.personality.behavioral_patterns.risk_tolerance
+                },
+                "emotional_intelligence": {
+                    "empathy_level": character.personality.emotional_intelligence.empathy_level,
+                    "emotional_awareness": character.personality.emotional_intelligence.emotional_awareness,
+                    "social_perception": character.personality.emotional_intelligence.social_perception,
+                    "emotional_regulation": character.personality.emotional_intelligence.emotional_regulation,
+                    "conflict_resolution_style": character.personality.emotional_intelligence.conflict_resolution_style
+                },
+                "cultural_awareness": {
+                    "known_cultures": character.personality.cultural_awareness.known_cultures,
+                    "cultural_sensitivity": character.personality.cultural_awareness.cultural_sensitivity,
+                    "taboo_topics": character.personality.cultural_awareness.taboo_topics,
+                    "preferred_cultural_references": character.personality.cultural_awareness.preferred_cultural_references,
+                    "social_norms_understanding": character.personality.cultural_awareness.social_norms_understanding
+                },
+                "opinion_system": {
+                    "core_beliefs": character.personality.opinion_system.core_beliefs,
+                    "opinion_strength": character.personality.opinion_system.opinion_strength,
+                    "persuadability": character.personality.opinion_system.persuadability,
+                    "opinion_expression_style": character.personality.opinion_system.opinion_expression_style,
+                    "belief_update_rate": character.personality.opinion_system.belief_update_rate
+                },
+                "emotional_traits": {
+                    "default_state": character.personality.emotional_traits.default_state,
+                    "emotional_range": character.personality.emotional_traits.emotional_range,
+                    "emotional_stability": character.personality.emotional_traits.emotional_stability,
+                    "triggers": character.personality.emotional_traits.triggers,
+                    "expression_style": character.personality.emotional_traits.expression_style,
+                    "emotional_memory": character.personality.emotional_traits.emotional_memory,
+                    "coping_mechanisms": character.personality.emotional_traits.coping_mechanisms
+                },
+                "ethical_framework": {
+                    "moral_values": character.personality.ethical_framework.moral_values,
+                    "ethical_boundaries": character.personality.ethical_framework.ethical_boundaries,
+                    "content_restrictions": character.personality.ethical_framework.content_restrictions,
+                    "sensitive_topics": character.personality.ethical_framework.sensitive_topics
+                },
+                "character_development": {
+                    "growth_areas": character.personality.character_development.growth_areas,
+                    "learning_style": character.personality.character_development.learning_style,
+                    "adaptation_rate": character.personality.character_development.adaptation_rate,
+                    "experience_processing": character.personality.character_development.experience_processing,
+                    "skill_development_focus": character.personality.character_development.skill_development_focus,
+                    "memory_retention": character.personality.character_development.memory_retention,
+                    "development_goals": character.personality.character_development.development_goals
+                }
+            }
+        }
+
     async def stop_behavior_loop(self, character_id: str) -> None:
         """Stop behavior loop for character"""
         self.running = False
@@ -830,4 +1037,10 @@ class BehaviorController:
             if not task.done():
                 task.cancel()
             await asyncio.sleep(0.5)  # Biraz daha bekle
-            del self.current_tasks[character_id] 
\ No newline at end of file
+            del self.current_tasks[character_id]
+        
+        if self.tweet_buffer:
+            await self.tweet_buffer.stop(character_id)
+        
+        if character_id in self.reply_pipelines:
+            await self.reply_pipelines.pop(character_id).stop() 
\ No newline at end of file
@@ -0,0 +1,146 @@
+import hashlib
+import random
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..config.settings import settings
+
+WORD_PATTERN = re.compile(r"\w+")
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def shingle_set(text: str, size: int = 3) -> Set[str]:
+    """Word n-grams of normalized text (whole text when shorter than size)"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Fixed-seed MinHash so signatures stay comparable across restarts"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.permutations = [
+            (rng.randint(1, MERSENNE_PRIME - 1), rng.randint(0, MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    @staticmethod
+    def _hash(shingle: str) -> int:
+        return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+
+    def signature(self, text: str) -> List[int]:
+        hashes = [self._hash(shingle) for shingle in shingle_set(text)]
+        if not hashes:
+            return [MAX_HASH] * self.num_perm
+        return [
+            min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+            for a, b in self.permutations
+        ]
+
+    @staticmethod
+    def similarity(left: List[int], right: List[int]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+class NearDuplicateIndex:
+    """Per-character MinHash/LSH index of posted tweets.
+
+    Signatures live in MongoDB and are loaded into memory the first time a
+    character is checked, so a lookup only touches the LSH buckets for the
+    candidate instead of comparing against every past tweet.
+    """
+
+    def __init__(self, db: Any, threshold: float = None, num_perm: int = 64, bands: int = 16):
+        self.db = db
+        self.threshold = threshold or settings.NEAR_DUPLICATE_THRESHOLD
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # character_id -> entries, and (band, bucket hash) -> entry positions
+        self._entries: Dict[str, List[Tuple[str, List[int]]]] = {}
+        self._buckets: Dict[str, Dict[Tuple[int, int], List[int]]] = {}
+        self.stats = {"checks": 0, "duplicates": 0, "added": 0}
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, int]]:
+        return [
+            (band, hash(tuple(signature[band * self.rows:(band + 1) * self.rows])))
+            for band in range(self.bands)
+        ]
+
+    def _insert(self, character_id: str, text: str, signature: List[int]):
+        entries = self._entries.setdefault(character_id, [])
+        buckets = self._buckets.setdefault(character_id, defaultdict(list))
+        position = len(entries)
+        entries.append((text, signature))
+        for key in self._band_keys(signature):
+            buckets[key].append(position)
+
+    def is_loaded(self, character_id: str) -> bool:
+        return character_id in self._entries
+
+    def size(self, character_id: str) -> int:
+        return len(self._entries.get(character_id, []))
+
+    async def load(self, character_id: str) -> None:
+        """Load a character's stored signatures once"""
+        if self.is_loaded(character_id):
+            return
+        self._entries[character_id] = []
+        self._buckets[character_id] = defaultdict(list)
+        for doc in await self.db.get_tweet_signatures(character_id):
+            self._insert(character_id, doc["text"], doc["signature"])
+
+    def recent(self, character_id: str, limit: int = 20) -> List[str]:
+        """Most recently indexed tweets, newest last"""
+        return [text for text, _ in self._entries.get(character_id, [])[-limit:]]
+
+    def check(self, character_id: str, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the closest posted tweet above the similarity threshold
+
+        Returns:
+            dict: {"text", "similarity"} of the match, or None
+        """
+        self.stats["checks"] += 1
+        signature = self.hasher.signature(text)
+        entries = self._entries.get(character_id, [])
+        buckets = self._buckets.get(character_id, {})
+
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(buckets.get(key, ()))
+
+        best = None
+        for position in candidates:
+            past_text, past_signature = entries[position]
+            similarity = self.hasher.similarity(signature, past_signature)
+            if similarity >= self.threshold and (best is None or similarity > best["similarity"]):
+                best = {"text": past_text, "similarity": similarity}
+
+        if best:
+            self.stats["duplicates"] += 1
+        return best
+
+    async def add(self, character_id: str, text: str) -> None:
+        """Index a posted tweet in memory and MongoDB"""
+        await self.load(character_id)
+        signature = self.hasher.signature(text)
+        self._insert(character_id, text, signature)
+        await self.db.add_tweet_signature(character_id, text, signature)
+        self.stats["added"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get check/duplicate counters"""
+        return {
+            **self.stats,
+            "characters": len(self._entries),
+            "indexed": sum(len(entries) for entries in self._entries.values())
+        }
@@ -0,0 +1,78 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+from .models import AICharacter
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase unigrams plus bigrams, with hashtags and mentions unwrapped"""
+    words = TOKEN_PATTERN.findall(text.lower())
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class LexicalRanker:
+    """Local BM25 pre-ranker for candidate tweets.
+
+    Scores search results against the character's content focus, knowledge
+    base and preferred hashtags so only the most plausible candidates are
+    sent to the LLM for relevance scoring.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+    @staticmethod
+    def build_query(character: AICharacter) -> List[str]:
+        """Collect the character's interest terms"""
+        phrases = list(character.twitter_behavior.content_focus or [])
+        phrases.extend(character.twitter_behavior.hashtag_usage.get("preferred_tags", []))
+        for entry in character.personality.knowledge_base or []:
+            phrases.append(entry.get("topic", "") if isinstance(entry, dict) else str(entry))
+
+        terms = []
+        for phrase in phrases:
+            terms.extend(tokenize(phrase))
+        return list(dict.fromkeys(terms))
+
+    def score(self, query: List[str], documents: List[str]) -> List[float]:
+        """BM25 score of every document for the query terms"""
+        if not documents:
+            return []
+
+        tokenized = [tokenize(doc) for doc in documents]
+        doc_count = len(tokenized)
+        average_length = sum(len(doc) for doc in tokenized) / doc_count or 1.0
+
+        document_frequency = Counter()
+        for doc in tokenized:
+            document_frequency.update(set(doc))
+
+        scores = []
+        for doc in tokenized:
+            term_counts = Counter(doc)
+            length_norm = self.k1 * (1 - self.b + self.b * len(doc) / average_length)
+            total = 0.0
+            for term in query:
+                frequency = term_counts.get(term)
+                if not frequency:
+                    continue
+                df = document_frequency[term]
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                total += idf * frequency * (self.k1 + 1) / (frequency + length_norm)
+            scores.append(total)
+        return scores
+
+    def top_k(self, character: AICharacter, tweets: List[Dict], k: int) -> List[Dict]:
+        """Return the k best lexical matches, dropping tweets with no overlap"""
+        query = self.build_query(character)
+        if not query:
+            return tweets[:k]
+
+        scores = self.score(query, [tweet.get("text", "") for tweet in tweets])
+        ranked = sorted(zip(scores, range(len(tweets))), key=lambda x: (-x[0], x[1]))
+        return [tweets[i] for score, i in ranked[:k] if score > 0]
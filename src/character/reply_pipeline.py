@@ -0,0 +1,259 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from ..ai.budget import BudgetExceededError
+from ..config.settings import settings
+
+# Lower sorts first
+PRIORITY_CONVERSATION = 0  # Reply in a thread the character is part of
+PRIORITY_MENTION = 1
+
+
+def mention_priority(mention: Dict) -> int:
+    """Answer ongoing conversations before fresh mentions"""
+    return PRIORITY_CONVERSATION if mention.get("in_reply_to_status_id") else PRIORITY_MENTION
+
+
+def _tweet_id(mention: Dict) -> int:
+    try:
+        return int(mention["tweet_id"])
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of a failed call, if the error carries one"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_permanent(error: BaseException) -> bool:
+    """4xx other than 429: retrying the same reply cannot succeed"""
+    status = _status_code(error)
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+class ReplyPipeline:
+    """Per-character mention backlog with concurrent generation and paced posting.
+
+    Every submitted mention goes into a priority queue (conversations first,
+    then oldest first). Several workers take mentions from it and generate
+    replies at the same time; the process-wide LLM scheduler still bounds
+    how many completions run at once. Finished replies wait in a second
+    queue for a single poster that spaces posts to stay under the account's
+    write rate limit.
+
+    A failed mention is held back with an exponentially growing delay
+    before it can be submitted again, keeping its reply text if only the
+    post failed. It is dropped (on_dropped is called) after max_attempts
+    failures or on a permanent 4xx. Running out of LLM budget only delays
+    the mention and does not count as an attempt.
+    """
+
+    def __init__(self,
+                 character_id: str,
+                 generate: Callable[[Dict], Awaitable[str]],
+                 post: Callable[[Dict, str], Awaitable[Dict]],
+                 on_posted: Callable[[Dict, str, Dict], Awaitable[None]] = None,
+                 on_dropped: Callable[[Dict, Exception], Awaitable[None]] = None,
+                 workers: int = None,
+                 write_limit: int = None,
+                 write_window: float = None):
+        """
+        Args:
+            character_id: Character whose mentions are answered
+            generate: Builds the reply text for a mention
+            post: Posts a reply to a mention, returns the posted tweet
+            on_posted: Called after each successful post
+            on_dropped: Called for a mention given up on
+            workers: Concurrent reply generations for this character
+            write_limit: Posts allowed per write_window
+            write_window: Write rate limit window in seconds
+        """
+        self.character_id = character_id
+        self.generate = generate
+        self.post = post
+        self.on_posted = on_posted
+        self.on_dropped = on_dropped
+        self.workers = workers or settings.REPLY_PIPELINE_WORKERS
+        self.write_limit = write_limit if write_limit is not None else settings.TWITTER_WRITE_RATE_LIMIT
+        self.write_window = write_window or settings.TWITTER_WRITE_RATE_WINDOW
+        self.min_spacing = self.write_window / self.write_limit if self.write_limit > 0 else 0.0
+        self.max_attempts = settings.REPLY_MAX_ATTEMPTS
+        self.retry_backoff = settings.REPLY_RETRY_BACKOFF
+        self.max_retry_backoff = settings.REPLY_RETRY_MAX_BACKOFF
+        self.logger = logging.getLogger(__name__)
+
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.ready: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._order = itertools.count()  # Keeps heap entries comparable
+        self._tasks: List[asyncio.Task] = []
+        self._active: Set[str] = set()  # Queued, generating or waiting to post
+        self._attempts: Dict[str, int] = {}  # tweet_id -> failed attempts
+        self._retry_at: Dict[str, float] = {}  # tweet_id -> earliest resubmission
+        self._drafts: Dict[str, str] = {}  # tweet_id -> generated reply whose post failed
+        self.generating = 0
+        self.last_post = 0.0
+        self.posts: Deque[float] = deque()  # Post times within max(write_window, 1 hour)
+        self.stats = {"submitted": 0, "generated": 0, "posted": 0, "failed": 0, "dropped": 0, "max_backlog": 0}
+
+    def start(self) -> None:
+        """Start the generation workers and the poster, once"""
+        if any(not task.done() for task in self._tasks):
+            return
+        self._tasks = [
+            asyncio.create_task(self._generate_worker(), name=f"reply_generate_{self.character_id}_{i}")
+            for i in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._poster(), name=f"reply_post_{self.character_id}"))
+
+    def submit(self, mentions: List[Dict]) -> int:
+        """
+        Queue mentions that are not already in the pipeline or backing off
+
+        Returns:
+            int: Number of mentions added
+        """
+        self.start()
+        now = time.monotonic()
+        added = 0
+        for mention in mentions:
+            if mention["tweet_id"] in self._active or self._retry_at.get(mention["tweet_id"], 0.0) > now:
+                continue
+            self._active.add(mention["tweet_id"])
+            self.queue.put_nowait((mention_priority(mention), _tweet_id(mention), next(self._order), mention))
+            added += 1
+        self.stats["submitted"] += added
+        self.stats["max_backlog"] = max(self.stats["max_backlog"], self.backlog())
+        return added
+
+    def backlog(self) -> int:
+        """Mentions accepted but not yet answered"""
+        return len(self._active)
+
+    async def _fail(self, mention: Dict, stage: str, error: Exception) -> None:
+        """Back off a failed mention, or drop it for good"""
+        tweet_id = mention["tweet_id"]
+        self.stats["failed"] += 1
+        self._active.discard(tweet_id)
+        self.logger.warning(f"Reply {stage} failed for {self.character_id} mention {tweet_id}: {str(error)}")
+
+        if isinstance(error, BudgetExceededError):
+            self._retry_at[tweet_id] = time.monotonic() + self.max_retry_backoff
+            return
+
+        attempts = self._attempts.get(tweet_id, 0) + 1
+        if attempts >= self.max_attempts or is_permanent(error):
+            await self._drop(mention, error)
+            return
+        self._attempts[tweet_id] = attempts
+        backoff = min(self.max_retry_backoff, self.retry_backoff * (2 ** (attempts - 1)))
+        self._retry_at[tweet_id] = time.monotonic() + backoff
+
+    async def _drop(self, mention: Dict, error: Exception) -> None:
+        self.stats["dropped"] += 1
+        self._forget(mention["tweet_id"])
+        self.logger.warning(f"Giving up on {self.character_id} mention {mention['tweet_id']}")
+        if self.on_dropped:
+            try:
+                await self.on_dropped(mention, error)
+            except Exception as e:
+                self.logger.error(f"Error dropping mention for {self.character_id}: {str(e)}")
+
+    def _forget(self, tweet_id: str) -> None:
+        self._attempts.pop(tweet_id, None)
+        self._retry_at.pop(tweet_id, None)
+        self._drafts.pop(tweet_id, None)
+
+    async def _generate_worker(self) -> None:
+        while True:
+            priority, tweet_id, order, mention = await self.queue.get()
+            self.generating += 1
+            try:
+                # A reply whose post failed is posted again as is
+                text = self._drafts.get(mention["tweet_id"])
+                if text is None:
+                    text = await self.generate(mention)
+                    self.stats["generated"] += 1
+                self.ready.put_nowait((priority, tweet_id, order, mention, text))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._fail(mention, "generation", e)
+            finally:
+                self.generating -= 1
+                self.queue.task_done()
+
+    def _pace(self, now: float) -> float:
+        """Seconds to wait before the next post fits the write limit"""
+        while self.posts and now - self.posts[0] >= max(self.write_window, 3600):
+            self.posts.popleft()
+        wait = self.last_post + self.min_spacing - now
+        in_window = [at for at in self.posts if now - at < self.write_window]
+        if self.write_limit > 0 and len(in_window) >= self.write_limit:
+            wait = max(wait, self.write_window - (now - in_window[0]))
+        return max(wait, 0.0)
+
+    async def _poster(self) -> None:
+        while True:
+            _, _, _, mention, text = await self.ready.get()
+            try:
+                wait = self._pace(time.monotonic())
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                result = await self.post(mention, text)
+                now = time.monotonic()
+                self.last_post = now
+                self.posts.append(now)
+                self.stats["posted"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._drafts[mention["tweet_id"]] = text
+                await self._fail(mention, "posting", e)
+                continue
+            finally:
+                self.ready.task_done()
+
+            # Stays active until recorded as replied, so a poll in between
+            # cannot submit it again
+            if self.on_posted:
+                try:
+                    await self.on_posted(mention, text, result)
+                except Exception as e:
+                    self.logger.error(f"Error recording reply for {self.character_id}: {str(e)}")
+            self._forget(mention["tweet_id"])
+            self._active.discard(mention["tweet_id"])
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued mentions are dropped"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._active.clear()
+        self.queue = asyncio.PriorityQueue()
+        self.ready = asyncio.PriorityQueue()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Backlog depth per stage and reply throughput"""
+        now = time.monotonic()
+        next_post_in = self._pace(now) if self.ready.qsize() else 0.0
+        last_hour = [at for at in self.posts if now - at < 3600]
+        return {
+            **self.stats,
+            "backlog": self.backlog(),
+            "backing_off": sum(1 for at in self._retry_at.values() if at > now),
+            "queued": self.queue.qsize(),
+            "generating": self.generating,
+            "ready_to_post": self.ready.qsize(),
+            "next_post_in": round(next_post_in, 1),
+            "posted_last_minute": sum(1 for at in last_hour if now - at < 60),
+            "posted_last_hour": len(last_hour)
+        }
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from ..ai.candidates import MAX_TWEET_LENGTH, clean_tweet
+from ..ai.prompt_cache import prompt_cache
+from ..config.settings import settings
+
+
+class TweetBuffer:
+    """Per-character buffer of pre-generated tweets.
+
+    Tweets are generated in the background while the behavior loop is idle
+    and stored in MongoDB, so posting only pops a ready tweet. Each entry
+    records the profile fingerprint it was built from; entries that expire
+    or no longer match the current profile are never posted. Generated
+    tweets pass the same length and restricted-term filter as tweets
+    generated at post time.
+    """
+
+    def __init__(self,
+                 db: Any,
+                 ai_client: Any,
+                 near_duplicates: Any = None,
+                 size: int = None,
+                 ttl_seconds: float = None):
+        self.db = db
+        self.ai_client = ai_client
+        self.near_duplicates = near_duplicates
+        self.size = size or settings.TWEET_BUFFER_SIZE
+        self.ttl_seconds = ttl_seconds or settings.TWEET_BUFFER_TTL
+        self.logger = logging.getLogger(__name__)
+
+        self._refills: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "generated": 0, "rejected": 0, "refill_errors": 0}
+
+    @staticmethod
+    def clean(text: Any) -> Optional[str]:
+        """Normalize a generated tweet, or None if it is not postable"""
+        if not isinstance(text, str):
+            return None
+        text = clean_tweet(text)
+        if not text or len(text) > MAX_TWEET_LENGTH:
+            return None
+        return text
+
+    async def pop(self, character_id: str, character_data: Dict) -> Optional[str]:
+        """Take a ready tweet, or None when the buffer is empty"""
+        text = await self.db.pop_buffered_tweet(character_id, prompt_cache.fingerprint(character_data))
+        self.stats["hits" if text else "misses"] += 1
+        return text
+
+    def schedule_refill(self, character_id: str, character_data: Dict) -> None:
+        """Top up the buffer in the background unless a refill is running"""
+        task = self._refills.get(character_id)
+        if task is not None and not task.done():
+            return
+        self._refills[character_id] = asyncio.create_task(
+            self.refill(character_id, character_data),
+            name=f"tweet_buffer_refill_{character_id}"
+        )
+
+    async def refill(self, character_id: str, character_data: Dict) -> int:
+        """Generate tweets until the buffer holds size fresh entries"""
+        fingerprint = prompt_cache.fingerprint(character_data)
+        buffered = await self.db.get_buffered_tweets(character_id, fingerprint)
+        ranker = self.ai_client.candidate_ranker
+        restricted = ranker.restricted_terms(character_data)
+        recent_tweets: List[str] = []
+        if self.near_duplicates:
+            await self.near_duplicates.load(character_id)
+            recent_tweets = self.near_duplicates.recent(character_id)
+
+        generated: List[str] = []
+        try:
+            # One at a time: identical concurrent prompts would be coalesced
+            # into a single completion, and this is background work anyway
+            attempts = 0
+            while len(buffered) + len(generated) < self.size and attempts < self.size * 2:
+                attempts += 1
+                text = self.clean(await self.ai_client.generate_tweet(
+                    character={**character_data, "recent_tweets": recent_tweets}
+                ))
+                if (text is None or text in buffered or text in generated or
+                        not ranker.passes_filter(text, restricted) or
+                        (self.near_duplicates and self.near_duplicates.check(character_id, text))):
+                    self.stats["rejected"] += 1
+                    continue
+                generated.append(text)
+        except Exception as e:
+            self.stats["refill_errors"] += 1
+            self.logger.warning(f"Tweet buffer refill failed for {character_id}: {str(e)}")
+
+        if generated:
+            await self.db.push_buffered_tweets(character_id, generated, fingerprint, self.ttl_seconds)
+            self.stats["generated"] += len(generated)
+        return len(generated)
+
+    async def stop(self, character_id: str) -> None:
+        """Cancel a running refill"""
+        task = self._refills.pop(character_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss and refill counters"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "refilling": sum(1 for task in self._refills.values() if not task.done())
+        }
@@ -1,9 +1,12 @@
 import json
 import asyncio
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.character.models import AICharacter
 from src.database.mongodb import MongoDBManager
@@ -11,6 +14,7 @@ from src.config.settings import settings
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
+from rich.table import Table
 
 console = Console()
 
@@ -35,6 +39,152 @@ async def load_character(file_path: str) -> Optional[str]:
         console.print(f"[red]Error loading character:[/red] {str(e)}")
         return None
 
+def read_character_specs(path: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Read character specs from a directory of JSON files or a JSONL file
+
+    A JSON file may hold one spec or a list of them.
+
+    Returns:
+        list: (source, spec) pairs; source names the file and line or index
+    """
+    source = Path(path)
+    specs = []
+    if source.is_dir():
+        for file in sorted(source.glob("*.json")):
+            with open(file, "r") as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                specs.extend((f"{file.name}[{i}]", spec) for i, spec in enumerate(data))
+            else:
+                specs.append((file.name, data))
+    else:
+        with open(source, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    specs.append((f"{source.name}:{line_number}", json.loads(line)))
+    return specs
+
+
+def validate_character(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a spec into a storable character document (runs in a worker process)"""
+    character = AICharacter(**spec).model_dump()
+    character.setdefault("created_at", datetime.utcnow())
+    return character
+
+
+async def load_characters(path: str, workers: int = None, batch_size: int = 100) -> Dict[str, Any]:
+    """
+    Load many characters without prompting
+
+    Specs without a personality but with a description get one generated.
+    Generation runs concurrently; the shared LLM engine keeps it under
+    LLM_MAX_CONCURRENCY and the rate limits. Specs are validated in a
+    process pool and written with insert_many in batches.
+
+    Returns:
+        dict: Counts, stage timings and failures
+    """
+    started = time.perf_counter()
+    failures = []
+    report = {"specs": 0, "generated": 0, "validated": 0, "inserted": 0, "timings": {}}
+
+    try:
+        specs = read_character_specs(path)
+    except Exception as e:
+        console.print(f"[red]Error reading character specs:[/red] {str(e)}")
+        return {**report, "failures": [(path, str(e))]}
+    report["specs"] = len(specs)
+
+    # Generate missing personalities
+    stage = time.perf_counter()
+    to_generate = [
+        (source, spec) for source, spec in specs
+        if not spec.get("personality") and spec.get("description")
+    ]
+    if to_generate:
+        # Imported lazily: plain loads never start the LLM engine
+        from src.ai.chatgpt import ChatGPTClient
+        ai_client = ChatGPTClient(settings.OPENAI_API_KEY, settings.OPENAI_MODEL)
+
+        async def generate(spec: Dict[str, Any]):
+            description = spec.pop("description")
+            personality = await ai_client.generate_personality(description, spec.get("name", ""))
+            personality.background_story = description
+            spec["personality"] = personality.model_dump()
+
+        results = await asyncio.gather(
+            *[generate(spec) for _, spec in to_generate],
+            return_exceptions=True
+        )
+        failed = set()
+        for (source, spec), result in zip(to_generate, results):
+            if isinstance(result, Exception):
+                failed.add(id(spec))
+                failures.append((source, f"personality generation failed: {str(result)}"))
+        specs = [(source, spec) for source, spec in specs if id(spec) not in failed]
+        report["generated"] = len(to_generate) - len(failed)
+        await ai_client.cost_meter.flush()
+        await ai_client.engine.close()
+    report["timings"]["generation"] = time.perf_counter() - stage
+
+    # Validate in a process pool so large batches don't block the event loop
+    stage = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = await asyncio.gather(
+            *[loop.run_in_executor(pool, validate_character, spec) for _, spec in specs],
+            return_exceptions=True
+        )
+    valid = []
+    for (source, _), result in zip(specs, results):
+        if isinstance(result, Exception):
+            failures.append((source, f"validation failed: {str(result)}"))
+        else:
+            valid.append((source, result))
+    report["validated"] = len(valid)
+    report["timings"]["validation"] = time.perf_counter() - stage
+
+    # Write in batches
+    stage = time.perf_counter()
+    db = MongoDBManager(settings.MONGODB_URL)
+    for i in range(0, len(valid), batch_size):
+        batch = valid[i:i + batch_size]
+        inserted_ids = await db.create_characters([character for _, character in batch])
+        for (source, _), inserted_id in zip(batch, inserted_ids):
+            if inserted_id is None:
+                failures.append((source, "database write failed"))
+            else:
+                report["inserted"] += 1
+    report["timings"]["write"] = time.perf_counter() - stage
+
+    report["timings"]["total"] = time.perf_counter() - started
+    report["failures"] = failures
+    return report
+
+
+def print_load_report(report: Dict[str, Any]):
+    """Print throughput and failures of a bulk load"""
+    total = report["timings"].get("total", 0.0)
+
+    table = Table(title="Bulk character load")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Specs", str(report["specs"]))
+    table.add_row("Personalities generated", str(report["generated"]))
+    table.add_row("Validated", str(report["validated"]))
+    table.add_row("Inserted", str(report["inserted"]))
+    table.add_row("Failed", str(len(report["failures"])))
+    for stage, elapsed in report["timings"].items():
+        table.add_row(f"{stage.capitalize()} time", f"{elapsed:.2f}s")
+    if total:
+        table.add_row("Throughput", f"{report['inserted'] / total:.1f} characters/s")
+    console.print(table)
+
+    for source, error in report["failures"]:
+        console.print(f"[red]{source}:[/red] {error}")
+
+
 async def main():
     """Main function"""
     console.print(Panel.fit(
@@ -65,4 +215,9 @@ async def main():
         console.print("[red]Invalid selection![/red]")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    if len(sys.argv) > 1:
+        # Bulk mode: character_loader.py <directory or .jsonl> [workers]
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        print_load_report(asyncio.run(load_characters(sys.argv[1], workers)))
+    else:
+        asyncio.run(main()) 
\ No newline at end of file
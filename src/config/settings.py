@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 from dotenv import load_dotenv
 
 # Load .env file
@@ -18,7 +18,98 @@ class Settings:
     # OpenAI Settings
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4")
-    
+    # Extra keys / endpoints pooled with OPENAI_API_KEY (comma-separated)
+    OPENAI_API_KEYS: List[str] = [k.strip() for k in os.getenv("OPENAI_API_KEYS", "").split(",") if k.strip()]
+    OPENAI_BASE_URLS: List[str] = [u.strip() for u in os.getenv("OPENAI_BASE_URLS", "").split(",") if u.strip()]
+
+    # LLM Engine Settings
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "openai")  # openai or fake (offline load testing)
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "50"))  # in-flight calls per process
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))  # shared HTTP pool size
+    LLM_REQUEST_TIMEOUT: float = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))  # seconds per call
+    LLM_RPM_LIMIT: int = int(os.getenv("LLM_RPM_LIMIT", "500"))  # requests per minute per key, 0 = unlimited
+    LLM_TPM_LIMIT: int = int(os.getenv("LLM_TPM_LIMIT", "30000"))  # tokens per minute per key, 0 = unlimited
+    LLM_KEY_EJECT_SECONDS: float = float(os.getenv("LLM_KEY_EJECT_SECONDS", "30"))  # after 429/5xx, doubles per repeat
+    LLM_KEY_MAX_EJECT_SECONDS: float = float(os.getenv("LLM_KEY_MAX_EJECT_SECONDS", "300"))
+    LLM_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))  # consecutive failures
+    LLM_BREAKER_BASE_BACKOFF: float = float(os.getenv("LLM_BREAKER_BASE_BACKOFF", "2"))  # seconds, doubles per reopen
+    LLM_BREAKER_MAX_BACKOFF: float = float(os.getenv("LLM_BREAKER_MAX_BACKOFF", "120"))  # seconds
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"  # duplicate slow calls
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))  # latencies before hedging starts
+    LLM_PROMPT_TOKEN_BUDGET: int = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "3000"))  # max prompt tokens per call
+    LLM_STREAMING_ENABLED: bool = os.getenv("LLM_STREAMING_ENABLED", "true").lower() == "true"  # stream to subscribed monitors
+    TWEET_CANDIDATES: int = int(os.getenv("TWEET_CANDIDATES", "3"))  # tweet choices sampled per call, ranked locally
+
+    # Model Routing Settings (empty model = OPENAI_MODEL)
+    LLM_ROUTE_TWEET_MODEL: str = os.getenv("LLM_ROUTE_TWEET_MODEL", "")
+    LLM_ROUTE_TWEET_TEMPERATURE: float = float(os.getenv("LLM_ROUTE_TWEET_TEMPERATURE", "0.7"))
+    LLM_ROUTE_TWEET_MAX_TOKENS: int = int(os.getenv("LLM_ROUTE_TWEET_MAX_TOKENS", "200"))
+    LLM_ROUTE_REPLY_MODEL: str = os.getenv("LLM_ROUTE_REPLY_MODEL", "")
+    LLM_ROUTE_REPLY_TEMPERATURE: float = float(os.getenv("LLM_ROUTE_REPLY_TEMPERATURE", "0.7"))
+    LLM_ROUTE_REPLY_MAX_TOKENS: int = int(os.getenv("LLM_ROUTE_REPLY_MAX_TOKENS", "200"))
+    LLM_ROUTE_ANALYSIS_MODEL: str = os.getenv("LLM_ROUTE_ANALYSIS_MODEL", "gpt-3.5-turbo")
+    LLM_ROUTE_ANALYSIS_TEMPERATURE: float = float(os.getenv("LLM_ROUTE_ANALYSIS_TEMPERATURE", "0.2"))
+    LLM_ROUTE_ANALYSIS_MAX_TOKENS: int = int(os.getenv("LLM_ROUTE_ANALYSIS_MAX_TOKENS", "800"))
+    LLM_ROUTE_ETHICS_MODEL: str = os.getenv("LLM_ROUTE_ETHICS_MODEL", "gpt-3.5-turbo")
+    LLM_ROUTE_ETHICS_TEMPERATURE: float = float(os.getenv("LLM_ROUTE_ETHICS_TEMPERATURE", "0.0"))
+    LLM_ROUTE_ETHICS_MAX_TOKENS: int = int(os.getenv("LLM_ROUTE_ETHICS_MAX_TOKENS", "400"))
+    LLM_ROUTE_PERSONALITY_MODEL: str = os.getenv("LLM_ROUTE_PERSONALITY_MODEL", "")
+    LLM_ROUTE_PERSONALITY_TEMPERATURE: float = float(os.getenv("LLM_ROUTE_PERSONALITY_TEMPERATURE", "0.7"))
+    LLM_ROUTE_PERSONALITY_MAX_TOKENS: int = int(os.getenv("LLM_ROUTE_PERSONALITY_MAX_TOKENS", "0"))  # 0 = no limit
+    PERSONALITY_SECTION_ATTEMPTS: int = int(os.getenv("PERSONALITY_SECTION_ATTEMPTS", "3"))  # Per section
+
+    # LLM Budget Settings (USD per character, 0 = unlimited)
+    LLM_CHARACTER_HOURLY_BUDGET: float = float(os.getenv("LLM_CHARACTER_HOURLY_BUDGET", "0"))
+    LLM_CHARACTER_DAILY_BUDGET: float = float(os.getenv("LLM_CHARACTER_DAILY_BUDGET", "0"))
+    LLM_BUDGET_CHEAPER_MODEL: str = os.getenv("LLM_BUDGET_CHEAPER_MODEL", "gpt-3.5-turbo")
+    LLM_BUDGET_DEGRADE_RATIO: float = float(os.getenv("LLM_BUDGET_DEGRADE_RATIO", "0.7"))  # switch to cheaper model
+    LLM_BUDGET_BUFFER_RATIO: float = float(os.getenv("LLM_BUDGET_BUFFER_RATIO", "0.9"))  # buffered tweets only
+    LLM_USAGE_BACKEND: str = os.getenv("LLM_USAGE_BACKEND", "mongodb")  # memory or mongodb
+
+    # Tweet Buffer Settings
+    TWEET_BUFFER_ENABLED: bool = os.getenv("TWEET_BUFFER_ENABLED", "true").lower() == "true"
+    TWEET_BUFFER_SIZE: int = int(os.getenv("TWEET_BUFFER_SIZE", "3"))  # ready tweets per character
+    TWEET_BUFFER_TTL: int = int(os.getenv("TWEET_BUFFER_TTL", "21600"))  # seconds before a tweet is stale
+
+    # Near-Duplicate Detection Settings
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.7"))  # estimated Jaccard
+    NEAR_DUPLICATE_MAX_RETRIES: int = int(os.getenv("NEAR_DUPLICATE_MAX_RETRIES", "2"))  # regenerations before skipping
+
+    # Fake LLM Provider Settings
+    FAKE_LLM_LATENCY_MS: float = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+    FAKE_LLM_LATENCY_JITTER_MS: float = float(os.getenv("FAKE_LLM_LATENCY_JITTER_MS", "0"))
+    FAKE_LLM_LATENCY_DISTRIBUTION: str = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "constant")  # constant, uniform, lognormal
+    FAKE_LLM_ERROR_RATE: float = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+    FAKE_LLM_SEED: int = int(os.getenv("FAKE_LLM_SEED", "42"))
+
+    # LLM Response Cache Settings (analysis calls only)
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+    LLM_CACHE_TTL: int = int(os.getenv("LLM_CACHE_TTL", "3600"))  # seconds
+    LLM_CACHE_BACKEND: str = os.getenv("LLM_CACHE_BACKEND", "memory")  # memory, disk or mongodb
+    LLM_CACHE_DIR: str = os.getenv("LLM_CACHE_DIR", str(BASE_DIR / "cache" / "llm"))
+    RELEVANCE_BATCH_SIZE: int = int(os.getenv("RELEVANCE_BATCH_SIZE", "10"))  # tweets per scoring request
+    RELEVANCE_PRERANK_TOP_K: int = int(os.getenv("RELEVANCE_PRERANK_TOP_K", "5"))  # candidates sent to the LLM
+
+    # Twitter Client Settings (thread pools per process)
+    TWITTER_READ_POOL_SIZE: int = int(os.getenv("TWITTER_READ_POOL_SIZE", "8"))  # search, scrape, notifications
+    TWITTER_WRITE_POOL_SIZE: int = int(os.getenv("TWITTER_WRITE_POOL_SIZE", "4"))  # tweet, reply, like, retweet, follow
+    TWITTER_CLIENT_IDLE_TIMEOUT: float = float(os.getenv("TWITTER_CLIENT_IDLE_TIMEOUT", "900"))  # close idle sessions, 0 = never
+    TWITTER_CLIENT_REAP_INTERVAL: float = float(os.getenv("TWITTER_CLIENT_REAP_INTERVAL", "60"))  # seconds between idle checks
+    TWITTER_NOTIFICATIONS_RATE_LIMIT: int = int(os.getenv("TWITTER_NOTIFICATIONS_RATE_LIMIT", "180"))  # reads per window per account
+    TWITTER_NOTIFICATIONS_RATE_WINDOW: float = float(os.getenv("TWITTER_NOTIFICATIONS_RATE_WINDOW", "900"))  # seconds
+    TWITTER_WRITE_RATE_LIMIT: int = int(os.getenv("TWITTER_WRITE_RATE_LIMIT", "300"))  # posts per window per account
+    TWITTER_WRITE_RATE_WINDOW: float = float(os.getenv("TWITTER_WRITE_RATE_WINDOW", "10800"))  # seconds
+
+    # Mention Polling Settings (adaptive per account)
+    MENTION_POLL_MIN_INTERVAL: float = float(os.getenv("MENTION_POLL_MIN_INTERVAL", "15"))  # busy accounts
+    MENTION_POLL_MAX_INTERVAL: float = float(os.getenv("MENTION_POLL_MAX_INTERVAL", "900"))  # idle accounts
+    MENTION_POLL_BACKOFF: float = float(os.getenv("MENTION_POLL_BACKOFF", "2.0"))  # growth per empty poll
+    REPLY_PIPELINE_WORKERS: int = int(os.getenv("REPLY_PIPELINE_WORKERS", "4"))  # concurrent reply generations per character
+    REPLY_MAX_ATTEMPTS: int = int(os.getenv("REPLY_MAX_ATTEMPTS", "5"))  # failed replies before a mention is dropped
+    REPLY_RETRY_BACKOFF: float = float(os.getenv("REPLY_RETRY_BACKOFF", "60"))  # seconds, doubles per failed attempt
+    REPLY_RETRY_MAX_BACKOFF: float = float(os.getenv("REPLY_RETRY_MAX_BACKOFF", "3600"))  # also the wait while out of budget
+
     # WebSocket Server Settings
     WS_HOST: str = os.getenv("WS_HOST", "localhost")
     WS_PORT: int = int(os.getenv("WS_PORT", "8765"))
@@ -2,9 +2,11 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import motor.motor_asyncio
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 import logging
 
 from ..character.models import AICharacter
+from ..ai.prompt_cache import prompt_cache
 
 class MongoDBManager:
     """MongoDB database manager"""
@@ -19,6 +21,12 @@ class MongoDBManager:
         self.metrics = self.db.metrics
         self.logs = self.db.logs
         self.errors = self.db.errors
+        self.llm_cache = self.db.llm_cache
+        self.tweet_buffer = self.db.tweet_buffer
+        self.tweet_signatures = self.db.tweet_signatures
+        self.llm_usage = self.db.llm_usage
+        self.llm_budgets = self.db.llm_budgets
+        self.mention_state = self.db.mention_state
 
     async def get_connection(self):
         return self.client
@@ -72,6 +80,33 @@ class MongoDBManager:
             print(f"Error creating character: {str(e)}")
             return None
 
+    async def create_characters(self, characters: List[Dict]) -> List[Optional[str]]:
+        """
+        Insert many characters in one unordered bulk write
+
+        Returns:
+            list: Inserted id per character, None where that write failed
+        """
+        for character_data in characters:
+            character_data.pop("_id", None)
+            character_data.pop("id", None)
+        if not characters:
+            return []
+
+        try:
+            result = await self.characters.insert_many(characters, ordered=False)
+            return [str(inserted_id) for inserted_id in result.inserted_ids]
+        except BulkWriteError as e:
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            print(f"Error creating characters: {len(failed)} of {len(characters)} writes failed")
+            return [
+                None if i in failed or "_id" not in character_data else str(character_data["_id"])
+                for i, character_data in enumerate(characters)
+            ]
+        except Exception as e:
+            print(f"Error creating characters: {str(e)}")
+            return [None] * len(characters)
+
     async def update_character(self, character_id: str, character_data: Dict) -> bool:
         """Update a character"""
         try:
@@ -85,15 +120,35 @@ class MongoDBManager:
                 {"_id": ObjectId(character_id)},
                 {"$set": character_data}
             )
+            # Cached prompt prefixes were built from the old profile
+            prompt_cache.invalidate(character_id)
             return result.modified_count > 0
         except Exception as e:
             print(f"Error updating character: {str(e)}")
             return False
 
+    async def add_replied_tweet(self, character_id: str, tweet_id: str) -> bool:
+        """Record an answered mention without rewriting the whole character"""
+        try:
+            result = await self.characters.update_one(
+                {"_id": ObjectId(character_id)},
+                {"$addToSet": {"twitter_behavior.reply_settings.replied_tweets": tweet_id}}
+            )
+            return result.modified_count > 0
+        except Exception as e:
+            await self.log_error("add_replied_tweet", str(e), {"character_id": character_id})
+            return False
+
     async def delete_character(self, character_id: str) -> bool:
         """Delete a character"""
         try:
             result = await self.characters.delete_one({"_id": ObjectId(character_id)})
+            prompt_cache.invalidate(character_id)
+            await self.tweet_buffer.delete_many({"character_id": character_id})
+            await self.tweet_signatures.delete_many({"character_id": character_id})
+            await self.llm_usage.delete_many({"character_id": character_id})
+            await self.llm_budgets.delete_one({"_id": character_id})
+            await self.mention_state.delete_one({"_id": character_id})
             return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting character: {str(e)}")
@@ -173,6 +228,110 @@ class MongoDBManager:
             await self.log_error("log_activity", str(e), 
                                {"character_id": character_id, "activity": activity_type})
 
+    async def get_cached_response(self, key: str) -> Optional[Any]:
+        """Get an unexpired cached LLM response"""
+        try:
+            doc = await self.llm_cache.find_one({
+                "_id": key,
+                "expires_at": {"$gt": datetime.utcnow()}
+            })
+            return doc["value"] if doc else None
+        except Exception as e:
+            await self.log_error("get_cached_response", str(e), {"key": key})
+            return None
+
+    async def set_cached_response(self, key: str, value: Any, ttl_seconds: float):
+        """Store an LLM response with an expiry"""
+        try:
+            await self.llm_cache.update_one(
+                {"_id": key},
+                {"$set": {
+                    "value": value,
+                    "expires_at": datetime.utcnow() + timedelta(seconds=ttl_seconds)
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            await self.log_error("set_cached_response", str(e), {"key": key})
+
+    async def push_buffered_tweets(self,
+                                   character_id: str,
+                                   tweets: List[str],
+                                   fingerprint: str,
+                                   ttl_seconds: float):
+        """Add pre-generated tweets to a character's buffer"""
+        try:
+            now = datetime.utcnow()
+            await self.tweet_buffer.insert_many([
+                {
+                    "character_id": character_id,
+                    "text": text,
+                    "fingerprint": fingerprint,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=ttl_seconds)
+                }
+                for text in tweets
+            ])
+        except Exception as e:
+            await self.log_error("push_buffered_tweets", str(e), {"character_id": character_id})
+
+    async def pop_buffered_tweet(self, character_id: str, fingerprint: str) -> Optional[str]:
+        """Take the oldest fresh tweet built from the current profile"""
+        try:
+            doc = await self.tweet_buffer.find_one_and_delete(
+                {
+                    "character_id": character_id,
+                    "fingerprint": fingerprint,
+                    "expires_at": {"$gt": datetime.utcnow()}
+                },
+                sort=[("created_at", 1)]
+            )
+            return doc["text"] if doc else None
+        except Exception as e:
+            await self.log_error("pop_buffered_tweet", str(e), {"character_id": character_id})
+            return None
+
+    async def get_buffered_tweets(self, character_id: str, fingerprint: str) -> List[str]:
+        """List fresh buffered tweets, dropping stale ones"""
+        try:
+            # Expired entries and ones built from an older profile are never posted
+            await self.tweet_buffer.delete_many({
+                "character_id": character_id,
+                "$or": [
+                    {"fingerprint": {"$ne": fingerprint}},
+                    {"expires_at": {"$lte": datetime.utcnow()}}
+                ]
+            })
+            cursor = self.tweet_buffer.find({"character_id": character_id}).sort("created_at", 1)
+            return [doc["text"] async for doc in cursor]
+        except Exception as e:
+            await self.log_error("get_buffered_tweets", str(e), {"character_id": character_id})
+            return []
+
+    async def get_tweet_signatures(self, character_id: str) -> List[Dict[str, Any]]:
+        """Get MinHash signatures of a character's posted tweets"""
+        try:
+            cursor = self.tweet_signatures.find(
+                {"character_id": character_id},
+                {"_id": 0, "text": 1, "signature": 1}
+            )
+            return await cursor.to_list(None)
+        except Exception as e:
+            await self.log_error("get_tweet_signatures", str(e), {"character_id": character_id})
+            return []
+
+    async def add_tweet_signature(self, character_id: str, text: str, signature: List[int]):
+        """Store the MinHash signature of a posted tweet"""
+        try:
+            await self.tweet_signatures.insert_one({
+                "character_id": character_id,
+                "text": text,
+                "signature": signature,
+                "created_at": datetime.utcnow()
+            })
+        except Exception as e:
+            await self.log_error("add_tweet_signature", str(e), {"character_id": character_id})
+
     async def activate_all_characters(self) -> bool:
         """Activate all characters in the database"""
         try:
@@ -223,6 +382,97 @@ class MongoDBManager:
             print(f"Error getting active characters: {str(e)}")
             return []
 
+    async def record_llm_usage(self,
+                               character_id: str,
+                               call_type: str,
+                               model: str,
+                               prompt_tokens: int,
+                               completion_tokens: int,
+                               cost_usd: float,
+                               at: datetime = None,
+                               calls: int = 1):
+        """Add LLM calls to the character's hourly and daily usage buckets"""
+        try:
+            at = at or datetime.utcnow()
+            hour = at.replace(minute=0, second=0, microsecond=0)
+            increments = {}
+            for prefix in ("totals", f"call_types.{call_type}", f"models.{model.replace('.', '_')}"):
+                increments[f"{prefix}.calls"] = calls
+                increments[f"{prefix}.prompt_tokens"] = prompt_tokens
+                increments[f"{prefix}.completion_tokens"] = completion_tokens
+                increments[f"{prefix}.cost_usd"] = cost_usd
+
+            for period, start in (("hour", hour), ("day", hour.replace(hour=0))):
+                await self.llm_usage.update_one(
+                    {"character_id": character_id, "period": period, "bucket_start": start},
+                    {"$inc": increments, "$set": {"updated_at": at}},
+                    upsert=True
+                )
+        except Exception as e:
+            await self.log_error("record_llm_usage", str(e), {"character_id": character_id})
+
+    async def get_llm_usage(self,
+                            character_id: str,
+                            period: str = "day",
+                            since: datetime = None) -> List[Dict[str, Any]]:
+        """Get a character's hourly or daily usage buckets, oldest first"""
+        try:
+            query = {"character_id": character_id, "period": period}
+            if since:
+                query["bucket_start"] = {"$gte": since}
+            cursor = self.llm_usage.find(query, {"_id": 0}).sort("bucket_start", 1)
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            await self.log_error("get_llm_usage", str(e), {"character_id": character_id})
+            return []
+
+    async def get_mention_state(self, character_id: str) -> Optional[Dict[str, Any]]:
+        """Get the newest seen mention id and notifications cursor"""
+        try:
+            return await self.mention_state.find_one({"_id": character_id})
+        except Exception as e:
+            await self.log_error("get_mention_state", str(e), {"character_id": character_id})
+            return None
+
+    async def save_mention_state(self,
+                                 character_id: str,
+                                 since_id: Optional[str],
+                                 cursor: Optional[str],
+                                 pending: List[Dict] = None):
+        """Store where mention polling left off and the mentions not yet answered"""
+        try:
+            await self.mention_state.update_one(
+                {"_id": character_id},
+                {"$set": {
+                    "since_id": since_id,
+                    "cursor": cursor,
+                    "pending": pending or [],
+                    "updated_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            await self.log_error("save_mention_state", str(e), {"character_id": character_id})
+
+    async def get_llm_budget(self, character_id: str) -> Optional[Dict[str, Any]]:
+        """Get a character's budget override"""
+        try:
+            return await self.llm_budgets.find_one({"_id": character_id})
+        except Exception as e:
+            await self.log_error("get_llm_budget", str(e), {"character_id": character_id})
+            return None
+
+    async def save_llm_budget(self, character_id: str, hourly: Optional[float], daily: Optional[float]):
+        """Store a character's budget override"""
+        try:
+            await self.llm_budgets.update_one(
+                {"_id": character_id},
+                {"$set": {"hourly": hourly, "daily": daily, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            await self.log_error("save_llm_budget", str(e), {"character_id": character_id})
+
     async def cleanup_old_data(self, days: int = 30):
         """Clean up old metrics and logs"""
         try:
@@ -243,6 +493,22 @@ class MongoDBManager:
                 "timestamp": {"$lt": cutoff}
             })
             
+            # Clean expired LLM cache entries
+            await self.llm_cache.delete_many({
+                "expires_at": {"$lt": datetime.utcnow()}
+            })
+            
+            # Clean old hourly usage buckets, daily ones are kept
+            await self.llm_usage.delete_many({
+                "period": "hour",
+                "bucket_start": {"$lt": cutoff}
+            })
+            
+            # Clean stale pre-generated tweets
+            await self.tweet_buffer.delete_many({
+                "expires_at": {"$lt": datetime.utcnow()}
+            })
+            
         except Exception as e:
             await self.log_error("cleanup_old_data", str(e))
 
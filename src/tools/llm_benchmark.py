@@ -0,0 +1,117 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+# Offline by default: no API key or network needed
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+# Measure engine overhead, not the OpenAI tier ceilings
+os.environ.setdefault("LLM_RPM_LIMIT", "0")
+os.environ.setdefault("LLM_TPM_LIMIT", "0")
+
+from rich.console import Console
+from rich.table import Table
+
+from src.ai.chatgpt import ChatGPTClient
+from src.config.settings import settings
+
+console = Console()
+
+SAMPLE_CHARACTER = {
+    "id": "benchmark",
+    "name": "Benchmark Bot",
+    "personality": {
+        "base_personality": {
+            "core_description": "A curious tech enthusiast",
+            "key_traits": ["curious", "witty"],
+            "background_story": "Grew up taking radios apart"
+        },
+        "psychological_profile": {
+            "personality_type": "ENTP",
+            "cognitive_patterns": ["analytical"],
+            "defense_mechanisms": ["humor"],
+            "adaptation_rate": 0.7
+        },
+        "speech_patterns": {
+            "style": "casual",
+            "tone": "playful",
+            "formality_level": 0.3,
+            "common_phrases": ["hear me out"]
+        },
+        "emotional_intelligence": {
+            "empathy_level": 0.7,
+            "emotional_awareness": 0.7,
+            "social_perception": 0.6
+        },
+        "cultural_awareness": {
+            "known_cultures": ["Internet culture"],
+            "cultural_sensitivity": 0.8,
+            "taboo_topics": []
+        },
+        "ethical_framework": {
+            "moral_values": {"honesty": 0.9},
+            "ethical_boundaries": ["no harassment"],
+            "content_restrictions": []
+        },
+        "behavioral_patterns": {
+            "interaction_style": "friendly",
+            "response_patterns": {"default": "curious"}
+        },
+        "knowledge_base": ["open source", "robotics"],
+        "core_values": ["curiosity"]
+    },
+    "twitter_behavior": {
+        "reply_settings": {"enabled": True, "reply_to_mentions": True},
+        "content_focus": ["technology"]
+    }
+}
+
+
+async def run_benchmark(calls: int, concurrency: int):
+    """Run tweet, reply and ethics generation against the configured provider"""
+    client = ChatGPTClient(settings.OPENAI_API_KEY, settings.OPENAI_MODEL)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            kind = i % 3
+            if kind == 0:
+                await client.generate_tweet(dict(SAMPLE_CHARACTER), context={"n": i})
+            elif kind == 1:
+                await client.generate_reply(SAMPLE_CHARACTER, f"What do you think about robots #{i}?", "someone")
+            else:
+                await client.evaluate_ethical_implications(
+                    SAMPLE_CHARACTER,
+                    {"type": "retweet", "content": f"Robots are great #{i}"}
+                )
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[one(i) for i in range(calls)], return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    failures = sum(1 for r in results if isinstance(r, Exception))
+    stats = client.engine.get_stats()
+
+    table = Table(title=f"LLM benchmark ({stats['provider']} provider)")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Calls", str(calls))
+    table.add_row("Failures", str(failures))
+    table.add_row("Elapsed", f"{elapsed:.2f}s")
+    table.add_row("Throughput", f"{calls / elapsed:.0f} calls/s")
+    table.add_row("Upstream requests", str(stats["requests"]))
+    table.add_row("Average latency", f"{stats['average_latency_ms']:.1f}ms")
+    console.print(table)
+
+    await client.cost_meter.flush()
+    await client.engine.close()
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(run_benchmark(calls, concurrency))
@@ -155,29 +155,22 @@ class ResponseTester:
                 }
             )
             
-            # Handle both string and dict responses
-            if isinstance(evaluation, str):
-                console.print(Panel(
-                    evaluation,
-                    title="Raw Ethical Evaluation",
-                    border_style="yellow"
-                ))
-            else:
-                console.print(Panel(f"""
-[cyan]Alignment Score:[/cyan] {evaluation.get('alignment_score', 0)}
+            console.print(Panel(f"""
+[cyan]Alignment Score:[/cyan] {evaluation.alignment_score}
+[cyan]Approved:[/cyan] {evaluation.approved}
 [cyan]Ethical Concerns:[/cyan]
-{chr(10).join(f"• {concern}" for concern in evaluation.get('ethical_concerns', []))}
+{chr(10).join(f"• {concern}" for concern in evaluation.ethical_concerns)}
 
 [cyan]Recommendation:[/cyan] 
-{evaluation.get('recommendation', 'No recommendation provided')}
+{evaluation.recommendation or 'No recommendation provided'}
 
 [cyan]Reasoning:[/cyan]
-{evaluation.get('reasoning', 'No reasoning provided')}
-                """,
-                title="Ethical Evaluation Results",
-                border_style="green",
-                padding=(1, 2)
-                ))
+{evaluation.reasoning or 'No reasoning provided'}
+            """,
+            title="Ethical Evaluation Results",
+            border_style="green",
+            padding=(1, 2)
+            ))
                 
         except Exception as e:
             console.print(f"[red]Error during ethical evaluation:[/red] {str(e)}")
@@ -195,10 +188,10 @@ class ResponseTester:
         )
         
         console.print(Panel(f"""
-[cyan]Relevance Score:[/cyan] {analysis.get('relevance_score', 0)}
-[cyan]Recommended Action:[/cyan] {analysis.get('recommended_action', 'N/A')}
-[cyan]Engagement Type:[/cyan] {analysis.get('engagement_type', 'N/A')}
-[cyan]Reasoning:[/cyan] {analysis.get('reasoning', 'N/A')}
+[cyan]Relevance Score:[/cyan] {analysis.relevance_score}
+[cyan]Recommended Action:[/cyan] {analysis.recommended_action}
+[cyan]Engagement Type:[/cyan] {analysis.engagement_type or 'N/A'}
+[cyan]Reasoning:[/cyan] {analysis.reasoning or 'N/A'}
         """))
         
     async def _test_custom_prompt(self, character: AICharacter):
@@ -248,6 +241,7 @@ async def main():
             return
             
         await tester.test_character_responses(character)
+        await tester.ai_client.cost_meter.flush()
         
     except Exception as e:
         console.print(f"[red]Error:[/red] {str(e)}")
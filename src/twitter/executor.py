@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Optional
+
+from ..config.settings import settings
+
+
+def _percentile(samples: Deque[float], percentile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+
+class BoundedExecutor:
+    """Fixed-size thread pool for blocking twitter-api-client calls.
+
+    Tracks how many calls are queued behind busy workers and how long they
+    waited, so a saturated pool shows up in metrics instead of as vague
+    slowness elsewhere.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"twitter-{name}")
+        self._lock = threading.Lock()
+
+        self.queued = 0
+        self.running = 0
+        self.wait_ms: Deque[float] = deque(maxlen=500)
+        self.run_ms: Deque[float] = deque(maxlen=500)
+        self.stats = {"submitted": 0, "completed": 0, "errors": 0, "max_queue_depth": 0, "max_wait_ms": 0.0}
+
+    def _call(self, func: Callable[[], Any], submitted: float) -> Any:
+        started = time.perf_counter()
+        wait_ms = (started - submitted) * 1000
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_ms.append(wait_ms)
+            self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], wait_ms)
+        try:
+            return func()
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.stats["completed"] += 1
+                self.run_ms.append((time.perf_counter() - started) * 1000)
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call on this pool and await its result"""
+        if args or kwargs:
+            func = partial(func, *args, **kwargs)
+        with self._lock:
+            self.queued += 1
+            self.stats["submitted"] += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queued)
+        submitted = time.perf_counter()
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._call, func, submitted)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, wait time and run time counters"""
+        with self._lock:
+            return {
+                **self.stats,
+                "max_workers": self.max_workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "wait_ms_p50": _percentile(self.wait_ms, 50),
+                "wait_ms_p95": _percentile(self.wait_ms, 95),
+                "run_ms_p50": _percentile(self.run_ms, 50),
+                "run_ms_p95": _percentile(self.run_ms, 95)
+            }
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class TwitterExecutors:
+    """Separate pools so slow reads (search, scrape, notifications) cannot
+    starve writes (tweet, reply, like, retweet, follow)"""
+
+    def __init__(self, read_workers: int, write_workers: int):
+        self.read = BoundedExecutor("read", read_workers)
+        self.write = BoundedExecutor("write", write_workers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"read": self.read.get_stats(), "write": self.write.get_stats()}
+
+    def shutdown(self) -> None:
+        self.read.shutdown()
+        self.write.shutdown()
+
+
+_executors: Optional[TwitterExecutors] = None
+
+
+def get_twitter_executors() -> TwitterExecutors:
+    """Get the process-wide Twitter executor pools"""
+    global _executors
+    if _executors is None:
+        _executors = TwitterExecutors(
+            read_workers=settings.TWITTER_READ_POOL_SIZE,
+            write_workers=settings.TWITTER_WRITE_POOL_SIZE
+        )
+    return _executors
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+def _tweet_id(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def top_cursor(payload: Dict) -> Optional[str]:
+    """Cursor that asks the notifications timeline for newer entries only"""
+    instructions = payload.get("timeline", {}).get("instructions", [])
+    for instruction in instructions:
+        entries = instruction.get("addEntries", {}).get("entries", [])
+        for entry in entries:
+            cursor = entry.get("content", {}).get("operation", {}).get("cursor", {})
+            if cursor.get("cursorType") == "Top":
+                return cursor.get("value")
+    return None
+
+
+def parse_mentions(payload: Dict, since_id: Optional[str] = None) -> List[Dict]:
+    """
+    Extract mentions newer than since_id from a notifications payload
+
+    Tweets at or below since_id are skipped on their id alone, before any
+    of their fields are read.
+
+    Returns:
+        List[Dict]: Mentions, oldest first
+    """
+    tweets = payload.get("globalObjects", {}).get("tweets", {})
+    users = payload.get("globalObjects", {}).get("users", {})
+    newest_seen = _tweet_id(since_id)
+
+    mentions = []
+    for tweet_id, tweet in tweets.items():
+        if _tweet_id(tweet_id) <= newest_seen:
+            continue
+        if not tweet.get("entities", {}).get("user_mentions"):
+            continue
+        user = users.get(tweet.get("user_id_str"), {})
+        mentions.append({
+            "tweet_id": tweet.get("id_str", tweet_id),
+            "text": tweet.get("full_text", ""),
+            "user": {
+                "id": tweet.get("user_id_str", ""),
+                "screen_name": user.get("screen_name", ""),
+                "name": user.get("name", "")
+            },
+            "created_at": tweet.get("created_at", ""),
+            "in_reply_to_status_id": tweet.get("in_reply_to_status_id_str")
+        })
+    mentions.sort(key=lambda mention: _tweet_id(mention["tweet_id"]))
+    return mentions
+
+
+class MentionPoller:
+    """Incremental mention polling for one account.
+
+    Keeps the newest seen mention id and the notifications timeline's top
+    cursor, persisted through the store (any object with async
+    get_mention_state and save_mention_state, normally MongoDBManager).
+    Each poll asks Twitter only for entries above the cursor and parses only
+    tweets newer than the newest seen id, so its cost depends on how many
+    mentions arrived since the last poll, not on the account's history.
+
+    Because the cursor moves past a mention as soon as it is polled, polled
+    mentions are saved with the state until mark_answered is called for
+    them; after a restart the first poll returns them again.
+    """
+
+    MAX_PENDING = 1000  # Oldest unanswered mentions are dropped beyond this
+
+    def __init__(self, twitter_client: Any, account_id: str, store: Any = None):
+        """
+        Args:
+            twitter_client: TwitterClient of the account
+            account_id: Key of the persisted state (the character id)
+            store: Persistent state store
+        """
+        self.twitter_client = twitter_client
+        self.account_id = account_id
+        self.store = store
+        self.logger = logging.getLogger(__name__)
+
+        self.since_id: Optional[str] = None
+        self.cursor: Optional[str] = None
+        self.pending: Dict[str, Dict] = {}  # tweet_id -> polled but unanswered mention
+        self._restored: List[Dict] = []
+        self._loaded = False
+        self.stats = {"polls": 0, "mentions": 0, "errors": 0}
+
+    async def load(self) -> None:
+        """Restore since_id and cursor from the store once"""
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.store is None:
+            return
+        state = await self.store.get_mention_state(self.account_id)
+        if state:
+            self.since_id = state.get("since_id")
+            self.cursor = state.get("cursor")
+            self._restored = state.get("pending") or []
+            self.pending = {mention["tweet_id"]: mention for mention in self._restored}
+
+    async def _save(self) -> None:
+        if self.store is not None:
+            await self.store.save_mention_state(
+                self.account_id, self.since_id, self.cursor, list(self.pending.values())
+            )
+
+    async def poll(self) -> List[Dict]:
+        """
+        Fetch mentions that arrived since the previous poll
+
+        The first poll after a restart also returns the mentions that were
+        still unanswered when the process stopped.
+
+        Returns:
+            List[Dict]: New mentions, oldest first
+        """
+        await self.load()
+        self.stats["polls"] += 1
+        try:
+            payload = await self.twitter_client.fetch_notifications(cursor=self.cursor)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+        mentions = parse_mentions(payload, self.since_id)
+        cursor = top_cursor(payload) or self.cursor
+        since_id = mentions[-1]["tweet_id"] if mentions else self.since_id
+
+        if mentions or (cursor, since_id) != (self.cursor, self.since_id):
+            self.cursor, self.since_id = cursor, since_id
+            for mention in mentions:
+                self.pending[mention["tweet_id"]] = mention
+            while len(self.pending) > self.MAX_PENDING:
+                self.pending.pop(next(iter(self.pending)))
+            # Saved before returning: the cursor has moved past these mentions
+            await self._save()
+
+        self.stats["mentions"] += len(mentions)
+        restored, self._restored = self._restored, []
+        return restored + mentions
+
+    async def mark_answered(self, *tweet_ids: str) -> None:
+        """Stop carrying answered mentions in the saved state"""
+        removed = [self.pending.pop(tweet_id, None) for tweet_id in tweet_ids]
+        if any(removed):
+            await self._save()
+
+    async def stream(self, scheduler: Any) -> AsyncIterator[Dict]:
+        """
+        Yield new mentions as they arrive
+
+        Args:
+            scheduler: AdaptivePollScheduler deciding when to poll
+        """
+        while True:
+            await asyncio.sleep(scheduler.seconds_until_due())
+            try:
+                mentions = await self.poll()
+            except Exception as e:
+                self.logger.error(f"Error polling mentions for {self.account_id}: {str(e)}")
+                scheduler.record_poll(0)
+                continue
+            scheduler.record_poll(len(mentions))
+            for mention in mentions:
+                yield mention
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "since_id": self.since_id, "unanswered": len(self.pending)}
@@ -0,0 +1,134 @@
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional
+
+from .executor import _percentile
+
+TWITTER_TIME_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+
+def mention_time(mention: Dict) -> Optional[float]:
+    """Unix time a mention was tweeted, from its created_at"""
+    created_at = mention.get("created_at")
+    if not created_at:
+        return None
+    try:
+        return datetime.strptime(created_at, TWITTER_TIME_FORMAT).timestamp()
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(created_at)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class AdaptivePollScheduler:
+    """Mention poll cadence for one account.
+
+    Keeps an exponentially weighted estimate of the mention rate. While
+    mentions arrive, the interval is set so that about target_per_poll
+    mentions land between polls; after a poll with none, it grows by
+    backoff_factor up to max_interval. The interval never drops below what
+    the account's notifications read limit allows (window / limit), and a
+    sliding window of recent polls holds the limit even if the estimate is
+    off.
+    """
+
+    def __init__(self,
+                 min_interval: float = 15.0,
+                 max_interval: float = 900.0,
+                 backoff_factor: float = 2.0,
+                 target_per_poll: float = 1.0,
+                 read_limit: int = 180,
+                 read_window: float = 900.0,
+                 smoothing: float = 0.3):
+        """
+        Args:
+            min_interval: Shortest interval between polls in seconds
+            max_interval: Longest interval for an idle account
+            backoff_factor: Interval growth after a poll without mentions
+            target_per_poll: Mentions expected per poll on a busy account
+            read_limit: Notification reads allowed per read_window
+            read_window: Rate limit window in seconds
+            smoothing: Weight of the newest rate sample in the estimate
+        """
+        self.floor = max(min_interval, read_window / read_limit if read_limit > 0 else 0.0)
+        self.max_interval = max(max_interval, self.floor)
+        self.backoff_factor = backoff_factor
+        self.target_per_poll = target_per_poll
+        self.read_limit = read_limit
+        self.read_window = read_window
+        self.smoothing = smoothing
+
+        self.interval = self.floor
+        self.rate = 0.0  # Mentions per second
+        self.last_poll: Optional[float] = None
+        self.next_poll_at = 0.0  # Poll immediately
+        self.polls: Deque[float] = deque()
+        self.latencies: Deque[float] = deque(maxlen=500)
+        self.stats = {"polls": 0, "empty_polls": 0, "mentions": 0, "replies": 0}
+
+    def _window_wait(self, now: float) -> float:
+        """Seconds until another poll fits inside the read limit"""
+        while self.polls and now - self.polls[0] >= self.read_window:
+            self.polls.popleft()
+        if self.read_limit <= 0 or len(self.polls) < self.read_limit:
+            return 0.0
+        return self.read_window - (now - self.polls[0])
+
+    def seconds_until_due(self) -> float:
+        now = time.monotonic()
+        return max(self.next_poll_at - now, self._window_wait(now), 0.0)
+
+    def due(self) -> bool:
+        return self.seconds_until_due() <= 0
+
+    def record_poll(self, mention_count: int) -> float:
+        """
+        Update the rate estimate after a poll and schedule the next one
+
+        Returns:
+            float: Seconds until the next poll
+        """
+        now = time.monotonic()
+        self.polls.append(now)
+        self.stats["polls"] += 1
+        self.stats["mentions"] += mention_count
+
+        if self.last_poll is not None:
+            sample = mention_count / max(now - self.last_poll, 1e-3)
+            self.rate = self.smoothing * sample + (1 - self.smoothing) * self.rate
+        self.last_poll = now
+
+        if mention_count:
+            interval = self.target_per_poll / self.rate if self.rate > 0 else self.floor
+        else:
+            self.stats["empty_polls"] += 1
+            interval = self.interval * self.backoff_factor
+        self.interval = min(max(interval, self.floor), self.max_interval)
+        self.next_poll_at = now + self.interval
+        return self.interval
+
+    def record_reply(self, mention: Dict) -> None:
+        """Note the mention-to-reply latency of an answered mention"""
+        tweeted_at = mention_time(mention)
+        if tweeted_at is None:
+            return
+        self.stats["replies"] += 1
+        self.latencies.append(max(0.0, time.time() - tweeted_at))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current interval, rate estimate and reply latency percentiles"""
+        return {
+            **self.stats,
+            "interval": round(self.interval, 1),
+            "next_poll_in": round(self.seconds_until_due(), 1),
+            "mentions_per_hour": round(self.rate * 3600, 2),
+            "reply_latency_p50": _percentile(self.latencies, 50),
+            "reply_latency_p95": _percentile(self.latencies, 95),
+            "reply_latency_p99": _percentile(self.latencies, 99)
+        }
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from ..config.settings import settings
+from .twitter_client import TwitterClient
+
+
+class TwitterClientRegistry:
+    """Process-wide TwitterClient per account.
+
+    The server and every behavior controller ask the registry for a
+    character's client instead of constructing their own, so one account
+    has one set of Account/Scraper/Search objects and HTTP sessions. Those
+    are created lazily by TwitterClient on first use; a background reaper
+    closes the sessions of clients that have been idle for idle_timeout
+    seconds with no calls in flight, and the next call reopens them.
+    """
+
+    def __init__(self, idle_timeout: float = 900.0, reap_interval: float = 60.0):
+        """
+        Args:
+            idle_timeout: Seconds without calls before sessions are closed (0 = never)
+            reap_interval: Seconds between idle checks
+        """
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.logger = logging.getLogger(__name__)
+
+        self.clients: Dict[str, TwitterClient] = {}  # auth_token -> client
+        self._lock = threading.Lock()
+        self._reaper: Optional[asyncio.Task] = None
+        self.stats = {"created": 0, "reused": 0, "replaced": 0, "closed_idle": 0}
+
+    def get(self, ct0: str, auth_token: str, twid: str = None) -> TwitterClient:
+        """Get the shared client for an account, creating it if needed"""
+        self._ensure_reaper()
+        with self._lock:
+            client = self.clients.get(auth_token)
+            if client is not None and client.cookies["ct0"] == ct0 and client.cookies["twid"] == (twid or "u=0"):
+                self.stats["reused"] += 1
+                return client
+
+            if client is not None:
+                # Refreshed credentials: the old sessions are released by the reaper
+                self.stats["replaced"] += 1
+                self._schedule_close(client)
+            else:
+                self.stats["created"] += 1
+
+            client = TwitterClient(ct0=ct0, auth_token=auth_token, twid=twid)
+            self.clients[auth_token] = client
+            return client
+
+    def get_for(self, credentials: Any) -> TwitterClient:
+        """Get the shared client for a character's TwitterCredentials"""
+        return self.get(
+            ct0=credentials.ct0,
+            auth_token=credentials.auth_token,
+            twid=credentials.twid
+        )
+
+    async def remove(self, auth_token: str) -> None:
+        """Drop an account's client and close its sessions"""
+        with self._lock:
+            client = self.clients.pop(auth_token, None)
+        if client is not None:
+            await client.close()
+
+    def _schedule_close(self, client: TwitterClient) -> None:
+        try:
+            asyncio.get_running_loop().create_task(self._close_when_idle(client))
+        except RuntimeError:
+            pass
+
+    async def _close_when_idle(self, client: TwitterClient) -> None:
+        while client.in_flight:
+            await asyncio.sleep(1)
+        await client.close()
+
+    def _ensure_reaper(self) -> None:
+        """Start the idle reaper on the running loop, once"""
+        if self.idle_timeout <= 0 or (self._reaper is not None and not self._reaper.done()):
+            return
+        try:
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_idle())
+        except RuntimeError:
+            # No loop yet; the first get() made from async code starts it
+            pass
+
+    async def _reap_idle(self) -> None:
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self.close_idle()
+            except Exception as e:
+                self.logger.error(f"Error closing idle Twitter clients: {str(e)}")
+
+    async def close_idle(self) -> int:
+        """Close the sessions of clients idle longer than idle_timeout"""
+        with self._lock:
+            idle = [
+                client for client in self.clients.values()
+                if client.is_open and not client.in_flight and client.idle_seconds() >= self.idle_timeout
+            ]
+        for client in idle:
+            await client.close()
+        self.stats["closed_idle"] += len(idle)
+        return len(idle)
+
+    async def close_all(self) -> None:
+        """Stop the reaper and close every client"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        with self._lock:
+            clients = list(self.clients.values())
+        for client in clients:
+            await client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Client counts and lifecycle counters"""
+        with self._lock:
+            clients = list(self.clients.values())
+        return {
+            **self.stats,
+            "clients": len(clients),
+            "open": sum(1 for client in clients if client.is_open),
+            "in_flight": sum(client.in_flight for client in clients)
+        }
+
+
+_registry: Optional[TwitterClientRegistry] = None
+
+
+def get_twitter_registry() -> TwitterClientRegistry:
+    """Get the process-wide Twitter client registry"""
+    global _registry
+    if _registry is None:
+        _registry = TwitterClientRegistry(
+            idle_timeout=settings.TWITTER_CLIENT_IDLE_TIMEOUT,
+            reap_interval=settings.TWITTER_CLIENT_REAP_INTERVAL
+        )
+    return _registry
@@ -1,48 +1,107 @@
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import asyncio
+import threading
+import time
 from functools import partial
 from rich.console import Console
 from twitter.account import Account
 from twitter.scraper import Scraper
 from twitter.search import Search
+from twitter.constants import live_notification_params
 import logging
 
+from .executor import get_twitter_executors
+from .mention_poller import parse_mentions
+
 console = Console()
 
 class TwitterClient:
     """Twitter API client using twitter-api-client"""
     
     def __init__(self, ct0: str, auth_token: str, twid: str = None) -> None:
-        """Initialize Twitter client with auth tokens"""
+        """Initialize Twitter client with auth tokens
+
+        Account, Scraper and Search (each with its own HTTP session) are
+        only created on first use, and close() releases them until the
+        next call recreates them.
+        """
+        self.cookies = {
+            "ct0": ct0,
+            "auth_token": auth_token,
+            "twid": twid or "u=0"  # Default twid if not provided
+        }
+        
+        # Initialize logger
+        self.logger = logging.getLogger(__name__)
+        
+        # Blocking calls run on the shared bounded read/write pools
+        self.executors = get_twitter_executors()
+        
+        self._components: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+    def _component(self, name: str, factory) -> Any:
+        """Create a twitter-api-client object on first use"""
+        self.last_used = time.monotonic()
+        component = self._components.get(name)
+        if component is None:
+            with self._lock:
+                component = self._components.get(name)
+                if component is None:
+                    try:
+                        component = factory(cookies=self.cookies)
+                    except Exception as e:
+                        self.logger.error(f"Error initializing Twitter {name}: {str(e)}")
+                        console.print(f"[red]Error initializing Twitter client:[/red] {str(e)}")
+                        raise
+                    self._components[name] = component
+                    self.logger.info(f"Twitter {name} initialized")
+        return component
+
+    @property
+    def account(self) -> Account:
+        return self._component("account", Account)
+
+    @property
+    def scraper(self) -> Scraper:
+        return self._component("scraper", Scraper)
+
+    @property
+    def search(self) -> Search:
+        return self._component("search", Search)
+
+    @property
+    def user_id(self) -> Optional[str]:
+        """Account's own user id, from the twid cookie ("u=<id>")"""
+        twid = self.cookies.get("twid", "").replace("%3D", "=")
+        user_id = twid.split("=", 1)[-1]
+        return user_id if user_id.isdigit() and user_id != "0" else None
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self._components)
+
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_used
+
+    async def _run(self, executor, func) -> Any:
+        """Run a blocking call, keeping the client marked busy meanwhile"""
+        self.in_flight += 1
+        self.last_used = time.monotonic()
         try:
-            self.cookies = {
-                "ct0": ct0,
-                "auth_token": auth_token,
-                "twid": twid or "u=0"  # Default twid if not provided
-            }
-            
-            # Initialize logger
-            self.logger = logging.getLogger(__name__)
-            
-            # Initialize components with cookies
-            self.account = Account(cookies=self.cookies)
-            self.scraper = Scraper(cookies=self.cookies)
-            self.search = Search(cookies=self.cookies)
-            
-            self.logger.info("Twitter client initialized successfully")
-            console.print("[green]Twitter client initialized successfully[/green]")
-            
-        except Exception as e:
-            self.logger.error(f"Error initializing Twitter client: {str(e)}")
-            console.print(f"[red]Error initializing Twitter client:[/red] {str(e)}")
-            raise
+            return await executor.run(func)
+        finally:
+            self.in_flight -= 1
+            self.last_used = time.monotonic()
 
     async def post_tweet(self, text: str, media: List[Dict] = None) -> Dict:
         """Post a tweet"""
         try:
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, 
+            result = await self._run(
+                self.executors.write,
                 partial(self.account.tweet, text=text, media=media)
             )
             print(result)
@@ -58,8 +117,8 @@ class TwitterClient:
     async def post_reply(self, text: str, tweet_id: str, media: List[Dict] = None) -> Dict:
         """Reply to a tweet"""
         try:
-            result = await asyncio.get_event_loop().run_in_executor(
-                None,
+            result = await self._run(
+                self.executors.write,
                 partial(self.account.reply, text=text, tweet_id=tweet_id, media=media)
             )
             return {
@@ -75,8 +134,8 @@ class TwitterClient:
     async def retweet(self, tweet_id: str):
         """Retweet a tweet"""
         try:
-            await asyncio.get_event_loop().run_in_executor(
-                None,
+            await self._run(
+                self.executors.write,
                 partial(self.account.retweet, tweet_id=tweet_id)
             )
         except Exception as e:
@@ -86,8 +145,8 @@ class TwitterClient:
     async def like_tweet(self, tweet_id: str):
         """Like a tweet"""
         try:
-            await asyncio.get_event_loop().run_in_executor(
-                None,
+            await self._run(
+                self.executors.write,
                 partial(self.account.like, tweet_id=tweet_id)
             )
         except Exception as e:
@@ -103,8 +162,8 @@ class TwitterClient:
                 query += " " + " OR ".join(hashtags)
 
             # Run search
-            results = await asyncio.get_event_loop().run_in_executor(
-                None,
+            results = await self._run(
+                self.executors.read,
                 partial(
                     self.search.run,
                     queries=[{"category": "Top", "query": query}],
@@ -137,8 +196,8 @@ class TwitterClient:
     async def get_user_timeline(self, user_id: str, limit: int = 20) -> List[Dict]:
         """Get user's timeline"""
         try:
-            tweets = await asyncio.get_event_loop().run_in_executor(
-                None,
+            tweets = await self._run(
+                self.executors.read,
                 partial(self.scraper.tweets, user_ids=[user_id], limit=limit)
             )
             
@@ -158,8 +217,8 @@ class TwitterClient:
     async def follow_user(self, user_id: str):
         """Follow a user"""
         try:
-            await asyncio.get_event_loop().run_in_executor(
-                None,
+            await self._run(
+                self.executors.write,
                 partial(self.account.follow, user_id=user_id)
             )
         except Exception as e:
@@ -169,8 +228,8 @@ class TwitterClient:
     async def unfollow_user(self, user_id: str):
         """Unfollow a user"""
         try:
-            await asyncio.get_event_loop().run_in_executor(
-                None,
+            await self._run(
+                self.executors.write,
                 partial(self.account.unfollow, user_id=user_id)
             )
         except Exception as e:
@@ -178,38 +237,34 @@ class TwitterClient:
             raise
 
     async def close(self):
-        """Close connections"""
-        # Cleanup if needed
-        pass
+        """Close the HTTP sessions of the created components"""
+        with self._lock:
+            components, self._components = self._components, {}
+        for component in components.values():
+            session = getattr(component, "session", None)
+            if session is not None and hasattr(session, "close"):
+                try:
+                    session.close()
+                except Exception as e:
+                    self.logger.warning(f"Error closing Twitter session: {str(e)}")
+
+    async def fetch_notifications(self, cursor: Optional[str] = None) -> Dict:
+        """Get the raw notifications payload, only entries above cursor if given"""
+        params = None
+        if cursor:
+            params = {**live_notification_params, "cursor": cursor}
+        return await self._run(
+            self.executors.read,
+            partial(self.account.notifications, params=params)
+        )
 
     async def get_notifications(self) -> Dict:
         """Get account notifications"""
         try:
             self.logger.info("Getting notifications")
-            notifications = await asyncio.get_event_loop().run_in_executor(
-                None,
-                self.account.notifications
-            )
-            print(notifications)
+            notifications = await self.fetch_notifications()
             # Extract mentions from notifications
-            mentions = []
-            if "globalObjects" in notifications:
-                tweets = notifications["globalObjects"].get("tweets", {})
-                users = notifications["globalObjects"].get("users", {})
-                
-                for tweet_id, tweet in tweets.items():
-                    # Check if tweet is a mention
-                    if tweet.get("entities", {}).get("user_mentions"):
-                        mentions.append({
-                            "tweet_id": tweet.get("id_str", ""),
-                            "text": tweet.get("full_text", ""),
-                            "user": {
-                                "id": tweet.get("user_id_str", ""),
-                                "screen_name": users[tweet["user_id_str"]]["screen_name"],
-                                "name": users[tweet["user_id_str"]]["name"]
-                            },
-                            "created_at": tweet.get("created_at", "")
-                        })
+            mentions = parse_mentions(notifications)
             
             self.logger.info(f"Found {len(mentions)} mentions")
             return mentions
@@ -222,8 +277,8 @@ class TwitterClient:
         """Reply to a tweet"""
         try:
             self.logger.info(f"Replying to tweet {tweet_id}")
-            result = await asyncio.get_event_loop().run_in_executor(
-                None,
+            result = await self._run(
+                self.executors.write,
                 partial(self.account.reply, text=text, tweet_id=tweet_id)
             )
             self.logger.info(f"Posted reply to tweet {tweet_id}: {text}")
@@ -1,14 +1,14 @@
 import json
 import asyncio
 import logging
-from typing import Dict, Set, Optional, Any
+import uuid
+from typing import AsyncIterator, Dict, Set, Optional, Any
 import websockets
 from websockets.server import WebSocketServerProtocol
 from datetime import datetime, timedelta
 import traceback
 
 from twitter.account import Account
-from twitter.scraper import Scraper
 from twitter.search import Search
 from ..ai.chatgpt import ChatGPTClient
 from ..character.models import AICharacter
@@ -20,6 +20,14 @@ from ..security.rate_limiter import RateLimiter
 from ..security.content_filter import ContentFilter
 from ..monitoring.system_monitor import SystemMonitor
 from ..twitter.twitter_client import TwitterClient
+from ..twitter.executor import get_twitter_executors
+from ..twitter.registry import get_twitter_registry
+from ..config.settings import settings
+
+
+class GenerationAborted(Exception):
+    """A streamed generation was aborted by an operator"""
+
 
 class WebSocketServer:
     """WebSocket Communication Layer"""
@@ -34,7 +42,11 @@ class WebSocketServer:
         
         self.ai_client = ai_client
         self.db = db_manager
+        
         self.clients: Set[WebSocketServerProtocol] = set()
+        # Client -> subscribed character ids (None = all characters)
+        self.generation_subscribers: Dict[WebSocketServerProtocol, Optional[Set[str]]] = {}
+        self.active_generations: Dict[str, Dict[str, Any]] = {}
         self.behavior_controllers: Dict[str, BehaviorController] = {}
         self.twitter_clients: Dict[str, TwitterClient] = {}
         self.running = True
@@ -78,9 +90,16 @@ class WebSocketServer:
             "tweet_generated": self._handle_tweet_generated,
             "tweet_posted": self._handle_tweet_posted,
             "tweet_error": self._handle_tweet_error,
+            "abort_generation": self._handle_abort_generation,
             # ... other handlers ...
         }
         
+        # Handlers that need the sending client
+        self.client_message_handlers = {
+            "subscribe_generation": self._handle_subscribe_generation,
+            "unsubscribe_generation": self._handle_unsubscribe_generation,
+        }
+        
     async def start(self):
         """Start WebSocket server"""
         try:
@@ -104,6 +123,8 @@ class WebSocketServer:
         if hasattr(self, 'server'):
             self.server.close()
             await self.server.wait_closed()
+            await get_twitter_registry().close_all()
+            await self.ai_client.cost_meter.flush()
             self.logger.info("WebSocket server stopped")
 
     async def process_message(self, websocket: WebSocketServerProtocol, message: str):
@@ -118,7 +139,10 @@ class WebSocketServer:
             self.logger.debug(f"Message data: {message_data}")
 
             # Handle the message based on type
-            if message_type in self.message_handlers:
+            if message_type in self.client_message_handlers:
+                response = await self.client_message_handlers[message_type](websocket, message_data)
+                await websocket.send(json.dumps(response))
+            elif message_type in self.message_handlers:
                 response = await self.message_handlers[message_type](message_data)
                 await websocket.send(json.dumps(response))
             else:
@@ -168,6 +192,114 @@ class WebSocketServer:
             self.logger.error(f"Error handling tweet error: {str(e)}")
             return {"status": "error", "message": str(e)}
 
+    async def _handle_subscribe_generation(self, websocket: WebSocketServerProtocol, data: dict) -> dict:
+        """Subscribe a client to streamed generation deltas"""
+        character_ids = data.get("character_ids")
+        if character_ids:
+            subscribed = self.generation_subscribers.get(websocket, set())
+            if subscribed is not None:
+                subscribed = subscribed | set(character_ids)
+            self.generation_subscribers[websocket] = subscribed
+        else:
+            self.generation_subscribers[websocket] = None
+        return {"status": "success", "message": "Subscribed to generation stream"}
+
+    async def _handle_unsubscribe_generation(self, websocket: WebSocketServerProtocol, data: dict) -> dict:
+        """Stop sending generation deltas to a client"""
+        self.generation_subscribers.pop(websocket, None)
+        return {"status": "success", "message": "Unsubscribed from generation stream"}
+
+    async def _handle_abort_generation(self, data: dict) -> dict:
+        """Abort a streamed generation in progress"""
+        generation = self.active_generations.get(data.get("generation_id"))
+        if not generation:
+            return {"status": "error", "message": "Generation not found or already finished"}
+        generation["aborted"] = True
+        generation["task"].cancel()
+        return {"status": "success", "message": "Generation aborted"}
+
+    def has_generation_subscribers(self, character_id: str) -> bool:
+        """Whether any client is watching this character's generations"""
+        return any(
+            subscribed is None or character_id in subscribed
+            for subscribed in self.generation_subscribers.values()
+        )
+
+    async def send_generation_event(self, character_id: str, event_type: str, data: dict) -> None:
+        """Send an event to clients subscribed to a character's generations"""
+        message_str = json.dumps({
+            "type": event_type,
+            "data": data,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        clients = [
+            client for client, subscribed in self.generation_subscribers.items()
+            if subscribed is None or character_id in subscribed
+        ]
+        results = await asyncio.gather(
+            *[client.send(message_str) for client in clients],
+            return_exceptions=True
+        )
+        for client, result in zip(clients, results):
+            if isinstance(result, Exception):
+                self.logger.debug(f"Dropping generation subscriber {id(client)}: {str(result)}")
+                self.generation_subscribers.pop(client, None)
+
+    async def stream_generation(self,
+                                character_id: str,
+                                deltas: AsyncIterator[str],
+                                kind: str = "tweet") -> str:
+        """
+        Forward a streamed completion to subscribers and return its text
+
+        Raises:
+            GenerationAborted: An operator sent abort_generation for it
+        """
+        generation_id = uuid.uuid4().hex
+        chunks = []
+
+        async def consume():
+            try:
+                async for delta in deltas:
+                    chunks.append(delta)
+                    await self.send_generation_event(character_id, "tweet_generating_delta", {
+                        "generation_id": generation_id,
+                        "character_id": character_id,
+                        "kind": kind,
+                        "delta": delta,
+                        "index": len(chunks) - 1
+                    })
+            finally:
+                # Stops the upstream completion when aborted
+                await deltas.aclose()
+
+        task = asyncio.create_task(consume())
+        generation = {"task": task, "character_id": character_id, "aborted": False}
+        self.active_generations[generation_id] = generation
+        await self.send_generation_event(character_id, "tweet_generating_started", {
+            "generation_id": generation_id,
+            "character_id": character_id,
+            "kind": kind
+        })
+
+        try:
+            await task
+        except asyncio.CancelledError:
+            if not generation["aborted"]:
+                task.cancel()
+                raise
+            await self.send_generation_event(character_id, "tweet_generation_aborted", {
+                "generation_id": generation_id,
+                "character_id": character_id,
+                "kind": kind,
+                "partial_text": "".join(chunks)
+            })
+            raise GenerationAborted(f"Generation {generation_id} aborted")
+        finally:
+            self.active_generations.pop(generation_id, None)
+
+        return "".join(chunks)
+
     async def handle_connection(self, websocket: WebSocketServerProtocol, path: str):
         """Handle new WebSocket connections"""
         try:
@@ -201,6 +333,7 @@ class WebSocketServer:
                 self.logger.info(f"Client {client_id} connection closed")
             finally:
                 self.clients.remove(websocket)
+                self.generation_subscribers.pop(websocket, None)
                 self.logger.info(f"Client {client_id} disconnected. Total clients: {len(self.clients)}")
                 
         except Exception as e:
@@ -218,11 +351,7 @@ class WebSocketServer:
                 return {"status": "error", "message": "Character not found"}
 
             # Initialize Twitter clients for this character
-            self.twitter_clients[character_id] = TwitterClient(
-                ct0=character.twitter_credentials.ct0,
-                auth_token=character.twitter_credentials.auth_token,
-                twid=character.twitter_credentials.twid
-            )
+            self.twitter_clients[character_id] = get_twitter_registry().get_for(character.twitter_credentials)
             
             # Initialize controllers
             self.behavior_controllers[character_id] = BehaviorController(
@@ -496,9 +625,7 @@ class WebSocketServer:
                                     character_id: str,
                                     parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle user management commands"""
-        clients = self.twitter_clients[character_id]
-        twitter = clients
-        scraper = Scraper(cookies=twitter.cookies)
+        scraper = self.twitter_clients[character_id].scraper
         command = parameters.get("command")
 
         if command == "get_user_by_username":
@@ -556,7 +683,7 @@ class WebSocketServer:
                 "status": "success",
                 "command": command,
                 "mentions": mentions,
-                "analysis": analysis,
+                "analysis": analysis.model_dump(),
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -575,7 +702,7 @@ class WebSocketServer:
                 "status": "success",
                 "command": command,
                 "timeline": timeline,
-                "analysis": analysis,
+                "analysis": analysis.model_dump(),
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -593,7 +720,7 @@ class WebSocketServer:
                 "status": "success",
                 "command": command,
                 "trends": trends,
-                "analysis": analysis,
+                "analysis": analysis.model_dump(),
                 "timestamp": datetime.utcnow().isoformat()
             }
 
@@ -750,10 +877,10 @@ class WebSocketServer:
             action=parameters
         )
         
-        if not ethical_eval.get("approved", False):
+        if not ethical_eval.approved:
             return {
                 "status": "rejected",
-                "reason": ethical_eval.get("reasoning"),
+                "reason": ethical_eval.reasoning,
                 "timestamp": datetime.utcnow().isoformat()
             }
         
@@ -783,7 +910,7 @@ class WebSocketServer:
             "status": "success" if success else "failed",
             "action": action_type,
             "target_id": target_id,
-            "ethical_evaluation": ethical_eval,
+            "ethical_evaluation": ethical_eval.model_dump(),
             "timestamp": datetime.utcnow().isoformat()
         }
 
@@ -811,7 +938,7 @@ class WebSocketServer:
             return {
                 "status": "success",
                 "command": command,
-                "planned_actions": planned_actions,
+                "planned_actions": [action.model_dump() for action in planned_actions],
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -864,6 +991,58 @@ class WebSocketServer:
                             parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle metrics commands"""
         command = parameters.get("command")
+        
+        if command == "get_llm_metrics":
+            metrics = self.ai_client.get_metrics()
+            controller = self.behavior_controllers.get(character_id)
+            if controller and controller.tweet_buffer:
+                metrics["tweet_buffer"] = controller.tweet_buffer.get_stats()
+            return {
+                "status": "success",
+                "metrics": metrics
+            }
+
+        if command == "get_twitter_metrics":
+            return {
+                "status": "success",
+                "metrics": {
+                    **get_twitter_executors().get_stats(),
+                    "clients": get_twitter_registry().get_stats()
+                }
+            }
+
+        if command == "get_mention_metrics":
+            controller = self.behavior_controllers.get(character_id)
+            return {
+                "status": "success",
+                "metrics": controller.get_mention_stats(character_id) if controller else {}
+            }
+
+        if command == "get_llm_usage":
+            period = parameters.get("period", "hour")
+            since = datetime.utcnow() - timedelta(days=parameters.get("days", 1))
+            await self.ai_client.cost_meter.load(character_id)
+            buckets = await self.db.get_llm_usage(character_id, period, since)
+            return {
+                "status": "success",
+                "current": self.ai_client.cost_meter.get_usage(character_id)["characters"][character_id],
+                "buckets": [
+                    {k: v.isoformat() if isinstance(v, datetime) else v for k, v in bucket.items()}
+                    for bucket in buckets
+                ]
+            }
+
+        if command == "set_llm_budget":
+            await self.ai_client.cost_meter.set_budget(
+                character_id,
+                hourly=parameters.get("hourly_usd"),
+                daily=parameters.get("daily_usd")
+            )
+            return {
+                "status": "success",
+                "budget": self.ai_client.cost_meter.get_budget(character_id)
+            }
+        
         tracker = self.performance_trackers.get(character_id)
         
         if not tracker:
@@ -1017,11 +1196,7 @@ class WebSocketServer:
             self.logger.info(f"Initializing character {character.name} ({character_id})")
             
             # Initialize Twitter client
-            self.twitter_clients[character_id] = TwitterClient(
-                ct0=character.twitter_credentials.ct0,
-                auth_token=character.twitter_credentials.auth_token,
-                twid=character.twitter_credentials.twid
-            )
+            self.twitter_clients[character_id] = get_twitter_registry().get_for(character.twitter_credentials)
             self.logger.info(f"Twitter client initialized for {character.name}")
             
             # Initialize behavior controller if not exists